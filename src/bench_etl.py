@@ -0,0 +1,341 @@
+"""
+ETL Benchmark Suite
+Generates synthetic source files with the exact columns each loader reads
+(data_load.py: 'Order ID', 'SKU', 'Del Date', 'Ret Rec', ...;
+retail_sales_load.py: 'TransactionID', 'OrderNumber', 'LineItem', ...) at
+controllable sizes and cardinalities, runs the pipeline on them and records
+throughput and memory per stage.
+
+Each run happens in a fresh process so peak RSS is per run, and executes
+the loader's full main(): with --backend mysql against a scratch database
+(bench_<loader>, dropped first), with sqlite or duckdb (see etl_backends)
+into a new database file next to the source file.
+
+Usage: python src/bench_etl.py [--loader data_load|retail_sales_load|all]
+                               [--sizes 10k,100k,1M,10M] [--format csv|xlsx]
+                               [--card name=N ...] [--seed N]
+                               [--backend sqlite|duckdb|mysql] [--host H] [--port P]
+                               [--user U] [--password PW] [--dir WORK_DIR]
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+import numpy as np
+import pandas as pd
+
+LOADERS = ('data_load', 'retail_sales_load')
+DEFAULT_SIZES = '10k,100k,1M,10M'
+WORK_DIR = '.etl_bench'
+BLOCK_ROWS = 250000
+EXCEL_MAX_ROWS = 1048575
+
+# ============================================================================
+# 1. CARDINALITIES
+# ============================================================================
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000"""
+    text = text.strip().lower()
+    factor = {'k': 1000, 'm': 1000000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * factor)
+
+def default_cardinality(loader, n):
+    """Distinct keys per dimension for n source rows"""
+    if loader == 'data_load':
+        return {
+            'customers': max(1, n // 3),
+            'products': max(1, min(n // 20, 100000)),
+            'categories': 5,
+            'locations': max(1, min(n // 100, 5000)),
+            'discounts': 20
+        }
+    return {
+        'customers': max(1, n // 5),
+        'stores': 60,
+        'categories': 8,
+        'subcategories': 32,
+        'products': max(1, min(n // 25, 50000)),
+        'orders': max(1, n * 10 // 24)
+    }
+
+# ============================================================================
+# 2. SYNTHETIC SOURCE ROWS
+# ============================================================================
+
+PAYMENTS = ['UPI', 'Credit Card', 'Debit Card', 'COD', 'Net Banking']
+SOURCES = ['Website', 'Mobile App', 'Marketplace']
+WAREHOUSES = ['Mumbai', 'Delhi', 'Bengaluru']
+RETURN_REASONS = ['Size Issue', 'Damaged', 'Quality Issue', 'Wrong Item', 'Changed Mind']
+COUNTRIES = [('United States', 'North America'), ('Canada', 'North America'),
+             ('United Kingdom', 'Europe'), ('Germany', 'Europe'), ('France', 'Europe'),
+             ('Italy', 'Europe'), ('Netherlands', 'Europe'), ('Australia', 'Australia')]
+COUNTRY_NAMES = np.array([country for country, _ in COUNTRIES])
+CONTINENTS = np.array([continent for _, continent in COUNTRIES])
+BRANDS = ['Contoso', 'Adventure Works', 'Fabrikam', 'Litware', 'Northwind Traders', 'Proseware']
+COLORS = ['Black', 'White', 'Silver', 'Blue', 'Red', 'Green', 'Grey']
+
+def _labels(prefix, values, width=0):
+    """prefix + zero-padded number for every value"""
+    numbers = pd.Series(values).astype(str)
+    return (prefix + (numbers.str.zfill(width) if width else numbers)).to_numpy()
+
+def _days(start, offsets):
+    return pd.Timestamp(start) + pd.to_timedelta(offsets, unit='D')
+
+def ecommerce_block(start, n, total, card, rng):
+    """Rows start..start+n of a data_load.py source ('Sheet2' of Data Analysis.xlsx)"""
+    i = np.arange(start, start + n)
+    customer = rng.integers(0, card['customers'], n)
+    product = rng.integers(0, card['products'], n)
+    location = rng.integers(0, card['locations'], n)
+    qty = rng.integers(1, 6, n)
+    price = 199 + (product * 37) % 4800
+    total_price = price * qty
+
+    has_discount = rng.random(n) < 0.4
+    discount = rng.integers(0, card['discounts'], n)
+    discount_pct = np.where(has_discount, 5 + (discount * 5) % 50, np.nan)
+
+    order_date = pd.Series(_days('2024-01-01', i * 365 // max(total, 1)))
+    delivery_days = rng.integers(1, 11, n)
+    status = rng.choice(['Delivered', 'RTO', 'Cancelled'], n, p=[0.85, 0.1, 0.05])
+    returned = (status == 'Delivered') & (rng.random(n) < 0.2)
+    return_days = rng.integers(1, 16, n).astype('float64')
+    return_days[~returned] = np.nan
+    del_date = order_date + pd.to_timedelta(delivery_days, unit='D')
+
+    return pd.DataFrame({
+        'Order ID': _labels('UT-', 100001 + i),
+        'Order Date': order_date,
+        'Order Month': order_date.dt.month,
+        'Order Week': order_date.dt.isocalendar().week.astype('int64'),
+        'Customer ID': _labels('CUST_', 10001 + customer),
+        'Type': np.where(customer % 3 == 0, 'Returning', 'New'),
+        'SKU': _labels('SKU-', product, 6),
+        'Category': _labels('Category ', product % card['categories']),
+        'Product Name': _labels('Product ', product),
+        'Unit Price': price,
+        'Qty': qty,
+        'Total': total_price,
+        'Discount Code': np.where(has_discount, _labels('CODE', discount, 3), None),
+        'Discount Code %': discount_pct,
+        'Discounted Total': np.where(has_discount, (total_price * (1 - discount_pct / 100)).round(2), total_price),
+        'Payment': rng.choice(PAYMENTS, n),
+        'Source': rng.choice(SOURCES, n),
+        'City': _labels('City ', location),
+        'State': _labels('State ', location % 30),
+        'Warehouse': rng.choice(WAREHOUSES, n),
+        'Del Date': del_date,
+        'Status': status,
+        'Return?': np.where(returned, 'Yes', 'No'),
+        'Reason': np.where(returned, rng.choice(RETURN_REASONS, n), None),
+        'Ret Rec': del_date + pd.to_timedelta(return_days, unit='D'),
+        'Ret Window': return_days,
+        'No. Of Days To Delivery': delivery_days,
+        'Refund': np.where(returned, rng.choice(['Processed', 'Pending'], n), 'Not Applicable')
+    })
+
+def retail_block(start, n, total, card, rng):
+    """Rows start..start+n of a retail_sales_load.py source (Retail Sales Dataset.xlsx)"""
+    i = np.arange(start, start + n, dtype=np.int64)
+    orders = card['orders']
+    order = i * orders // total
+    first_line = -(-(order * total) // orders)
+
+    # Every order-level attribute is a function of the order number, so all
+    # lines of an order agree even when they fall in different blocks
+    customer = (order * 2654435761) % card['customers']
+    store = (order * 40503) % card['stores']
+    order_date = pd.Series(_days('2016-01-01', order * 1800 // orders))
+    delivery_date = order_date + pd.to_timedelta(order % 10, unit='D')
+    delivery_date[(order % 4 != 0)] = pd.NaT
+
+    product = rng.integers(0, card['products'], n)
+    subcategory = product % card['subcategories']
+    category = subcategory % card['categories']
+    cost = (5 + (product * 13) % 500 + 0.99).round(2)
+
+    return pd.DataFrame({
+        'OrderNumber': 100000 + order,
+        'LineItem': i - first_line + 1,
+        'OrderDate': order_date,
+        'DeliveryDate': delivery_date,
+        'CustomerID': customer + 1,
+        'CustomerGender': np.where(customer % 2 == 0, 'Male', 'Female'),
+        'CustomerName': _labels('Customer ', customer + 1),
+        'CustomerCity': _labels('City ', customer % 500),
+        'CustomerStateCode': _labels('S', customer % 50, 2),
+        'CustomerState': _labels('State ', customer % 50),
+        'CustomerZip': (10000 + customer % 90000).astype(str),
+        'CustomerCountry': COUNTRY_NAMES[customer % len(COUNTRIES)],
+        'CustomerContinent': CONTINENTS[customer % len(COUNTRIES)],
+        'CustomerDOB': _days('1950-01-01', (customer * 7919) % 18000),
+        'StoreID': store + 1,
+        'StoreCountry': COUNTRY_NAMES[store % len(COUNTRIES)],
+        'StoreState': _labels('State ', store % 50),
+        'StoreSqMeters': 500 + (store * 37) % 2000,
+        'StoreOpenDate': _days('2005-01-01', (store * 97) % 4000),
+        'ProductID': product + 1,
+        'ProductName': _labels('Product ', product + 1),
+        'ProductBrand': np.array(BRANDS)[product % len(BRANDS)],
+        'ProductColor': np.array(COLORS)[product % len(COLORS)],
+        'ProductCost': cost,
+        'ProductPrice': (cost * 1.5).round(2),
+        'ProductSubcategoryID': subcategory + 1,
+        'ProductSubcategory': _labels('Subcategory ', subcategory + 1),
+        'ProductCategoryID': category + 1,
+        'ProductCategory': _labels('Category ', category + 1),
+        'TransactionID': i + 1,
+        'Quantity': rng.integers(1, 6, n)
+    })
+
+BLOCK_BUILDERS = {'data_load': ecommerce_block, 'retail_sales_load': retail_block}
+SHEET_NAMES = {'data_load': 'Sheet2', 'retail_sales_load': 'Sheet1'}
+
+def generate(loader, n, card, file_path, seed=42):
+    """
+    Write n synthetic rows for a loader to file_path (.csv or .xlsx).
+
+    CSV files are written block by block, so memory stays bounded at any
+    size; .xlsx is limited to one sheet (EXCEL_MAX_ROWS) and built in memory.
+    """
+    build = BLOCK_BUILDERS[loader]
+    blocks = (
+        build(start, min(BLOCK_ROWS, n - start), n, card, np.random.default_rng([seed, start]))
+        for start in range(0, n, BLOCK_ROWS)
+    )
+    if file_path.endswith('.xlsx'):
+        if n > EXCEL_MAX_ROWS:
+            raise ValueError(f"{n} rows do not fit in one Excel sheet; use --format csv")
+        pd.concat(blocks, ignore_index=True).to_excel(file_path, sheet_name=SHEET_NAMES[loader], index=False)
+        return
+
+    tmp = file_path + '.tmp'
+    for k, block in enumerate(blocks):
+        block.to_csv(tmp, mode='w' if k == 0 else 'a', header=k == 0, index=False, date_format='%Y-%m-%d')
+    os.replace(tmp, file_path)
+
+# ============================================================================
+# 3. PIPELINE RUNS
+# ============================================================================
+
+def run_local(module, file_path, backend):
+    """The loader's full main() into a new SQLite/DuckDB file"""
+    db_path = f"{os.path.splitext(file_path)[0]}.{backend}"
+    for path in (db_path, db_path + '-wal', db_path + '-shm', db_path + '.wal'):
+        if os.path.exists(path):
+            os.remove(path)
+    module.LOAD_CONFIG.update(backend=backend, backend_path=db_path)
+    module.main(file_path)
+
+def run_mysql(module, file_path, server):
+    """The loader's full main() against a freshly dropped bench_<loader> database"""
+    from etl_connection import ConnectionFactory
+
+    module.DB_CONFIG.update(server, database=f"bench_{module.__name__}")
+    connection = ConnectionFactory(module.DB_CONFIG).server()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {module.DB_CONFIG['database']}")
+        cursor.close()
+    finally:
+        connection.close()
+    module.main(file_path)
+
+def run_one(loader, file_path, backend, server, log_path):
+    """Run one benchmark in this (fresh) process and return its profile report"""
+    from etl_profile import PROFILER
+
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        module = importlib.import_module(loader)
+        PROFILER.enable()
+        if backend == 'mysql':
+            run_mysql(module, file_path, server)
+        else:
+            run_local(module, file_path, backend)
+        return PROFILER.report(loader)
+
+def benchmark(loader, n, card, args):
+    """Generate (or reuse) the source file for one size and run it; returns a result row"""
+    card_tag = '-'.join(f"{key}{value}" for key, value in sorted(card.items()))
+    base = os.path.join(args.dir, f"{loader}_{n}_s{args.seed}_{card_tag}")
+    file_path = f"{base}.{args.format}"
+
+    generate_s = 0.0
+    if not os.path.exists(file_path):
+        start = time.perf_counter()
+        generate(loader, n, card, file_path, args.seed)
+        generate_s = time.perf_counter() - start
+
+    server = {'host': args.host, 'port': args.port, 'user': args.user, 'password': args.password}
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        report = executor.submit(run_one, loader, file_path, args.backend, server, f"{base}.log").result()
+
+    return {
+        'loader': loader,
+        'rows': n,
+        'backend': args.backend,
+        'format': args.format,
+        'cardinality': card,
+        'file_mb': os.path.getsize(file_path) / 1e6,
+        'generate_s': generate_s,
+        'wall_s': report['wall_s'],
+        'rows_per_s': n / report['wall_s'] if report['wall_s'] > 0 else None,
+        'peak_rss_mb': report['peak_rss_mb'],
+        'stages': report['stages']
+    }
+
+def print_summary(results):
+    print("\n" + "="*80)
+    print("BENCHMARK RESULTS")
+    print("="*80)
+    print(f"{'loader':<18} {'rows':>10} {'total s':>9} {'rows/s':>10} {'peak MB':>9}  slowest stage")
+    for r in results:
+        slowest = max(r['stages'], key=lambda s: s['wall_s'], default=None)
+        slowest = f"{slowest['stage']} ({slowest['wall_s']:.2f}s)" if slowest else '-'
+        peak = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        print(f"{r['loader']:<18} {r['rows']:>10,} {r['wall_s']:>9.2f} {r['rows_per_s']:>10,.0f} {peak:>9}  {slowest}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL loaders on synthetic data")
+    parser.add_argument('--loader', default='all', choices=[*LOADERS, 'all'])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES)
+    parser.add_argument('--format', default='csv', choices=['csv', 'xlsx'])
+    parser.add_argument('--card', action='append', default=[], metavar='NAME=N',
+                        help="override a cardinality, e.g. customers=5000")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', default='sqlite', choices=['sqlite', 'duckdb', 'mysql'])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--dir', default=WORK_DIR)
+    args = parser.parse_args()
+
+    overrides = dict(item.split('=', 1) for item in args.card)
+    loaders = LOADERS if args.loader == 'all' else (args.loader,)
+    os.makedirs(args.dir, exist_ok=True)
+
+    results = []
+    for loader in loaders:
+        for n in map(parse_size, args.sizes.split(',')):
+            card = default_cardinality(loader, n)
+            card.update({key: int(value) for key, value in overrides.items() if key in card})
+            print(f"Running {loader} on {n:,} rows ({args.backend}, {args.format})...")
+            results.append(benchmark(loader, n, card, args))
+
+    out_path = os.path.join(args.dir, f"results_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print_summary(results)
+    print(f"\n✓ Results written to {out_path}")
+
+if __name__ == "__main__":
+    main()
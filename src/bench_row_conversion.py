@@ -0,0 +1,96 @@
+"""
+Row Conversion Benchmark
+Compares the legacy iterrows() conversion against etl_convert.to_db_rows
+on a synthetic orders frame shaped like data_load.extract_orders output
+
+Usage: python src/bench_row_conversion.py [rows ...]
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from etl_convert import to_db_rows
+
+ORDERS_SCHEMA = [
+    ('order_id', 'str'),
+    ('customer_id', 'str'),
+    ('location_id', 'int'),
+    ('discount_id', 'int'),
+    ('order_date', 'date'),
+    ('order_month', 'int'),
+    ('order_week', 'int'),
+    ('subtotal', 'float'),
+    ('discount_amount', 'float'),
+    ('total_amount', 'float'),
+    ('payment_method', 'str'),
+    ('source', 'str'),
+    ('status', 'str')
+]
+
+def make_orders(n, seed=42):
+    """Build a synthetic orders frame with NaN discount ids and NaT dates"""
+    rng = np.random.default_rng(seed)
+    subtotal = rng.uniform(100, 5000, n).round(2)
+    discount_id = rng.integers(1, 20, n).astype('float64')
+    discount_id[rng.random(n) < 0.6] = np.nan
+    order_date = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D')
+    order_date = pd.Series(order_date)
+    order_date[rng.random(n) < 0.01] = pd.NaT
+    return pd.DataFrame({
+        'order_id': [f'ORD{i:08d}' for i in range(n)],
+        'customer_id': [f'CUST{i % 5000:05d}' for i in range(n)],
+        'location_id': rng.integers(1, 300, n).astype('float64'),
+        'discount_id': discount_id,
+        'order_date': order_date,
+        'order_month': rng.integers(1, 13, n),
+        'order_week': rng.integers(1, 53, n),
+        'subtotal': subtotal,
+        'discount_amount': (subtotal * 0.1).round(2),
+        'total_amount': (subtotal * 0.9).round(2),
+        'payment_method': rng.choice(['UPI', 'COD', 'Card'], n),
+        'source': rng.choice(['Web', 'App'], n),
+        'status': rng.choice(['Delivered', 'RTO', 'Cancelled'], n)
+    })
+
+def legacy_rows(orders):
+    """The iterrows() conversion previously used by data_load.insert_orders"""
+    data = []
+    for _, row in orders.iterrows():
+        data.append([
+            row['order_id'],
+            row['customer_id'],
+            int(row['location_id']) if pd.notna(row['location_id']) else None,
+            int(row['discount_id']) if pd.notna(row['discount_id']) else None,
+            row['order_date'].date() if pd.notna(row['order_date']) else None,
+            int(row['order_month']),
+            int(row['order_week']),
+            float(row['subtotal']),
+            float(row['discount_amount']),
+            float(row['total_amount']),
+            row['payment_method'],
+            row['source'],
+            row['status']
+        ])
+    return data
+
+def time_it(func, df):
+    """Return (seconds, result) for a single call"""
+    start = time.perf_counter()
+    result = func(df)
+    return time.perf_counter() - start, result
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+
+    print(f"{'rows':>10} | {'iterrows rows/s':>16} | {'to_db_rows rows/s':>18} | {'speedup':>8}")
+    print("-" * 62)
+    for n in sizes:
+        df = make_orders(n)
+        legacy_time, legacy = time_it(legacy_rows, df)
+        new_time, new = time_it(lambda frame: to_db_rows(frame, ORDERS_SCHEMA), df)
+        assert [tuple(row) for row in legacy] == new, "conversion mismatch"
+        print(f"{n:>10,} | {n / legacy_time:>16,.0f} | {n / new_time:>18,.0f} | {legacy_time / new_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
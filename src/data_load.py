@@ -5,10 +5,28 @@ Transforms denormalized e-commerce data into a normalized relational database
 
 import pandas as pd
 import numpy as np
-import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
+import os
+import sys
 import warnings
+from etl_readers import read_frame, iter_chunks
+from etl_cache import FrameCache, function_fingerprint
+from etl_dates import EXCEL_SERIAL, parse_date_columns
+from etl_normalize import Dimension, Fact, Normalizer
+from etl_keys import resolve_surrogate_keys, surrogate_rows
+from etl_scheduler import LevelScheduler
+from etl_incremental import IncrementalTracker
+from etl_fresh_load import FreshLoad, complete_deferred
+from etl_connection import ConnectionFactory
+from etl_profile import PROFILER, profiled
+from etl_backends import DATABASE_ERRORS, get_backend, insert_frame
+from etl_parquet import ParquetSink
+from etl_summary import Summary, SummaryTables
+from etl_checkpoint import Checkpoint, source_key
+from etl_verify import LoadVerifier
+from etl_query_cache import QueryCache, create_version_table
+from etl_stream import ResultStream
 warnings.filterwarnings('ignore')
 
 # ============================================================================
@@ -22,18 +40,39 @@ DB_CONFIG = {
     'database': 'ecommerce_db'
 }
 
+LOAD_CONFIG = {
+    'chunk_size': None,       # Rows per block for streaming ingestion (None = read whole file)
+    'bulk_load': False,       # Load tables via temp TSV + LOAD DATA LOCAL INFILE
+    'batch_size': None,       # Rows per multi-row INSERT (None = auto-size against max_allowed_packet)
+    'parallel_workers': 1,    # Connections used to load independent FK levels in parallel (1 = serial)
+    'incremental': False,     # Only load rows that are new/changed since the last run (see INCREMENTAL)
+    'cache_dir': None,        # Directory for the parsed-input cache, e.g. '.etl_cache' (None = no cache)
+    'cache_max_mb': 2048,     # Size bound for the cache; least-recently-used entries are evicted
+    'fresh_load': False,      # Empty schema only: defer secondary indexes/FKs and checks until after the load
+    'compress': False,        # MySQL protocol compression (worth it for remote servers, costs CPU locally)
+    'retries': 3,             # Times a batch is resent after a dropped connection or deadlock
+    'profile_report': None,   # JSON file for per-stage wall/CPU time, peak RSS growth and rows/s (None = off)
+    'profile_table': False,   # Also print the per-stage profile as a table at the end of the run
+    'backend': 'mysql',       # Target database: 'mysql', 'sqlite' or 'duckdb' (see etl_backends)
+    'backend_path': None,     # Database file for sqlite/duckdb (None = <database>.<backend>)
+    'parquet_dir': None,      # Also export the normalized tables as Parquet here, e.g. 'parquet' (None = off)
+    'summaries': True,        # Maintain the pre-aggregated SUMMARY_TABLES from each load's new rows
+    'resumable': False,       # Record committed tables/rows so a rerun after a crash resumes (see etl_checkpoint)
+    'checkpoint_rows': 50000, # Rows inserted between checkpoints in resumable mode
+    'query_cache': False,     # Serve run_sample_queries from a result cache until a load changes their tables
+    'query_cache_dir': None,  # On-disk tier of the query cache, e.g. '.etl_query_cache' (None = in-process only)
+    'query_cache_ttl': 3600,  # Seconds a cached query result is served at most (see etl_query_cache)
+    'stream_batch_rows': 10000, # Rows fetched per round trip by uncached reporting queries (see etl_stream)
+}
+
 # ============================================================================
 # 1. DATABASE CONNECTION
 # ============================================================================
 
-def create_connection(config):
-    """Create MySQL database connection"""
+def create_connection(factory):
+    """Open a server connection (no database selected) through the loader's ConnectionFactory"""
     try:
-        connection = mysql.connector.connect(
-            host=config['host'],
-            user=config['user'],
-            password=config['password']
-        )
+        connection = factory.server()
         if connection.is_connected():
             print(f"✓ Connected to MySQL Server version {connection.get_server_info()}")
             return connection
@@ -54,140 +93,150 @@ def create_database(connection, db_name):
         print(f"✗ Error creating database: {e}")
         return False
 
+def connect_database(factory):
+    """Take a pooled connection with the loader database already selected"""
+    try:
+        return factory.connect()
+    except Error as e:
+        print(f"✗ Error connecting to database: {e}")
+        return None
+
 # ============================================================================
 # 2. CREATE TABLES
 # ============================================================================
 
+TABLES = {
+    'customers': """
+        CREATE TABLE IF NOT EXISTS customers (
+            customer_id VARCHAR(50) PRIMARY KEY,
+            customer_type ENUM('New', 'Returning') NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_customer_type (customer_type)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'products': """
+        CREATE TABLE IF NOT EXISTS products (
+            sku VARCHAR(50) PRIMARY KEY,
+            product_name VARCHAR(255) NOT NULL,
+            category VARCHAR(100) NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_category (category),
+            INDEX idx_price (unit_price)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'locations': """
+        CREATE TABLE IF NOT EXISTS locations (
+            location_id INT AUTO_INCREMENT PRIMARY KEY,
+            city VARCHAR(100) NOT NULL,
+            state VARCHAR(100) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_city_state (city, state),
+            INDEX idx_state (state)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'discounts': """
+        CREATE TABLE IF NOT EXISTS discounts (
+            discount_id INT AUTO_INCREMENT PRIMARY KEY,
+            discount_code VARCHAR(50) UNIQUE,
+            discount_percentage DECIMAL(5, 2) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_discount_code (discount_code)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'orders': """
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id VARCHAR(50) PRIMARY KEY,
+            customer_id VARCHAR(50) NOT NULL,
+            location_id INT NOT NULL,
+            discount_id INT NULL,
+            order_date DATE NOT NULL,
+            order_month INT NOT NULL,
+            order_week INT NOT NULL,
+            subtotal DECIMAL(10, 2) NOT NULL,
+            discount_amount DECIMAL(10, 2) DEFAULT 0.00,
+            total_amount DECIMAL(10, 2) NOT NULL,
+            payment_method VARCHAR(50) NOT NULL,
+            source VARCHAR(50) NOT NULL,
+            status ENUM('Delivered', 'RTO', 'Cancelled') NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+            FOREIGN KEY (location_id) REFERENCES locations(location_id),
+            FOREIGN KEY (discount_id) REFERENCES discounts(discount_id),
+            INDEX idx_order_date (order_date),
+            INDEX idx_customer (customer_id),
+            INDEX idx_status (status),
+            INDEX idx_source (source)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'order_items': """
+        CREATE TABLE IF NOT EXISTS order_items (
+            order_item_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id VARCHAR(50) NOT NULL,
+            sku VARCHAR(50) NOT NULL,
+            quantity INT NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            line_total DECIMAL(10, 2) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE,
+            FOREIGN KEY (sku) REFERENCES products(sku),
+            INDEX idx_order (order_id),
+            INDEX idx_product (sku)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'deliveries': """
+        CREATE TABLE IF NOT EXISTS deliveries (
+            delivery_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id VARCHAR(50) UNIQUE NOT NULL,
+            warehouse VARCHAR(100) NOT NULL,
+            delivery_date DATE NULL,
+            days_to_delivery INT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE,
+            INDEX idx_warehouse (warehouse),
+            INDEX idx_delivery_date (delivery_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'returns': """
+        CREATE TABLE IF NOT EXISTS returns (
+            return_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id VARCHAR(50) UNIQUE NOT NULL,
+            return_date DATE NULL,
+            return_reason VARCHAR(100) NULL,
+            refund_status ENUM('Processed', 'Pending', 'Not Applicable') NOT NULL,
+            return_window_days INT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE,
+            INDEX idx_return_reason (return_reason),
+            INDEX idx_refund_status (refund_status)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+
 def create_tables(connection):
     """Create all normalized tables"""
     
-    tables = {
-        'customers': """
-            CREATE TABLE IF NOT EXISTS customers (
-                customer_id VARCHAR(50) PRIMARY KEY,
-                customer_type ENUM('New', 'Returning') NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_customer_type (customer_type)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-        
-        'products': """
-            CREATE TABLE IF NOT EXISTS products (
-                sku VARCHAR(50) PRIMARY KEY,
-                product_name VARCHAR(255) NOT NULL,
-                category VARCHAR(100) NOT NULL,
-                unit_price DECIMAL(10, 2) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_category (category),
-                INDEX idx_price (unit_price)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-        
-        'locations': """
-            CREATE TABLE IF NOT EXISTS locations (
-                location_id INT AUTO_INCREMENT PRIMARY KEY,
-                city VARCHAR(100) NOT NULL,
-                state VARCHAR(100) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE KEY unique_city_state (city, state),
-                INDEX idx_state (state)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-        
-        'discounts': """
-            CREATE TABLE IF NOT EXISTS discounts (
-                discount_id INT AUTO_INCREMENT PRIMARY KEY,
-                discount_code VARCHAR(50) UNIQUE,
-                discount_percentage DECIMAL(5, 2) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_discount_code (discount_code)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-        
-        'orders': """
-            CREATE TABLE IF NOT EXISTS orders (
-                order_id VARCHAR(50) PRIMARY KEY,
-                customer_id VARCHAR(50) NOT NULL,
-                location_id INT NOT NULL,
-                discount_id INT NULL,
-                order_date DATE NOT NULL,
-                order_month INT NOT NULL,
-                order_week INT NOT NULL,
-                subtotal DECIMAL(10, 2) NOT NULL,
-                discount_amount DECIMAL(10, 2) DEFAULT 0.00,
-                total_amount DECIMAL(10, 2) NOT NULL,
-                payment_method VARCHAR(50) NOT NULL,
-                source VARCHAR(50) NOT NULL,
-                status ENUM('Delivered', 'RTO', 'Cancelled') NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
-                FOREIGN KEY (location_id) REFERENCES locations(location_id),
-                FOREIGN KEY (discount_id) REFERENCES discounts(discount_id),
-                INDEX idx_order_date (order_date),
-                INDEX idx_customer (customer_id),
-                INDEX idx_status (status),
-                INDEX idx_source (source)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-        
-        'order_items': """
-            CREATE TABLE IF NOT EXISTS order_items (
-                order_item_id INT AUTO_INCREMENT PRIMARY KEY,
-                order_id VARCHAR(50) NOT NULL,
-                sku VARCHAR(50) NOT NULL,
-                quantity INT NOT NULL,
-                unit_price DECIMAL(10, 2) NOT NULL,
-                line_total DECIMAL(10, 2) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE,
-                FOREIGN KEY (sku) REFERENCES products(sku),
-                INDEX idx_order (order_id),
-                INDEX idx_product (sku)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-        
-        'deliveries': """
-            CREATE TABLE IF NOT EXISTS deliveries (
-                delivery_id INT AUTO_INCREMENT PRIMARY KEY,
-                order_id VARCHAR(50) UNIQUE NOT NULL,
-                warehouse VARCHAR(100) NOT NULL,
-                delivery_date DATE NULL,
-                days_to_delivery INT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE,
-                INDEX idx_warehouse (warehouse),
-                INDEX idx_delivery_date (delivery_date)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-        
-        'returns': """
-            CREATE TABLE IF NOT EXISTS returns (
-                return_id INT AUTO_INCREMENT PRIMARY KEY,
-                order_id VARCHAR(50) UNIQUE NOT NULL,
-                return_date DATE NULL,
-                return_reason VARCHAR(100) NULL,
-                refund_status ENUM('Processed', 'Pending', 'Not Applicable') NOT NULL,
-                return_window_days INT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE,
-                INDEX idx_return_reason (return_reason),
-                INDEX idx_refund_status (refund_status)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """
-    }
-    
     cursor = connection.cursor()
     
     try:
-        for table_name, create_statement in tables.items():
-            cursor.execute(create_statement)
+        backend = get_backend(LOAD_CONFIG['backend'])
+        for table_name, create_statement in TABLES.items():
+            for statement in backend.table_statements(table_name, create_statement):
+                cursor.execute(statement)
             print(f"✓ Table '{table_name}' created successfully")
         
         connection.commit()
         print("\n✓ All tables created successfully!")
         return True
         
-    except Error as e:
+    except DATABASE_ERRORS as e:
         print(f"✗ Error creating tables: {e}")
         return False
     finally:
@@ -197,6 +246,16 @@ def create_tables(connection):
 # 3. DATA TRANSFORMATION & NORMALIZATION
 # ============================================================================
 
+# Date columns and the formats their text cells use, tried in order (see
+# etl_dates). The workbook's Sheet2 types day-first strings as text and
+# keeps the cells Excel recognised as dates; generated CSVs use ISO dates.
+DATE_COLUMNS = {
+    'Order Date': ('%d/%m/%Y', '%Y-%m-%d', EXCEL_SERIAL),
+    'Del Date': ('%d/%m/%Y', '%Y-%m-%d', EXCEL_SERIAL),
+    'Ret Rec': ('%d/%m/%Y', '%Y-%m-%d', EXCEL_SERIAL)
+}
+
+@profiled()
 def load_and_transform_data(file_path):
     """Load data from Excel and transform for normalization"""
     
@@ -204,306 +263,434 @@ def load_and_transform_data(file_path):
     print("LOADING AND TRANSFORMING DATA")
     print("="*80)
     
-    # Load data
-    df = pd.read_excel(file_path, sheet_name='Sheet2')
-    print(f"✓ Loaded {len(df)} rows from Excel file")
-    
-    # Convert date columns
-    df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-    df['Del Date'] = pd.to_datetime(df['Del Date'], errors='coerce')
-    df['Ret Rec'] = pd.to_datetime(df['Ret Rec'], errors='coerce')
-    
-    return df
-
-def extract_customers(df):
-    """Extract unique customers"""
-    customers = df[['Customer ID', 'Type']].drop_duplicates()
-    customers.columns = ['customer_id', 'customer_type']
-    print(f"✓ Extracted {len(customers)} unique customers")
-    return customers
-
-def extract_products(df):
-    """Extract unique products"""
-    products = df[['SKU', 'Product Name', 'Category', 'Unit Price']].drop_duplicates(subset=['SKU'])
-    products.columns = ['sku', 'product_name', 'category', 'unit_price']
-    print(f"✓ Extracted {len(products)} unique products")
-    return products
-
-def extract_locations(df):
-    """Extract unique locations"""
-    locations = df[['City', 'State']].drop_duplicates()
-    locations.columns = ['city', 'state']
-    # Create location_id mapping
-    locations['location_id'] = range(1, len(locations) + 1)
-    print(f"✓ Extracted {len(locations)} unique locations")
-    return locations
-
-def extract_discounts(df):
-    """Extract unique discounts"""
-    discounts = df[df['Discount Code'].notna()][['Discount Code', 'Discount Code %']].drop_duplicates()
-    discounts.columns = ['discount_code', 'discount_percentage']
-    discounts['discount_id'] = range(1, len(discounts) + 1)
-    print(f"✓ Extracted {len(discounts)} unique discount codes")
-    return discounts
-
-def extract_orders(df, locations, discounts):
-    """Extract order information"""
-    
-    # Merge to get location_id
-    df_with_loc = df.merge(locations, left_on=['City', 'State'], right_on=['city', 'state'], how='left')
-    
-    # Merge to get discount_id
-    df_with_disc = df_with_loc.merge(
-        discounts[['discount_code', 'discount_id']], 
-        left_on='Discount Code', 
-        right_on='discount_code', 
-        how='left'
-    )
-    
-    orders = df_with_disc[[
-        'Order ID', 'Customer ID', 'location_id', 'discount_id',
-        'Order Date', 'Order Month', 'Order Week',
-        'Total', 'Discounted Total', 'Payment', 'Source', 'Status'
-    ]].copy()
+    if not LOAD_CONFIG['cache_dir']:
+        return read_and_transform(file_path)
     
-    orders.columns = [
-        'order_id', 'customer_id', 'location_id', 'discount_id',
-        'order_date', 'order_month', 'order_week',
-        'subtotal', 'total_amount', 'payment_method', 'source', 'status'
-    ]
+    # Reuse the typed frame from an earlier run while the file (and the
+    # reading/transform code) is unchanged
+    cache = FrameCache(LOAD_CONFIG['cache_dir'], LOAD_CONFIG['cache_max_mb'])
+    variant = f"data_load:{function_fingerprint(read_and_transform)}:{function_fingerprint(transform_data)}:{DATE_COLUMNS}"
+    return cache.get_or_build(file_path, lambda: read_and_transform(file_path), variant)
+
+def read_and_transform(file_path):
+    """Read the whole source file and convert its date columns"""
+    df = read_frame(file_path, sheet_name='Sheet2')
+    print(f"✓ Loaded {len(df)} rows from {file_path}")
+    return transform_data(df)
+
+@profiled()
+def transform_data(df):
+    """Convert the DATE_COLUMNS in place"""
+    return parse_date_columns(df, DATE_COLUMNS)
+
+def iter_transformed_chunks(file_path, chunk_size):
+    """Stream the source file in fixed-size blocks, each already transformed"""
     
-    # Calculate discount amount
-    orders['discount_amount'] = orders['subtotal'] - orders['total_amount']
-    orders['discount_amount'] = orders['discount_amount'].fillna(0)
+    print("\n" + "="*80)
+    print(f"STREAMING DATA IN CHUNKS OF {chunk_size} ROWS")
+    print("="*80)
     
-    print(f"✓ Extracted {len(orders)} orders")
+    # 'Discount Code' mixes strings with cells Excel auto-converted to dates;
+    # stringify it in every block (dates as str(datetime), as a whole-file
+    # load stores them) so merges see one key type however the chunks fall
+    for chunk in iter_chunks(file_path, chunk_size, sheet_name='Sheet2',
+                             dtype={'Discount Code': str}):
+        yield transform_data(chunk)
+
+def _derive_discount_amount(orders):
+    """Calculate discount amount"""
+    orders['discount_amount'] = (orders['subtotal'] - orders['total_amount']).fillna(0)
     return orders
 
-def extract_order_items(df):
-    """Extract order items"""
-    order_items = df[['Order ID', 'SKU', 'Qty', 'Unit Price', 'Total']].copy()
-    order_items.columns = ['order_id', 'sku', 'quantity', 'unit_price', 'line_total']
-    print(f"✓ Extracted {len(order_items)} order items")
-    return order_items
-
-def extract_deliveries(df):
-    """Extract delivery information"""
-    deliveries = df[['Order ID', 'Warehouse', 'Del Date', 'No. Of Days To Delivery']].copy()
-    deliveries.columns = ['order_id', 'warehouse', 'delivery_date', 'days_to_delivery']
-    print(f"✓ Extracted {len(deliveries)} delivery records")
-    return deliveries
-
-def extract_returns(df):
-    """Extract return information"""
-    returns = df[df['Return?'] == 'Yes'][['Order ID', 'Ret Rec', 'Reason', 'Refund', 'Ret Window']].copy()
-    returns.columns = ['order_id', 'return_date', 'return_reason', 'refund_status', 'return_window_days']
-    print(f"✓ Extracted {len(returns)} return records")
-    return returns
+# Normalized tables, in foreign-key order. Customers and products use their
+# natural keys; locations and discounts get surrogate ids that orders reference.
+NORMALIZATION = [
+    Dimension('customers', ['Customer ID'], {
+        'Customer ID': 'customer_id',
+        'Type': 'customer_type'
+    }),
+    Dimension('products', ['SKU'], {
+        'SKU': 'sku',
+        'Product Name': 'product_name',
+        'Category': 'category',
+        'Unit Price': 'unit_price'
+    }),
+    Dimension('locations', ['City', 'State'], {
+        'City': 'city',
+        'State': 'state'
+    }, surrogate='location_id'),
+    Dimension('discounts', ['Discount Code'], {
+        'Discount Code': 'discount_code',
+        'Discount Code %': 'discount_percentage'
+    }, surrogate='discount_id', dropna=True),
+    Fact('orders', {
+        'Order ID': 'order_id',
+        'Customer ID': 'customer_id',
+        'Order Date': 'order_date',
+        'Order Month': 'order_month',
+        'Order Week': 'order_week',
+        'Total': 'subtotal',
+        'Discounted Total': 'total_amount',
+        'Payment': 'payment_method',
+        'Source': 'source',
+        'Status': 'status'
+    }, foreign_keys={'location_id': 'locations', 'discount_id': 'discounts'},
+       derive=_derive_discount_amount),
+    Fact('order_items', {
+        'Order ID': 'order_id',
+        'SKU': 'sku',
+        'Qty': 'quantity',
+        'Unit Price': 'unit_price',
+        'Total': 'line_total'
+    }),
+    Fact('deliveries', {
+        'Order ID': 'order_id',
+        'Warehouse': 'warehouse',
+        'Del Date': 'delivery_date',
+        'No. Of Days To Delivery': 'days_to_delivery'
+    }),
+    Fact('returns', {
+        'Order ID': 'order_id',
+        'Ret Rec': 'return_date',
+        'Reason': 'return_reason',
+        'Refund': 'refund_status',
+        'Ret Window': 'return_window_days'
+    }, where=lambda df: df['Return?'] == 'Yes')
+]
+
+@profiled()
+def extract_all(df, normalizer=None):
+    """
+    Extract every normalized table from one frame.
+    
+    When streaming chunks, pass the same Normalizer for every chunk so
+    location/discount ids stay consistent and only new ones are emitted;
+    main() seeds it with database ids via resolve_surrogate_keys first.
+    """
+    if normalizer is None:
+        normalizer = Normalizer(NORMALIZATION)
+    return normalizer.normalize(df)
 
 # ============================================================================
 # 4. INSERT DATA INTO DATABASE
 # ============================================================================
 
+@profiled()
 def insert_customers(connection, customers):
     """Insert customers into database"""
-    cursor = connection.cursor()
+    count = insert_frame(connection, 'customers', customers, [
+        ('customer_id', 'str'),
+        ('customer_type', 'str')
+    ], options=LOAD_CONFIG)
     
-    query = """
-        INSERT IGNORE INTO customers (customer_id, customer_type)
-        VALUES (%s, %s)
-    """
-    
-    data = customers.values.tolist()
-    cursor.executemany(query, data)
-    connection.commit()
-    
-    print(f"✓ Inserted {cursor.rowcount} customers")
-    cursor.close()
+    print(f"✓ Inserted {count} customers")
 
+@profiled()
 def insert_products(connection, products):
     """Insert products into database"""
-    cursor = connection.cursor()
+    count = insert_frame(connection, 'products', products, [
+        ('sku', 'str'),
+        ('product_name', 'str'),
+        ('category', 'str'),
+        ('unit_price', 'float')
+    ], options=LOAD_CONFIG)
     
-    query = """
-        INSERT IGNORE INTO products (sku, product_name, category, unit_price)
-        VALUES (%s, %s, %s, %s)
-    """
-    
-    data = products.values.tolist()
-    cursor.executemany(query, data)
-    connection.commit()
-    
-    print(f"✓ Inserted {cursor.rowcount} products")
-    cursor.close()
+    print(f"✓ Inserted {count} products")
 
+@profiled()
 def insert_locations(connection, locations):
     """Insert locations into database"""
-    cursor = connection.cursor()
+    count = insert_frame(connection, 'locations', locations, [
+        ('city', 'str'),
+        ('state', 'str')
+    ], options=LOAD_CONFIG)
     
-    query = """
-        INSERT IGNORE INTO locations (city, state)
-        VALUES (%s, %s)
-    """
-    
-    data = locations[['city', 'state']].values.tolist()
-    cursor.executemany(query, data)
-    connection.commit()
-    
-    print(f"✓ Inserted {cursor.rowcount} locations")
-    cursor.close()
+    print(f"✓ Inserted {count} locations")
 
+@profiled()
 def insert_discounts(connection, discounts):
     """Insert discounts into database"""
-    cursor = connection.cursor()
-    
-    query = """
-        INSERT IGNORE INTO discounts (discount_code, discount_percentage)
-        VALUES (%s, %s)
-    """
-    
-    data = discounts[['discount_code', 'discount_percentage']].values.tolist()
-    cursor.executemany(query, data)
-    connection.commit()
+    count = insert_frame(connection, 'discounts', discounts, [
+        ('discount_code', 'str'),
+        ('discount_percentage', 'float')
+    ], options=LOAD_CONFIG)
     
-    print(f"✓ Inserted {cursor.rowcount} discounts")
-    cursor.close()
+    print(f"✓ Inserted {count} discounts")
 
+@profiled()
 def insert_orders(connection, orders):
     """Insert orders into database"""
-    cursor = connection.cursor()
-    
-    query = """
-        INSERT IGNORE INTO orders 
-        (order_id, customer_id, location_id, discount_id, order_date, order_month, 
-         order_week, subtotal, discount_amount, total_amount, payment_method, source, status)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-    
-    # Convert DataFrame to list, handling NaN values
-    data = []
-    for _, row in orders.iterrows():
-        data.append([
-            row['order_id'],
-            row['customer_id'],
-            int(row['location_id']) if pd.notna(row['location_id']) else None,
-            int(row['discount_id']) if pd.notna(row['discount_id']) else None,
-            row['order_date'].date() if pd.notna(row['order_date']) else None,
-            int(row['order_month']),
-            int(row['order_week']),
-            float(row['subtotal']),
-            float(row['discount_amount']),
-            float(row['total_amount']),
-            row['payment_method'],
-            row['source'],
-            row['status']
-        ])
-    
-    cursor.executemany(query, data)
-    connection.commit()
-    
-    print(f"✓ Inserted {cursor.rowcount} orders")
-    cursor.close()
-
+    count = insert_frame(connection, 'orders', orders, [
+        ('order_id', 'str'),
+        ('customer_id', 'str'),
+        ('location_id', 'int'),
+        ('discount_id', 'int'),
+        ('order_date', 'date'),
+        ('order_month', 'int'),
+        ('order_week', 'int'),
+        ('subtotal', 'float'),
+        ('discount_amount', 'float'),
+        ('total_amount', 'float'),
+        ('payment_method', 'str'),
+        ('source', 'str'),
+        ('status', 'str')
+    ], options=LOAD_CONFIG)
+    
+    print(f"✓ Inserted {count} orders")
+
+@profiled()
 def insert_order_items(connection, order_items):
     """Insert order items into database"""
-    cursor = connection.cursor()
+    count = insert_frame(connection, 'order_items', order_items, [
+        ('order_id', 'str'),
+        ('sku', 'str'),
+        ('quantity', 'int'),
+        ('unit_price', 'float'),
+        ('line_total', 'float')
+    ], ignore=False, options=LOAD_CONFIG)
     
-    query = """
-        INSERT INTO order_items (order_id, sku, quantity, unit_price, line_total)
-        VALUES (%s, %s, %s, %s, %s)
-    """
-    
-    data = order_items.values.tolist()
-    cursor.executemany(query, data)
-    connection.commit()
-    
-    print(f"✓ Inserted {cursor.rowcount} order items")
-    cursor.close()
+    print(f"✓ Inserted {count} order items")
 
+@profiled()
 def insert_deliveries(connection, deliveries):
     """Insert deliveries into database"""
-    cursor = connection.cursor()
+    count = insert_frame(connection, 'deliveries', deliveries, [
+        ('order_id', 'str'),
+        ('warehouse', 'str'),
+        ('delivery_date', 'date'),
+        ('days_to_delivery', 'int')
+    ], options=LOAD_CONFIG)
     
-    query = """
-        INSERT IGNORE INTO deliveries (order_id, warehouse, delivery_date, days_to_delivery)
-        VALUES (%s, %s, %s, %s)
-    """
-    
-    data = []
-    for _, row in deliveries.iterrows():
-        data.append([
-            row['order_id'],
-            row['warehouse'],
-            row['delivery_date'].date() if pd.notna(row['delivery_date']) else None,
-            int(row['days_to_delivery']) if pd.notna(row['days_to_delivery']) else None
-        ])
-    
-    cursor.executemany(query, data)
-    connection.commit()
-    
-    print(f"✓ Inserted {cursor.rowcount} deliveries")
-    cursor.close()
+    print(f"✓ Inserted {count} deliveries")
 
+@profiled()
 def insert_returns(connection, returns):
     """Insert returns into database"""
-    cursor = connection.cursor()
-    
-    query = """
-        INSERT IGNORE INTO returns (order_id, return_date, return_reason, refund_status, return_window_days)
-        VALUES (%s, %s, %s, %s, %s)
+    count = insert_frame(connection, 'returns', returns, [
+        ('order_id', 'str'),
+        ('return_date', 'date'),
+        ('return_reason', 'str'),
+        ('refund_status', 'str'),
+        ('return_window_days', 'int')
+    ], options=LOAD_CONFIG)
+    
+    print(f"✓ Inserted {count} returns")
+
+# Incremental strategy per table (see etl_incremental), in foreign-key order
+INCREMENTAL = {
+    'customers': ('hash', ['customer_id']),
+    'products': ('hash', ['sku']),
+    'locations': ('hash', ['city', 'state'], ['location_id']),
+    'discounts': ('hash', ['discount_code'], ['discount_id']),
+    'orders': ('date', 'order_date', ['order_id']),
+    'order_items': ('parent', 'orders', 'order_id'),
+    'deliveries': ('parent', 'orders', 'order_id'),
+    'returns': ('parent', 'orders', 'order_id')
+}
+
+# Parquet export layout (see etl_parquet): date column each table is
+# partitioned on by year-month, and low-cardinality columns to dictionary-encode
+PARQUET_PARTITIONS = {
+    'orders': 'order_date'
+}
+
+PARQUET_DICTIONARY = {
+    'customers': ['customer_type'],
+    'products': ['category'],
+    'locations': ['state'],
+    'orders': ['payment_method', 'source', 'status'],
+    'deliveries': ['warehouse'],
+    'returns': ['return_reason', 'refund_status']
+}
+
+# Row identity per table for etl_reconcile: natural key columns (surrogate
+# ids, and the foreign keys holding them, are compared by the rows they name)
+RECONCILE_KEYS = {
+    'customers': ['customer_id'],
+    'products': ['sku'],
+    'locations': ['city', 'state'],
+    'discounts': ['discount_code'],
+    'orders': ['order_id'],
+    'order_items': ['order_id', 'sku'],
+    'deliveries': ['order_id'],
+    'returns': ['order_id']
+}
+
+# Insert function per table, in foreign-key order
+INSERTERS = {
+    'customers': insert_customers,
+    'products': insert_products,
+    'locations': insert_locations,
+    'discounts': insert_discounts,
+    'orders': insert_orders,
+    'order_items': insert_order_items,
+    'deliveries': insert_deliveries,
+    'returns': insert_returns
+}
+
+def insert_all(connection, tables, inserters=INSERTERS):
+    """Insert extracted tables (order matters due to foreign keys)"""
+    for table, inserter in inserters.items():
+        inserter(connection, tables[table])
+
+def load_tables(connection, tables, scheduler=None, tracker=None, fresh=None, checkpoint=None, part=0):
     """
+    Insert extracted tables serially, or FK level by level when a scheduler
+    is given; with an incremental tracker only the delta is inserted, and
+    with a checkpoint the rows an interrupted run committed are skipped.
+    Returns the tables sent (the delta in incremental mode).
+    """
+    inserters = checkpoint.wrap(part, INSERTERS) if checkpoint else INSERTERS
+    if tracker:
+        tables = tracker.filter(tables)
+    sent = tables
+    if fresh:
+        tables = fresh.prepare(tables)
+    if scheduler:
+        scheduler.load(tables, inserters)
+    else:
+        insert_all(connection, tables, inserters)
+    return sent
+
+# ============================================================================
+# 5. SUMMARY TABLES
+# ============================================================================
+
+SUMMARY_TABLES = {
+    'summary_daily_category_revenue': """
+        CREATE TABLE IF NOT EXISTS summary_daily_category_revenue (
+            order_date DATE NOT NULL,
+            category VARCHAR(100) NOT NULL,
+            item_count INT NOT NULL,
+            units INT NOT NULL,
+            revenue DECIMAL(14, 2) NOT NULL,
+            PRIMARY KEY (order_date, category)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'summary_customer_ltv': """
+        CREATE TABLE IF NOT EXISTS summary_customer_ltv (
+            customer_id VARCHAR(50) PRIMARY KEY,
+            order_count INT NOT NULL,
+            lifetime_value DECIMAL(14, 2) NOT NULL,
+            first_order_date DATE NOT NULL,
+            last_order_date DATE NOT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    
+    'summary_return_reasons': """
+        CREATE TABLE IF NOT EXISTS summary_return_reasons (
+            order_date DATE NOT NULL,
+            return_reason VARCHAR(100) NOT NULL,
+            order_count INT NOT NULL,
+            order_value DECIMAL(14, 2) NOT NULL,
+            PRIMARY KEY (order_date, return_reason)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+
+def _summarize_daily_category_revenue(new, tables):
+    """Items, units and line-total revenue per order date and product category"""
+    items = new['order_items'].merge(new['orders'][['order_id', 'order_date']], on='order_id')
+    items = items.merge(tables['products'][['sku', 'category']].drop_duplicates('sku'), on='sku')
+    return items.groupby(['order_date', 'category'], as_index=False).agg(
+        item_count=('sku', 'size'),
+        units=('quantity', 'sum'),
+        revenue=('line_total', 'sum')
+    )
+
+def _summarize_customer_ltv(new, tables):
+    """Orders, spend and first/last order date per customer"""
+    return new['orders'].groupby('customer_id', as_index=False).agg(
+        order_count=('order_id', 'size'),
+        lifetime_value=('total_amount', 'sum'),
+        first_order_date=('order_date', 'min'),
+        last_order_date=('order_date', 'max')
+    )
+
+def _summarize_return_reasons(new, tables):
+    """
+    Orders and order value per order date and return reason.
     
-    data = []
-    for _, row in returns.iterrows():
-        data.append([
-            row['order_id'],
-            row['return_date'].date() if pd.notna(row['return_date']) else None,
-            row['return_reason'] if pd.notna(row['return_reason']) else None,
-            row['refund_status'],
-            int(row['return_window_days']) if pd.notna(row['return_window_days']) else None
-        ])
-    
-    cursor.executemany(query, data)
-    connection.commit()
-    
-    print(f"✓ Inserted {cursor.rowcount} returns")
-    cursor.close()
+    Kept orders are counted under 'Not Returned', so the return rate for a
+    reason is its order_count over the total for the same dates.
+    """
+    orders = new['orders']
+    reasons = new['returns'].drop_duplicates('order_id').set_index('order_id')['return_reason']
+    returned = orders['order_id'].isin(reasons.index).to_numpy()
+    reason = orders['order_id'].map(reasons).astype(object).fillna('Unspecified')
+    orders = orders.assign(return_reason=reason.where(returned, 'Not Returned'))
+    return orders.groupby(['order_date', 'return_reason'], as_index=False).agg(
+        order_count=('order_id', 'size'),
+        order_value=('total_amount', 'sum')
+    )
+
+# Summary tables (see etl_summary); measures are added to (or min/max-ed
+# with) the stored values, the other columns form the key
+SUMMARIES = [
+    Summary('summary_daily_category_revenue', [
+        ('order_date', 'date'),
+        ('category', 'str'),
+        ('item_count', 'int'),
+        ('units', 'int'),
+        ('revenue', 'float')
+    ], {'item_count': 'sum', 'units': 'sum', 'revenue': 'sum'}, _summarize_daily_category_revenue),
+    Summary('summary_customer_ltv', [
+        ('customer_id', 'str'),
+        ('order_count', 'int'),
+        ('lifetime_value', 'float'),
+        ('first_order_date', 'date'),
+        ('last_order_date', 'date')
+    ], {'order_count': 'sum', 'lifetime_value': 'sum', 'first_order_date': 'min', 'last_order_date': 'max'},
+       _summarize_customer_ltv),
+    Summary('summary_return_reasons', [
+        ('order_date', 'date'),
+        ('return_reason', 'str'),
+        ('order_count', 'int'),
+        ('order_value', 'float')
+    ], {'order_count': 'sum', 'order_value': 'sum'}, _summarize_return_reasons)
+]
+
+# Fact rows each load adds to the summaries: orders dated past the
+# summary watermark (order ids are not issued in date order), and the
+# items/returns of those orders
+SUMMARY_FACTS = {
+    'orders': ('date', 'order_date', 'order_id'),
+    'order_items': ('parent', 'orders', 'order_id'),
+    'returns': ('parent', 'orders', 'order_id')
+}
 
 # ============================================================================
-# 5. VERIFICATION QUERIES
+# 6. VERIFICATION QUERIES
 # ============================================================================
 
-def verify_data(connection):
-    """Verify data was inserted correctly"""
+# Aggregates checked after every load (see etl_verify): numeric columns
+# summed and date columns ranged, per table
+VERIFY_AGGREGATES = {
+    'customers': ([], []),
+    'products': (['unit_price'], []),
+    'locations': ([], []),
+    'discounts': (['discount_percentage'], []),
+    'orders': (['subtotal', 'discount_amount', 'total_amount'], ['order_date']),
+    'order_items': (['quantity', 'unit_price', 'line_total'], []),
+    'deliveries': (['days_to_delivery'], ['delivery_date']),
+    'returns': (['return_window_days'], ['return_date'])
+}
+
+@profiled()
+def verify_data(connection, verifier):
+    """Verify the loaded tables against the aggregates of the extracted frames"""
     
     print("\n" + "="*80)
     print("DATA VERIFICATION")
     print("="*80)
     
-    cursor = connection.cursor()
-    
-    tables = ['customers', 'products', 'locations', 'discounts', 
-              'orders', 'order_items', 'deliveries', 'returns']
-    
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
-        print(f"✓ {table.upper()}: {count} records")
-    
-    cursor.close()
+    return verifier.verify(connection)
 
-def run_sample_queries(connection):
-    """Run sample queries to demonstrate the normalized structure"""
-    
-    print("\n" + "="*80)
-    print("SAMPLE QUERIES")
-    print("="*80)
-    
-    cursor = connection.cursor()
-    
-    # Query 1: Order with full details
-    print("\n1. Sample Order with Full Details:")
-    query1 = """
+# Reporting queries, run by run_sample_queries and checked by etl_index_advisor
+# (name: (title, SQL)); SUMMARY_QUERIES read the summary tables
+REPORT_QUERIES = {
+    'order_details': ("Sample Order with Full Details", """
         SELECT 
             o.order_id,
             c.customer_id,
@@ -521,14 +708,9 @@ def run_sample_queries(connection):
         JOIN products p ON oi.sku = p.sku
         JOIN locations l ON o.location_id = l.location_id
         LIMIT 5
-    """
-    cursor.execute(query1)
-    for row in cursor.fetchall():
-        print(f"   {row}")
+    """),
     
-    # Query 2: Revenue by category
-    print("\n2. Revenue by Category:")
-    query2 = """
+    'revenue_by_category': ("Revenue by Category", """
         SELECT 
             p.category,
             COUNT(DISTINCT o.order_id) as order_count,
@@ -539,14 +721,9 @@ def run_sample_queries(connection):
         JOIN products p ON oi.sku = p.sku
         GROUP BY p.category
         ORDER BY total_revenue DESC
-    """
-    cursor.execute(query2)
-    for row in cursor.fetchall():
-        print(f"   {row}")
+    """),
     
-    # Query 3: Top customers
-    print("\n3. Top 5 Customers by Spending:")
-    query3 = """
+    'top_customers': ("Top 5 Customers by Spending", """
         SELECT 
             c.customer_id,
             c.customer_type,
@@ -557,18 +734,55 @@ def run_sample_queries(connection):
         GROUP BY c.customer_id, c.customer_type
         ORDER BY lifetime_value DESC
         LIMIT 5
+    """)
+}
+
+SUMMARY_QUERIES = {
+    'return_rate_by_reason': ("Return Rate by Reason (summary_return_reasons)", """
+        SELECT 
+            return_reason,
+            SUM(order_count) as returned_orders,
+            ROUND(100.0 * SUM(order_count) / (SELECT SUM(order_count) FROM summary_return_reasons), 2) as return_rate_pct
+        FROM summary_return_reasons
+        WHERE return_reason <> 'Not Returned'
+        GROUP BY return_reason
+        ORDER BY returned_orders DESC
+    """)
+}
+
+@profiled()
+def run_sample_queries(connection, backend, cache=None):
+    """
+    Run sample queries to demonstrate the normalized structure (through the
+    query cache if given, otherwise streamed in fetchmany batches)
     """
-    cursor.execute(query3)
-    for row in cursor.fetchall():
-        print(f"   {row}")
     
-    cursor.close()
+    print("\n" + "="*80)
+    print("SAMPLE QUERIES")
+    print("="*80)
+    
+    queries = dict(REPORT_QUERIES)
+    if LOAD_CONFIG['summaries']:
+        queries.update(SUMMARY_QUERIES)
+    
+    for i, (title, query) in enumerate(queries.values(), 1):
+        print(f"\n{i}. {title}:")
+        if cache:
+            batches = [cache.fetch(query)]
+        else:
+            batches = ResultStream(connection, backend, query, batch_rows=LOAD_CONFIG['stream_batch_rows'])
+        for rows in batches:
+            for row in rows:
+                print(f"   {row}")
+    
+    if cache:
+        cache.report()
 
 # ============================================================================
-# 6. MAIN EXECUTION
+# 7. MAIN EXECUTION
 # ============================================================================
 
-def main():
+def main(file_path=None):
     """Main function to orchestrate the entire ETL process"""
     
     print("\n" + "="*80)
@@ -576,57 +790,172 @@ def main():
     print("="*80)
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # File path
-    file_path = 'Data\Data Analysis.xlsx'
-    
-    # Step 1: Connect to MySQL
-    print("\n[STEP 1] Connecting to MySQL...")
-    connection = create_connection(DB_CONFIG)
-    if not connection:
-        return
-    
-    # Step 2: Create database
-    print("\n[STEP 2] Creating database...")
-    if not create_database(connection, DB_CONFIG['database']):
-        return
+    if LOAD_CONFIG['profile_report'] or LOAD_CONFIG['profile_table']:
+        PROFILER.enable()
+    
+    # File path (bench_etl.py passes generated workbooks)
+    file_path = file_path or 'Data\Data Analysis.xlsx'
+    
+    # SQLite/DuckDB load into a local file; MySQL needs a server and database
+    backend = get_backend(LOAD_CONFIG['backend'])
+    mysql = backend.name == 'mysql'
+    if not mysql:
+        # Steps 1-2: Open the database file
+        print(f"\n[STEP 1-2] Opening {backend.name} database...")
+        db_path = LOAD_CONFIG['backend_path'] or f"{DB_CONFIG['database']}.{backend.name}"
+        connection = backend.connect(db_path)
+        factory = None
+        print(f"✓ Opened {db_path} (LOAD DATA, parallel, fresh-load and incremental modes are MySQL-only)")
+    else:
+        # Step 1: Connect to MySQL
+        print("\n[STEP 1] Connecting to MySQL...")
+        factory = ConnectionFactory(
+            DB_CONFIG, pool_size=LOAD_CONFIG['parallel_workers'] + 1,
+            compress=LOAD_CONFIG['compress'], allow_local_infile=LOAD_CONFIG['bulk_load']
+        )
+        connection = create_connection(factory)
+        if not connection:
+            return
+        
+        # Step 2: Create database
+        print("\n[STEP 2] Creating database...")
+        if not create_database(connection, DB_CONFIG['database']):
+            return
+        
+        # The rest of the run uses pooled connections bound to the database
+        connection.close()
+        connection = connect_database(factory)
+        if not connection:
+            return
     
-    # Step 3: Create tables
+    # Step 3: Create tables (fresh-load mode defers secondary indexes and FKs)
     print("\n[STEP 3] Creating tables...")
-    if not create_tables(connection):
+    fresh = None
+    if LOAD_CONFIG['fresh_load'] and mysql:
+        # Unique checks can only be skipped when every table arrives in one piece
+        fresh = FreshLoad(TABLES, disable_unique_checks=not LOAD_CONFIG['chunk_size'])
+        if fresh.create_tables(connection):
+            fresh.begin(connection)
+        else:
+            print("  Falling back to a regular load")
+            fresh = None
+    if not fresh and not create_tables(connection):
         return
-    
-    # Step 4: Load and transform data
-    print("\n[STEP 4] Loading and transforming data...")
-    df = load_and_transform_data(file_path)
-    
-    customers = extract_customers(df)
-    products = extract_products(df)
-    locations = extract_locations(df)
-    discounts = extract_discounts(df)
-    orders = extract_orders(df, locations, discounts)
-    order_items = extract_order_items(df)
-    deliveries = extract_deliveries(df)
-    returns = extract_returns(df)
-    
-    # Step 5: Insert data (order matters due to foreign keys)
-    print("\n[STEP 5] Inserting data into database...")
-    insert_customers(connection, customers)
-    insert_products(connection, products)
-    insert_locations(connection, locations)
-    insert_discounts(connection, discounts)
-    insert_orders(connection, orders)
-    insert_order_items(connection, order_items)
-    insert_deliveries(connection, deliveries)
-    insert_returns(connection, returns)
-    
-    # Step 6: Verify data
-    verify_data(connection)
+    if mysql and not fresh:
+        # Indexes/FKs an interrupted fresh load never built
+        complete_deferred(connection, TABLES)
+    
+    # Query cache: every table gets a data version that committed inserts bump
+    query_cache = None
+    if LOAD_CONFIG['query_cache']:
+        cached_tables = list(TABLES) + list(SUMMARY_TABLES)
+        create_version_table(connection, backend, cached_tables)
+        if mysql:
+            namespace = f"mysql://{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+        else:
+            namespace = f"{backend.name}://{os.path.abspath(db_path)}"
+        query_cache = QueryCache(connection, backend, cached_tables, namespace,
+                                 LOAD_CONFIG['query_cache_dir'], LOAD_CONFIG['query_cache_ttl'])
+    
+    # Parallel mode: a small pool of extra connections loads independent tables together
+    def open_worker_connection():
+        worker = connect_database(factory)
+        return fresh.begin(worker) if fresh and worker else worker
+    
+    scheduler = None
+    if LOAD_CONFIG['parallel_workers'] > 1 and mysql:
+        scheduler = LevelScheduler(open_worker_connection, TABLES, workers=LOAD_CONFIG['parallel_workers'])
+    
+    # Incremental mode: compare against the watermarks/hashes from the last run
+    tracker = IncrementalTracker(connection, INCREMENTAL) if LOAD_CONFIG['incremental'] and mysql else None
+    
+    # Summary tables: the new fact rows of each load are aggregated into them
+    summaries = None
+    if LOAD_CONFIG['summaries']:
+        summaries = SummaryTables(connection, SUMMARIES, SUMMARY_TABLES, SUMMARY_FACTS, LOAD_CONFIG)
+    
+    # Parquet export: the extracted frames are also written as a partitioned dataset
+    sink = None
+    if LOAD_CONFIG['parquet_dir']:
+        sink = ParquetSink(LOAD_CONFIG['parquet_dir'], TABLES, PARQUET_PARTITIONS, PARQUET_DICTIONARY)
+    
+    # Resumable mode: committed tables and rows are recorded as the load goes,
+    # and a rerun after a crash picks up where the last one stopped
+    checkpoint = None
+    if LOAD_CONFIG['resumable']:
+        checkpoint = Checkpoint(connection, 'data_load', source_key(file_path, LOAD_CONFIG['chunk_size']),
+                                LOAD_CONFIG, LOAD_CONFIG['checkpoint_rows'])
+    
+    # Verification: the tables' aggregates now, and those of every frame loaded
+    verifier = LoadVerifier(connection, TABLES, VERIFY_AGGREGATES, resumed=bool(checkpoint and checkpoint.resuming))
+    
+    chunk_size = LOAD_CONFIG['chunk_size']
+    if chunk_size:
+        # Steps 4-5: Stream the file, extracting and inserting one block at a time
+        print("\n[STEP 4-5] Streaming, transforming and inserting data...")
+        normalizer = Normalizer(NORMALIZATION)
+        for i, chunk in enumerate(iter_transformed_chunks(file_path, chunk_size), 1):
+            print(f"\n--- Chunk {i} ({len(chunk)} rows) ---")
+            if checkpoint and checkpoint.done(i, 'part'):
+                print("✓ Already loaded by the interrupted run, skipped")
+                continue
+            resolve_surrogate_keys(connection, normalizer, chunk, INSERTERS)
+            tables = extract_all(chunk, normalizer)
+            # Locations/discounts were inserted by resolve_surrogate_keys
+            surrogates = surrogate_rows(normalizer, chunk)
+            if sink:
+                sink.write({**tables, **surrogates})
+            sent = load_tables(connection, tables, scheduler, tracker, fresh, checkpoint, part=i)
+            verifier.add({**sent, **surrogates}, delta=bool(tracker))
+            if summaries:
+                summaries.update(tables, checkpoint, part=i)
+            if checkpoint:
+                checkpoint.mark_done(i)
+    else:
+        # Step 4: Load and transform data
+        print("\n[STEP 4] Loading and transforming data...")
+        df = load_and_transform_data(file_path)
+        
+        # Insert new locations/discounts first and use the ids MySQL assigned
+        normalizer = Normalizer(NORMALIZATION)
+        resolve_surrogate_keys(connection, normalizer, df, INSERTERS)
+        tables = extract_all(df, normalizer)
+        # Locations/discounts were inserted by resolve_surrogate_keys
+        surrogates = surrogate_rows(normalizer, df)
+        if sink:
+            sink.write({**tables, **surrogates})
+        
+        # Step 5: Insert data (order matters due to foreign keys), then
+        # aggregate the new rows into the summaries
+        print("\n[STEP 5] Inserting data into database...")
+        sent = load_tables(connection, tables, scheduler, tracker, fresh, checkpoint)
+        verifier.add({**sent, **surrogates}, delta=bool(tracker))
+        if summaries:
+            summaries.update(tables, checkpoint)
+    
+    if tracker:
+        tracker.save()
+    if scheduler:
+        scheduler.close()
+    if fresh:
+        fresh.finish(connection)
+    if sink:
+        sink.close()
+    if checkpoint:
+        checkpoint.finish()
+    
+    # Step 6: Verify data (a mismatch fails the run)
+    if not verify_data(connection, verifier):
+        connection.close()
+        print("\n✗ Loaded tables do not match the extracted data")
+        sys.exit(1)
     
     # Step 7: Run sample queries
-    run_sample_queries(connection)
+    run_sample_queries(connection, backend, query_cache)
     
     # Close connection
     connection.close()
+    PROFILER.finish('data_load', LOAD_CONFIG['profile_report'], LOAD_CONFIG['profile_table'])
     print("\n" + "="*80)
     print("✓ PROCESS COMPLETED SUCCESSFULLY!")
     print("="*80)
@@ -0,0 +1,282 @@
+"""
+Database Backends
+One interface for the loaders' DDL, bulk inserts and upserts, with MySQL
+(the default), SQLite and DuckDB implementations selected per run through
+LOAD_CONFIG['backend'] (shared by data_load.py and retail_sales_load.py)
+
+The loaders keep a single MySQL-dialect TABLES dict; SQLite and DuckDB
+statements are translated from it.
+"""
+
+import re
+import sqlite3
+import weakref
+from datetime import date, datetime
+import pandas as pd
+from mysql.connector import Error
+from etl_convert import to_db_rows, typed_column
+from etl_query_cache import bump_version
+from etl_writer import insert_frame as mysql_insert_frame
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Errors any backend may raise, for the loaders' except clauses
+DATABASE_ERRORS = (Error, sqlite3.Error) + ((duckdb.Error,) if duckdb else ())
+
+# sqlite3's implicit date adapters are deprecated; store ISO strings as MySQL prints them
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+# ============================================================================
+# 1. DDL TRANSLATION
+# ============================================================================
+
+INDEX_LINE = re.compile(r'^\s*(?:INDEX|KEY)\s+(\w+)\s*\(([^)]*)\)', re.IGNORECASE)
+UNIQUE_KEY_LINE = re.compile(r'^(\s*)UNIQUE\s+(?:KEY|INDEX)\s+\w+\s*(\([^)]*\))', re.IGNORECASE)
+ENUM_COLUMN = re.compile(r"^(\s*)(\w+)\s+ENUM\s*\(([^)]*)\)(.*?)(,?)\s*$", re.IGNORECASE)
+AUTO_INCREMENT_COLUMN = re.compile(r'^(\s*)(\w+)\s+(?:BIG)?INT\w*\s+AUTO_INCREMENT\s+PRIMARY\s+KEY', re.IGNORECASE)
+TABLE_OPTIONS = re.compile(r'^(\s*\))\s*ENGINE\s*=.*$', re.IGNORECASE)
+
+def translate_ddl(table, ddl, dialect, indexes=True):
+    """
+    Translate a MySQL CREATE TABLE into a list of 'sqlite' or 'duckdb' statements.
+
+    ENUMs become VARCHAR with a CHECK constraint, AUTO_INCREMENT keys become
+    INTEGER PRIMARY KEY (SQLite) or a sequence default (DuckDB), inline
+    INDEX definitions become CREATE INDEX statements named <table>_<index>
+    (or are dropped with indexes=False), and table options are dropped. DuckDB does not support cascading
+    foreign keys, so ON DELETE CASCADE is removed there.
+    """
+    before, lines, after = [], [], []
+    for line in ddl.strip().split('\n'):
+        index = INDEX_LINE.match(line)
+        if index:
+            if indexes:
+                after.append(f"CREATE INDEX IF NOT EXISTS {table}_{index.group(1)} ON {table} ({index.group(2)})")
+            continue
+
+        line = TABLE_OPTIONS.sub(r'\1', line)
+        line = UNIQUE_KEY_LINE.sub(r'\1UNIQUE \2', line)
+        line = re.sub(r'\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP', '', line, flags=re.IGNORECASE)
+
+        enum = ENUM_COLUMN.match(line)
+        if enum:
+            indent, column, values, rest, comma = enum.groups()
+            width = max(len(value.strip(" '")) for value in values.split(','))
+            line = f"{indent}{column} VARCHAR({width}){rest} CHECK ({column} IN ({values})){comma}"
+
+        auto = AUTO_INCREMENT_COLUMN.match(line)
+        if auto:
+            indent, column = auto.groups()
+            if dialect == 'sqlite':
+                replacement = f"{indent}{column} INTEGER PRIMARY KEY AUTOINCREMENT"
+            else:
+                sequence = f"{table}_{column}_seq"
+                before.append(f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+                replacement = f"{indent}{column} INTEGER PRIMARY KEY DEFAULT nextval('{sequence}')"
+            line = AUTO_INCREMENT_COLUMN.sub(replacement, line)
+
+        if dialect == 'duckdb':
+            line = re.sub(r'\s+ON\s+DELETE\s+CASCADE', '', line, flags=re.IGNORECASE)
+        lines.append(line)
+
+    # The last definition before the closing ')' must not end in a comma
+    for i in range(len(lines) - 1, 0, -1):
+        if lines[i].strip().startswith(')'):
+            lines[i - 1] = lines[i - 1].rstrip().rstrip(',')
+            break
+    return before + ['\n'.join(lines)] + after
+
+# ============================================================================
+# 2. BACKENDS
+# ============================================================================
+
+class MySQLBackend:
+    """The loaders' native target: DDL as written, inserts via etl_writer"""
+
+    name = 'mysql'
+    param = '%s'
+
+    def table_statements(self, table, ddl):
+        return [ddl]
+
+    def insert_frame(self, connection, table, df, schema, ignore=True, options=None):
+        return mysql_insert_frame(connection, table, df, schema, ignore, options)
+
+class LocalBackend:
+    """
+    Shared logic for the embedded (single-file) backends.
+
+    Conflict keys (primary and unique column sets) are read from the
+    database once per table; an insert skips rows whose key exists, like
+    INSERT IGNORE, frames flagged df.attrs['upsert'] update them and
+    df.attrs['accumulate'] columns are combined with the stored values.
+    Subclasses provide connect(path) and key_sets(connection, table).
+    """
+
+    name = None
+    param = '?'
+    accumulate_sql = None
+
+    def __init__(self):
+        # Held weakly per connection object: a closed connection's id() can be
+        # reused by the next one, which must not inherit its key sets
+        self._keys = weakref.WeakKeyDictionary()
+
+    def table_statements(self, table, ddl):
+        return translate_ddl(table, ddl, self.name)
+
+    def conflict_key(self, connection, table, columns):
+        """First primary/unique column set fully present in columns (None if there is none)"""
+        try:
+            known = self._keys.setdefault(connection, {})
+        except TypeError:
+            # Not weakly referenceable (a plain sqlite3.Connection): read the keys each time
+            known = {}
+        if table not in known:
+            known[table] = self.key_sets(connection, table)
+        for key in known[table]:
+            if set(key) <= set(columns):
+                return key
+        return None
+
+    def insert_query(self, table, columns, source, key, ignore, upsert, accumulate=None):
+        """INSERT ... <source> with IGNORE / upsert semantics for the conflict key"""
+        accumulate = accumulate or {}
+        query = f"INSERT INTO {table} ({', '.join(columns)}) {source}"
+        if upsert and key:
+            updates = ', '.join(
+                f"{col} = " + self.accumulate_sql[accumulate[col]].format(col=col) if col in accumulate
+                else f"{col} = excluded.{col}"
+                for col in columns if col not in key
+            )
+            return query + f" ON CONFLICT ({', '.join(key)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        if ignore:
+            return query + " ON CONFLICT DO NOTHING"
+        return query
+
+class SQLiteConnection(sqlite3.Connection):
+    """sqlite3 connection that per-connection caches can reference weakly"""
+
+class SQLiteBackend(LocalBackend):
+    """SQLite file target; rows are sent with executemany in one transaction"""
+
+    name = 'sqlite'
+    accumulate_sql = {
+        'sum': '{col} + excluded.{col}',
+        'min': 'MIN({col}, excluded.{col})',
+        'max': 'MAX({col}, excluded.{col})'
+    }
+
+    def connect(self, path):
+        connection = sqlite3.connect(path, factory=SQLiteConnection)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def key_sets(self, connection, table):
+        info = connection.execute(f"PRAGMA table_info({table})").fetchall()
+        keys = [[row[1] for row in sorted(info, key=lambda row: row[5]) if row[5]]]
+        for index in connection.execute(f"PRAGMA index_list({table})").fetchall():
+            if index[2]:
+                keys.append([row[2] for row in connection.execute(f"PRAGMA index_info({index[1]})")])
+        return [key for key in keys if key]
+
+    def insert_frame(self, connection, table, df, schema, ignore=True, options=None):
+        columns = [column for column, _ in schema]
+        key = self.conflict_key(connection, table, columns)
+        values = f"VALUES ({', '.join(['?'] * len(columns))})"
+        accumulate = df.attrs.get('accumulate')
+        upsert = df.attrs.get('upsert', False) or bool(accumulate)
+        query = self.insert_query(table, columns, values, key, ignore, upsert, accumulate)
+
+        before = connection.total_changes
+        connection.executemany(query, to_db_rows(df, schema))
+        connection.commit()
+        count = connection.total_changes - before
+        print(f"  {table}: {len(df)} rows via executemany ({count} written)")
+        return count
+
+class DuckDBBackend(LocalBackend):
+    """DuckDB file target; frames are appended column-wise from a registered DataFrame"""
+
+    name = 'duckdb'
+    accumulate_sql = {
+        'sum': '{col} + excluded.{col}',
+        'min': 'LEAST({col}, excluded.{col})',
+        'max': 'GREATEST({col}, excluded.{col})'
+    }
+
+    def table_statements(self, table, ddl):
+        # Secondary ART indexes slow appends several-fold and DuckDB's
+        # min/max zone maps already serve the analytical queries; keys and
+        # foreign keys are kept
+        return translate_ddl(table, ddl, self.name, indexes=False)
+
+    def connect(self, path):
+        if duckdb is None:
+            raise ImportError("The duckdb backend needs the duckdb package (pip install duckdb)")
+        return duckdb.connect(path)
+
+    def key_sets(self, connection, table):
+        rows = connection.execute(
+            "SELECT constraint_column_names FROM duckdb_constraints() "
+            "WHERE table_name = ? AND constraint_type IN ('PRIMARY KEY', 'UNIQUE') "
+            "ORDER BY constraint_type = 'UNIQUE'", [table]
+        ).fetchall()
+        return [list(row[0]) for row in rows]
+
+    def insert_frame(self, connection, table, df, schema, ignore=True, options=None):
+        columns = [column for column, _ in schema]
+        frame = pd.DataFrame({column: typed_column(df[column], kind) for column, kind in schema})
+        key = self.conflict_key(connection, table, columns)
+        accumulate = df.attrs.get('accumulate')
+        upsert = df.attrs.get('upsert', False) or bool(accumulate)
+
+        # DuckDB rejects conflicts inside a single statement, so keep the first
+        # row per key as INSERT IGNORE would (the last one when upserting)
+        if key:
+            frame = frame.drop_duplicates(subset=key, keep='last' if upsert else 'first')
+
+        view = f"_etl_{table}"
+        connection.register(view, frame)
+        try:
+            source = f"SELECT {', '.join(columns)} FROM {view}"
+            query = self.insert_query(table, columns, source, key, ignore, upsert, accumulate)
+            count = connection.execute(query).fetchone()[0]
+        finally:
+            connection.unregister(view)
+        print(f"  {table}: {len(df)} rows appended column-wise ({count} written)")
+        return count
+
+BACKENDS = {
+    'mysql': MySQLBackend(),
+    'sqlite': SQLiteBackend(),
+    'duckdb': DuckDBBackend()
+}
+
+def get_backend(name):
+    try:
+        return BACKENDS[name or 'mysql']
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}' (expected one of {', '.join(BACKENDS)})") from None
+
+def insert_frame(connection, table, df, schema, ignore=True, options=None):
+    """
+    Insert a DataFrame through the backend named by options['backend'].
+
+    options is the loader's LOAD_CONFIG; MySQL (the default) keeps every
+    etl_writer feature (LOCAL INFILE, auto-sized batches, retries). With
+    options['query_cache'] set, a table's data version is bumped whenever
+    rows were written to it (see etl_query_cache).
+    """
+    options = options or {}
+    backend = get_backend(options.get('backend'))
+    count = backend.insert_frame(connection, table, df, schema, ignore, options)
+    if count and options.get('query_cache'):
+        bump_version(connection, table, backend)
+    return count
@@ -0,0 +1,202 @@
+"""
+Parsed-input Cache
+Stores the already-typed DataFrame produced from a source workbook on disk
+(Feather, via pyarrow) so repeated runs skip read_excel and date parsing
+(shared by data_load.py and retail_sales_load.py)
+
+Usage: python src/etl_cache.py [list | clear [source_file]] [--dir CACHE_DIR]
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+import pandas as pd
+
+CACHE_DIR = '.etl_cache'
+MAX_CACHE_MB = 2048
+INDEX_FILE = 'index.json'
+HASH_BLOCK = 1 << 20
+
+def file_sha256(file_path):
+    """Content hash of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def function_fingerprint(func):
+    """Short hash of a function's source, so cache entries expire when the transform changes"""
+    return hashlib.sha256(inspect.getsource(func).encode('utf-8')).hexdigest()[:12]
+
+class FrameCache:
+    """
+    Size-bounded on-disk cache of typed DataFrames keyed by source file.
+
+    An entry is keyed by the source's absolute path, size, mtime and content
+    hash plus a caller-supplied variant (sheet, transform version). The
+    content hash is only recomputed when size or mtime change. Entries are
+    evicted least-recently-used first once the cache exceeds max_mb.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_mb=MAX_CACHE_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._read_index()
+
+    # ------------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------------
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self._index_path())
+
+    def _source_identity(self, file_path):
+        """(absolute path, size, mtime_ns, sha256) of the source, reusing a known hash if unchanged"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        for entry in self.index.values():
+            if (entry['source'], entry['size'], entry['mtime_ns']) == (path, stat.st_size, stat.st_mtime_ns):
+                return path, stat.st_size, stat.st_mtime_ns, entry['sha256']
+        return path, stat.st_size, stat.st_mtime_ns, file_sha256(path)
+
+    @staticmethod
+    def _key(path, size, mtime_ns, sha256, variant):
+        raw = f"{path}|{size}|{mtime_ns}|{sha256}|{variant}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:24]
+
+    # ------------------------------------------------------------------------
+    # Get / put
+    # ------------------------------------------------------------------------
+
+    def get(self, file_path, variant=''):
+        """Return the cached DataFrame for this source + variant, or None"""
+        key = self._key(*self._source_identity(file_path), variant)
+        entry = self.index.get(key)
+        data_path = os.path.join(self.cache_dir, entry['file']) if entry else None
+        if entry is None or not os.path.exists(data_path):
+            self.misses += 1
+            return None
+
+        if entry['format'] == 'feather':
+            df = pd.read_feather(data_path)
+        else:
+            df = pd.read_pickle(data_path)
+        entry['last_used'] = time.time()
+        self._write_index()
+        self.hits += 1
+        return df
+
+    def put(self, file_path, df, variant=''):
+        """Store a DataFrame for this source + variant, then evict down to the size bound"""
+        path, size, mtime_ns, sha256 = self._source_identity(file_path)
+        key = self._key(path, size, mtime_ns, sha256, variant)
+
+        # Feather keeps dtypes (including datetime64) and loads fast; columns
+        # mixing Python types (e.g. strings and dates) cannot be written to
+        # Arrow, so those frames fall back to pickle
+        try:
+            file_name, fmt = f"{key}.feather", 'feather'
+            df.reset_index(drop=True).to_feather(os.path.join(self.cache_dir, file_name))
+        except Exception:
+            if os.path.exists(os.path.join(self.cache_dir, file_name)):
+                os.remove(os.path.join(self.cache_dir, file_name))
+            file_name, fmt = f"{key}.pkl", 'pickle'
+            df.to_pickle(os.path.join(self.cache_dir, file_name))
+
+        self.index[key] = {
+            'source': path,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'sha256': sha256,
+            'variant': variant,
+            'file': file_name,
+            'format': fmt,
+            'bytes': os.path.getsize(os.path.join(self.cache_dir, file_name)),
+            'last_used': time.time()
+        }
+        self.evict()
+        self._write_index()
+
+    def get_or_build(self, file_path, build, variant=''):
+        """Return the cached frame, or call build(), cache its result and return it"""
+        df = self.get(file_path, variant)
+        if df is not None:
+            print(f"✓ Loaded {len(df)} rows from cache ({self.cache_dir})")
+            return df
+        df = build()
+        self.put(file_path, df, variant)
+        print(f"✓ Cached parsed frame for {file_path}")
+        return df
+
+    # ------------------------------------------------------------------------
+    # Invalidation & eviction
+    # ------------------------------------------------------------------------
+
+    def _remove(self, key):
+        entry = self.index.pop(key)
+        try:
+            os.remove(os.path.join(self.cache_dir, entry['file']))
+        except OSError:
+            pass
+
+    def invalidate(self, file_path=None):
+        """Drop every entry for one source file, or the whole cache; returns entries removed"""
+        source = os.path.abspath(file_path) if file_path else None
+        keys = [key for key, entry in self.index.items() if source is None or entry['source'] == source]
+        for key in keys:
+            self._remove(key)
+        self._write_index()
+        return len(keys)
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self.index.values())
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits in max_bytes"""
+        by_age = sorted(self.index, key=lambda key: self.index[key]['last_used'])
+        while by_age and self.total_bytes() > self.max_bytes:
+            self._remove(by_age.pop(0))
+
+def main():
+    args = sys.argv[1:]
+    cache_dir = CACHE_DIR
+    if '--dir' in args:
+        i = args.index('--dir')
+        cache_dir = args[i + 1]
+        del args[i:i + 2]
+    cache = FrameCache(cache_dir)
+
+    command = args[0] if args else 'list'
+    if command == 'clear':
+        removed = cache.invalidate(args[1] if len(args) > 1 else None)
+        print(f"✓ Removed {removed} cache entries from {cache_dir}")
+    elif command == 'list':
+        for key, entry in cache.index.items():
+            print(f"{key}  {entry['bytes'] / 1e6:8.1f} MB  {entry['format']:<7}  "
+                  f"{entry['variant']:<30}  {entry['source']}")
+        print(f"{len(cache.index)} entries, {cache.total_bytes() / 1e6:.1f} MB / {cache.max_bytes / 1e6:.0f} MB")
+    else:
+        print(__doc__)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Resumable Loads
+Records in run-state tables which steps (table inserts, summary updates)
+a load has committed, and how many rows of each table, so a run restarted
+after a crash skips finished work and resumes each table from its last
+committed segment
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import hashlib
+import os
+import threading
+from etl_backends import get_backend
+from etl_connection import RETRIES, DeferredCommit, run_with_retry
+from etl_writer import multirow_query
+
+RUN_STATE_TABLES = {
+    'etl_runs': """
+        CREATE TABLE IF NOT EXISTS etl_runs (
+            loader VARCHAR(64) PRIMARY KEY,
+            source_key CHAR(64) NOT NULL,
+            status ENUM('running', 'complete') NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'etl_run_state': """
+        CREATE TABLE IF NOT EXISTS etl_run_state (
+            loader VARCHAR(64) NOT NULL,
+            part INT NOT NULL,
+            step VARCHAR(64) NOT NULL,
+            rows_done BIGINT NOT NULL,
+            completed BOOLEAN NOT NULL,
+            PRIMARY KEY (loader, part, step)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+
+RUN_STATE_COLUMNS = ['loader', 'part', 'step', 'rows_done', 'completed']
+RUN_STATE_KEY = ['loader', 'part', 'step']
+
+SEGMENT_ROWS = 50000
+
+# Step recorded once everything of a part is done
+PART_STEP = 'part'
+
+def source_key(file_path, chunk_size):
+    """
+    Identity of one load's input: the file's path, size and mtime plus the
+    chunk size (chunk numbers only line up when the blocks are cut the same)
+    """
+    stat = os.stat(file_path)
+    raw = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{chunk_size}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class Checkpoint:
+    """
+    Run state of one loader against one database.
+
+    A part is the whole file (part 0) or one streamed chunk (1, 2, ...);
+    its steps are the table inserts plus whatever the loader marks with
+    mark_done(). Tables are inserted in segments of segment_rows, and each
+    segment commits in one transaction with the row count it reaches, so a
+    restarted run resumes exactly after the last committed segment and
+    never re-sends its rows (order_items has no natural key to skip them
+    by). State is kept only while the same source is being loaded: a
+    finished run, or a changed file, starts over.
+    """
+
+    def __init__(self, connection, loader, source, options, segment_rows=SEGMENT_ROWS):
+        self.connection = connection
+        self.loader = loader
+        self.segment_rows = segment_rows
+        self.retries = options.get('retries', RETRIES)
+        self.backend = get_backend(options.get('backend'))
+        self.param = self.backend.param
+        self.lock = threading.Lock()
+        self.progress = {}
+
+        cursor = connection.cursor()
+        try:
+            for table_name, create_statement in RUN_STATE_TABLES.items():
+                for statement in self.backend.table_statements(table_name, create_statement):
+                    cursor.execute(statement)
+
+            cursor.execute(f"SELECT source_key, status FROM etl_runs WHERE loader = {self.param}", (loader,))
+            run = cursor.fetchone()
+            self.resuming = bool(run) and run[0] == source and run[1] == 'running'
+            if self.resuming:
+                cursor.execute(f"SELECT part, step, rows_done, completed FROM etl_run_state "
+                               f"WHERE loader = {self.param}", (loader,))
+                self.progress = {(part, step): (rows_done, bool(completed))
+                                 for part, step, rows_done, completed in cursor.fetchall()}
+            else:
+                cursor.execute(f"DELETE FROM etl_run_state WHERE loader = {self.param}", (loader,))
+                cursor.execute(f"DELETE FROM etl_runs WHERE loader = {self.param}", (loader,))
+                cursor.execute(f"INSERT INTO etl_runs (loader, source_key, status) "
+                               f"VALUES ({self.param}, {self.param}, 'running')", (loader, source))
+            connection.commit()
+        finally:
+            cursor.close()
+
+        if self.resuming:
+            done = sum(completed for (_, step), (_, completed) in self.progress.items() if step == PART_STEP)
+            print(f"✓ Resuming the interrupted {loader} run ({done} parts already complete)")
+        else:
+            print(f"✓ Run state recorded for {loader} (checkpoint every {segment_rows} rows)")
+
+    def done(self, part, step):
+        """True if this step of the part was completed (by this or an earlier attempt)"""
+        return self.progress.get((part, step), (0, False))[1]
+
+    def mark_done(self, part, step=PART_STEP):
+        """Record a step (by default the whole part) as completed"""
+        self._record(part, step, 0, True)
+
+    def _state_query(self):
+        """Upsert of one etl_run_state row (no DELETE first: its gap locks deadlock parallel workers)"""
+        if self.backend.name == 'mysql':
+            return multirow_query('etl_run_state', RUN_STATE_COLUMNS, 1, upsert=True)
+        values = f"VALUES ({', '.join([self.param] * len(RUN_STATE_COLUMNS))})"
+        return self.backend.insert_query('etl_run_state', RUN_STATE_COLUMNS, values, RUN_STATE_KEY,
+                                         ignore=False, upsert=True)
+
+    def _write_state(self, connection, part, step, rows_done, completed):
+        """Write a step's progress on connection, in its open transaction"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(self._state_query(), (self.loader, part, step, rows_done, completed))
+        finally:
+            cursor.close()
+
+    def _record(self, part, step, rows_done, completed):
+        with self.lock:
+            self._write_state(self.connection, part, step, rows_done, completed)
+            self.connection.commit()
+            self.progress[(part, step)] = (rows_done, completed)
+
+    def _insert_segment(self, connection, part, table, inserter, segment, rows_done, completed):
+        """
+        Insert one segment and record the rows_done it reaches in a single
+        transaction; a transient error resends the whole segment, never
+        one batch of it
+        """
+        def attempt():
+            with DeferredCommit(connection, begin=self.backend.name == 'duckdb') as transaction:
+                inserter(transaction, segment)
+                self._write_state(transaction, part, table, rows_done, completed)
+
+        run_with_retry(connection, attempt, self.retries, idempotent=False)
+        with self.lock:
+            self.progress[(part, table)] = (rows_done, completed)
+
+    def wrap(self, part, inserters):
+        """
+        Return inserters that skip completed tables and committed rows of
+        this part and commit progress with each segment
+        """
+        def resumable(table, inserter):
+            def insert(connection, df):
+                rows_done, completed = self.progress.get((part, table), (0, False))
+                if completed:
+                    print(f"✓ {table}: already loaded, skipped")
+                    return
+                if rows_done:
+                    print(f"  {table}: resuming after {rows_done} committed rows")
+                for start in range(rows_done, len(df), self.segment_rows):
+                    end = min(start + self.segment_rows, len(df))
+                    self._insert_segment(connection, part, table, inserter, df.iloc[start:end],
+                                         end, end == len(df))
+                if rows_done >= len(df):
+                    self._record(part, table, len(df), True)
+            return insert
+
+        return {table: resumable(table, inserter) for table, inserter in inserters.items()}
+
+    def finish(self):
+        """Mark the run complete, so the next run starts over"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"UPDATE etl_runs SET status = 'complete' WHERE loader = {self.param}", (self.loader,))
+            cursor.execute(f"DELETE FROM etl_run_state WHERE loader = {self.param}", (self.loader,))
+            self.connection.commit()
+        finally:
+            cursor.close()
+        print(f"✓ Run state cleared for {self.loader}")
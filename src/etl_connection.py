@@ -0,0 +1,161 @@
+"""
+Connection Layer
+Opens MySQL connections from one set of settings: a pool bound to the
+loader database (mysql.connector.pooling), optional protocol compression,
+the C extension when it is installed, and reconnect-and-retry of the
+current statement on transient errors
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import time
+import weakref
+import mysql.connector
+from mysql.connector import Error, pooling
+
+# Errors after which the statement can simply be sent again
+#   2006 CR_SERVER_GONE_ERROR, 2013 CR_SERVER_LOST, 2055 CR_SERVER_LOST_EXTENDED
+#   (connection dropped: reconnect first), 1205 ER_LOCK_WAIT_TIMEOUT,
+#   1213 ER_LOCK_DEADLOCK (transaction rolled back: retry as is)
+CONNECTION_LOST_ERRNOS = {2006, 2013, 2055}
+TRANSIENT_ERRNOS = CONNECTION_LOST_ERRNOS | {1205, 1213}
+RETRIES = 3
+RETRY_DELAY = 1.0
+
+# Session statements to replay after a reconnect, per connection
+_session_statements = weakref.WeakKeyDictionary()
+
+# ============================================================================
+# 1. SESSION STATE & RETRY
+# ============================================================================
+
+def set_session(connection, statement):
+    """Run a SET SESSION-style statement and remember it for reconnects"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(statement)
+    finally:
+        cursor.close()
+    _session_statements.setdefault(connection, []).append(statement)
+
+def reconnect(connection, attempts=RETRIES, delay=RETRY_DELAY):
+    """Reopen a dropped connection and restore its session statements"""
+    connection.reconnect(attempts=attempts, delay=delay)
+    cursor = connection.cursor()
+    try:
+        for statement in _session_statements.get(connection, []):
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+def run_with_retry(connection, action, retries=RETRIES, delay=RETRY_DELAY, idempotent=True):
+    """
+    Call action() and return its result, retrying it after transient errors.
+
+    A dropped connection is reopened before the retry; deadlocks and lock
+    wait timeouts are rolled back and retried. action must only do work
+    that the failure undoes, i.e. everything since its last commit.
+
+    A connection can drop after the server committed the action, so it is
+    only resent then when running it twice is harmless (idempotent: INSERT
+    IGNORE or upsert on a real unique key). Otherwise the connection is
+    reopened and the error raised, rather than risk writing the rows twice.
+    """
+    if getattr(connection, 'deferred', False):
+        # One statement of a larger transaction: resending just this one
+        # after the rollback would lose the others (see DeferredCommit)
+        retries = 0
+    for attempt in range(1, retries + 2):
+        try:
+            return action()
+        except Error as e:
+            if e.errno not in TRANSIENT_ERRNOS or attempt > retries:
+                raise
+            if e.errno in CONNECTION_LOST_ERRNOS and not idempotent:
+                reconnect(connection)
+                print(f"  ! {e.msg} (errno {e.errno}); not resending a non-idempotent write "
+                      f"that may already be committed")
+                raise
+            print(f"  ! {e.msg} (errno {e.errno}); retrying {attempt}/{retries}")
+            time.sleep(delay * attempt)
+            if e.errno in CONNECTION_LOST_ERRNOS or not connection.is_connected():
+                reconnect(connection)
+            else:
+                connection.rollback()
+
+class DeferredCommit:
+    """
+    A connection stand-in that joins the per-batch commits of the writers
+    it is passed to into one transaction: its commit() does nothing, and
+    leaving the with block commits the real connection (or rolls it back
+    on an error). Writers do not retry single statements on it, so the
+    caller retries the whole block. begin=True opens the transaction
+    explicitly, for connections that otherwise commit every statement
+    (DuckDB).
+    """
+
+    deferred = True
+
+    def __init__(self, connection, begin=False):
+        self._connection = connection
+        self._begin = begin
+
+    def __enter__(self):
+        if self._begin:
+            self._connection.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._connection.commit()
+        else:
+            self._connection.rollback()
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+# ============================================================================
+# 2. CONNECTION FACTORY
+# ============================================================================
+
+class ConnectionFactory:
+    """
+    Creates connections for a loader from its DB_CONFIG.
+
+    server() opens a standalone connection with no database selected (for
+    CREATE DATABASE); connect() takes a connection from a pool bound to
+    config['database'], created on first use. Closing a pooled connection
+    returns it to the pool. use_pure is only turned off when the C
+    extension is available.
+    """
+
+    def __init__(self, config, pool_size=4, compress=False, allow_local_infile=False):
+        self.database = config['database']
+        self.settings = {key: value for key, value in config.items() if key != 'database'}
+        self.settings.update(
+            compress=compress,
+            use_pure=not mysql.connector.HAVE_CEXT,
+            allow_local_infile=allow_local_infile
+        )
+        self.pool_size = max(1, min(pool_size, pooling.CNX_POOL_MAXSIZE))
+        self.pool = None
+
+    def server(self):
+        """Open a connection to the server without selecting a database"""
+        return mysql.connector.connect(**self.settings)
+
+    def connect(self):
+        """Take a pooled connection with the loader database selected"""
+        if self.pool is None:
+            self.pool = pooling.MySQLConnectionPool(
+                pool_name=f"etl_{self.database}",
+                pool_size=self.pool_size,
+                database=self.database,
+                **self.settings
+            )
+            print(f"✓ Connection pool ready ({self.pool_size} connections, "
+                  f"compress={self.settings['compress']}, "
+                  f"{'pure Python' if self.settings['use_pure'] else 'C extension'})")
+        return self.pool.get_connection()
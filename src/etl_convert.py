@@ -0,0 +1,123 @@
+"""
+Column-typed Row Conversion
+Turns extracted DataFrames into DB-ready tuples one column at a time
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import re
+from datetime import date
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# COLUMN KINDS
+# ============================================================================
+#   'str'   - value passed through as-is (dates as str()), NaN -> None
+#   'text'  - value converted with str() and stripped, NaN -> None
+#   'int'   - numeric value truncated to a Python int, NaN -> None
+#   'float' - numeric value as a Python float, NaN -> None
+#   'date'  - datetime64 value truncated to a datetime.date, NaT -> None
+#   'datetime' - datetime64 value as a datetime.datetime (to the microsecond), NaT -> None
+
+COLUMN_KINDS = ('str', 'text', 'int', 'float', 'date', 'datetime')
+
+# MySQL column type -> column kind (text and unlisted types are 'str')
+SQL_TYPE_KINDS = {
+    'tinyint': 'int', 'smallint': 'int', 'mediumint': 'int', 'int': 'int', 'integer': 'int', 'bigint': 'int',
+    'decimal': 'float', 'numeric': 'float', 'float': 'float', 'double': 'float', 'real': 'float',
+    'date': 'date', 'datetime': 'datetime', 'timestamp': 'datetime'
+}
+DDL_COLUMN = re.compile(r'^\s*`?(\w+)`?\s+(\w+)')
+DDL_KEYWORDS = {'PRIMARY', 'UNIQUE', 'KEY', 'INDEX', 'CONSTRAINT', 'FOREIGN', 'CHECK'}
+
+def ddl_column_kinds(ddl):
+    """{column: kind} for the columns of a MySQL CREATE TABLE"""
+    kinds = {}
+    for line in ddl.strip().split('\n')[1:]:
+        match = DDL_COLUMN.match(line)
+        if match and match.group(1).upper() not in DDL_KEYWORDS:
+            kinds[match.group(1)] = SQL_TYPE_KINDS.get(match.group(2).lower(), 'str')
+    return kinds
+
+def convert_column(series, kind):
+    """Convert one column into an object array of Python values (None for missing)"""
+    mask = series.isna().to_numpy()
+
+    if kind == 'date':
+        # datetime64[D].tolist() yields datetime.date objects and None for NaT
+        values = pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[D]')
+        out = np.empty(len(series), dtype=object)
+        out[:] = values.tolist()
+        return out
+
+    if kind == 'datetime':
+        values = pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[us]')
+        out = np.empty(len(series), dtype=object)
+        out[:] = values.tolist()
+        return out
+
+    if kind == 'int':
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        mask = mask | np.isnan(numbers)
+        out = np.empty(len(series), dtype=object)
+        out[:] = np.where(mask, 0, numbers).astype(np.int64).tolist()
+    elif kind == 'float':
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        mask = mask | np.isnan(numbers)
+        out = np.empty(len(series), dtype=object)
+        out[:] = numbers.tolist()
+    elif kind == 'text':
+        out = series.astype(str).str.strip().to_numpy(dtype=object)
+    elif kind == 'str':
+        if pd.api.types.is_datetime64_any_dtype(series):
+            out = series.map(str, na_action='ignore').to_numpy(dtype=object, copy=True)
+        else:
+            out = series.to_numpy(dtype=object, copy=True)
+            # Date cells in a text column (Excel auto-converts some codes) are
+            # bound as their text, as typed_column sends them; drivers reject Timestamps
+            dates = np.fromiter((isinstance(value, date) for value in out), dtype=bool, count=len(out))
+            if dates.any():
+                out[dates] = [str(value) for value in out[dates]]
+    else:
+        raise ValueError(f"Unknown column kind '{kind}' (expected one of {COLUMN_KINDS})")
+
+    out[mask] = None
+    return out
+
+def to_db_rows(df, schema):
+    """
+    Convert a DataFrame into a list of DB-ready tuples.
+
+    schema is an ordered list of (column, kind) pairs; the tuple fields follow
+    the same order, so it should match the column list of the INSERT query.
+    """
+    columns = [convert_column(df[column], kind) for column, kind in schema]
+    if not columns:
+        return []
+    return list(zip(*columns))
+
+def typed_column(series, kind):
+    """
+    Convert one column to a typed pandas column (nullable), for backends
+    that append whole DataFrames instead of row tuples.
+
+    Follows the same kinds as convert_column: 'int' truncates into Int64,
+    'date' keeps datetime64 at day precision, 'str'/'text' become strings.
+    """
+    mask = series.isna()
+    if kind == 'date':
+        return pd.to_datetime(series, errors='coerce').dt.floor('D')
+    if kind == 'datetime':
+        return pd.to_datetime(series, errors='coerce')
+    if kind == 'int':
+        return np.trunc(pd.to_numeric(series, errors='coerce').astype('float64')).astype('Int64')
+    if kind == 'float':
+        return pd.to_numeric(series, errors='coerce').astype('float64')
+    if kind == 'text':
+        return series.astype(str).str.strip().where(~mask, None)
+    if kind == 'str':
+        if isinstance(series.dtype, pd.StringDtype):
+            return series
+        # Excel may hand back a mix of strings, numbers and dates in one column
+        return series.map(str, na_action='ignore')
+    raise ValueError(f"Unknown column kind '{kind}' (expected one of {COLUMN_KINDS})")
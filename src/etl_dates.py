@@ -0,0 +1,102 @@
+"""
+Date Column Parsing
+Parses the loaders' date columns from their declared formats, once per
+distinct value, and reports the values that could not be read as dates
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# 1. FORMATS
+# ============================================================================
+#   Each loader declares {column: (format, ...)}, tried in order:
+#   '%d/%m/%Y' etc.  - strptime format for text cells
+#   EXCEL_SERIAL     - numeric cells hold Excel 1900-system day numbers
+#
+# Cells Excel already stored as dates pass through. Text matching none of
+# the formats is parsed by inference (slow, but only once per distinct
+# value); numbers in a column without EXCEL_SERIAL, and anything still
+# unreadable, become NaT and are counted.
+
+EXCEL_SERIAL = 'excel_serial'
+
+# Day 0 of Excel's 1900 date system, shifted a day for its phantom 1900-02-29
+# (serials from 61, i.e. 1900-03-01, on convert exactly)
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+def _parse_text(values, formats):
+    """Parse distinct strings with each format in turn, then by inference"""
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[us]')
+    remaining = values
+    for fmt in formats:
+        if fmt == EXCEL_SERIAL or remaining.empty:
+            continue
+        matched = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        parsed[matched.index] = matched
+        remaining = remaining[matched.isna()]
+    if not remaining.empty:
+        parsed[remaining.index] = pd.to_datetime(remaining, format='mixed', errors='coerce')
+    return parsed
+
+def parse_unique_dates(uniques, formats):
+    """Parse an array of distinct non-missing cells into a datetime64 Series"""
+    values = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[us]')
+
+    is_date = values.map(lambda v: isinstance(v, (datetime, date, np.datetime64)))
+    if is_date.any():
+        parsed[is_date] = pd.to_datetime(values[is_date])
+
+    is_number = values.map(_is_number)
+    if is_number.any() and EXCEL_SERIAL in formats:
+        days = pd.to_numeric(values[is_number], errors='coerce')
+        parsed[is_number] = EXCEL_EPOCH + pd.to_timedelta(days, unit='D')
+
+    is_text = values.map(lambda v: isinstance(v, str))
+    if is_text.any():
+        parsed[is_text] = _parse_text(values[is_text].str.strip(), formats)
+    return parsed
+
+# ============================================================================
+# 2. COLUMNS
+# ============================================================================
+
+def parse_dates(series, formats):
+    """
+    Convert one column to datetime64, returning (parsed, coerced).
+
+    Columns the reader already typed as dates are returned unchanged.
+    Otherwise each distinct cell is parsed once and mapped back through its
+    factorized codes, so a million rows spanning a few years of dates parse
+    a few thousand strings. coerced counts the non-missing cells that
+    became NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, 0
+
+    codes, uniques = pd.factorize(series)
+    if isinstance(series.dtype, pd.StringDtype):
+        # CSV text columns: no per-cell type checks needed
+        parsed = _parse_text(pd.Series(np.asarray(uniques, dtype=object)).str.strip(), formats)
+    else:
+        parsed = parse_unique_dates(np.asarray(uniques, dtype=object), formats)
+    values = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    result = pd.Series(values, index=series.index, name=series.name)
+    coerced = int((result.isna() & series.notna()).sum())
+    return result, coerced
+
+def parse_date_columns(df, date_columns):
+    """Parse every declared date column of df in place; returns df"""
+    for column, formats in date_columns.items():
+        if column not in df.columns:
+            continue
+        df[column], coerced = parse_dates(df[column], formats)
+        if coerced:
+            print(f"  {column}: {coerced} values could not be read as dates (set to NaT)")
+    return df
@@ -0,0 +1,297 @@
+"""
+Fresh-load Mode
+Creates tables with only their primary and unique keys, loads with
+foreign_key_checks (and, when safe, unique_checks) disabled, then builds the
+secondary indexes and foreign keys in one ALTER TABLE per table
+(shared by data_load.py and retail_sales_load.py)
+
+Foreign keys are only added once an orphan-count query finds every child
+row's parent, and indexes/FKs a crashed fresh load never built are found
+in information_schema and built by the next run (complete_deferred).
+"""
+
+import re
+import time
+from mysql.connector import Error
+from etl_connection import set_session
+
+# Definition lines moved out of CREATE TABLE and added after the load.
+# UNIQUE keys stay in place: INSERT IGNORE relies on them to skip duplicates.
+DEFERRED_LINE = re.compile(r'^\s*(INDEX|KEY|FOREIGN\s+KEY)\b', re.IGNORECASE)
+PRIMARY_KEY_LINE = re.compile(r'^\s*PRIMARY\s+KEY\s*\(([^)]*)\)', re.IGNORECASE)
+UNIQUE_KEY_LINE = re.compile(r'^\s*UNIQUE\s+(?:KEY|INDEX)\s*\w*\s*\(([^)]*)\)', re.IGNORECASE)
+COLUMN_LINE = re.compile(r'^\s*(\w+)\s+\w+', re.IGNORECASE)
+FOREIGN_KEY_CLAUSE = re.compile(r'^FOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+(\w+)\s*\(([^)]*)\)', re.IGNORECASE)
+INDEX_CLAUSE = re.compile(r'^(?:INDEX|KEY)\s+`?(\w+)', re.IGNORECASE)
+
+# ============================================================================
+# 1. DDL SPLITTING
+# ============================================================================
+
+def split_table_ddl(ddl):
+    """
+    Split a CREATE TABLE statement into (create_sql, deferred_clauses).
+
+    create_sql keeps columns, the primary key and unique keys;
+    deferred_clauses are the INDEX / FOREIGN KEY definitions, ready to be
+    prefixed with ADD in an ALTER TABLE.
+    """
+    kept, deferred = [], []
+    for line in ddl.strip().split('\n'):
+        if DEFERRED_LINE.match(line):
+            deferred.append(line.strip().rstrip(','))
+        else:
+            kept.append(line)
+
+    # The last definition before the closing ') ENGINE=...' must not end in a comma
+    for i in range(len(kept) - 1, 0, -1):
+        if kept[i].strip().startswith(')'):
+            kept[i - 1] = kept[i - 1].rstrip().rstrip(',')
+            break
+    return '\n'.join(kept), deferred
+
+def unique_column_sets(ddl):
+    """
+    Column lists of every PRIMARY/UNIQUE key whose values come from the data
+    (AUTO_INCREMENT primary keys are skipped since frames never carry them).
+    """
+    sets = []
+    for line in ddl.strip().split('\n'):
+        match = PRIMARY_KEY_LINE.match(line) or UNIQUE_KEY_LINE.match(line)
+        if match:
+            sets.append([col.strip(' `') for col in match.group(1).split(',')])
+            continue
+        column = COLUMN_LINE.match(line)
+        upper = line.upper()
+        if column and ('PRIMARY KEY' in upper or re.search(r'\bUNIQUE\b', upper)):
+            if 'AUTO_INCREMENT' not in upper:
+                sets.append([column.group(1)])
+    return sets
+
+# ============================================================================
+# 2. DEFERRED INDEXES & FOREIGN KEYS
+# ============================================================================
+
+def _column_list(text):
+    return tuple(col.strip(' `').lower() for col in text.split(','))
+
+def _foreign_key(clause):
+    """(columns, parent table, parent columns) of a FOREIGN KEY clause (None for an index)"""
+    match = FOREIGN_KEY_CLAUSE.match(clause)
+    if not match:
+        return None
+    return _column_list(match.group(1)), match.group(2).lower(), _column_list(match.group(3))
+
+def foreign_keys(ddl, cascading=False):
+    """
+    (columns, parent table, parent columns) of every FOREIGN KEY of a CREATE
+    TABLE; cascading=True keeps only ON DELETE CASCADE keys, whose child
+    rows belong to their parent row
+    """
+    clauses = split_table_ddl(ddl)[1]
+    if cascading:
+        clauses = [clause for clause in clauses if re.search(r'ON\s+DELETE\s+CASCADE', clause, re.IGNORECASE)]
+    return [key for key in map(_foreign_key, clauses) if key]
+
+def missing_clauses(connection, table, deferred):
+    """The deferred clauses a table lacks, by index name and FK columns in information_schema"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT DISTINCT index_name FROM information_schema.statistics "
+                       "WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+        indexes = {row[0].lower() for row in cursor.fetchall()}
+        cursor.execute("""
+            SELECT constraint_name, column_name, referenced_table_name, referenced_column_name
+            FROM information_schema.key_column_usage
+            WHERE table_schema = DATABASE() AND table_name = %s AND referenced_table_name IS NOT NULL
+            ORDER BY constraint_name, ordinal_position
+        """, (table,))
+        constraints = {}
+        for name, column, parent, parent_column in cursor.fetchall():
+            columns, _, parent_columns = constraints.setdefault(name, ([], parent.lower(), []))
+            columns.append(column.lower())
+            parent_columns.append(parent_column.lower())
+    finally:
+        cursor.close()
+    foreign_keys = {(tuple(cols), parent, tuple(parent_cols)) for cols, parent, parent_cols in constraints.values()}
+
+    missing = []
+    for clause in deferred:
+        foreign_key = _foreign_key(clause)
+        if foreign_key:
+            if foreign_key not in foreign_keys:
+                missing.append(clause)
+        elif INDEX_CLAUSE.match(clause).group(1).lower() not in indexes:
+            missing.append(clause)
+    return missing
+
+def count_orphans(connection, table, clause):
+    """Rows of table whose FOREIGN KEY clause columns are set but match no parent row"""
+    columns, parent, parent_columns = _foreign_key(clause)
+    joined = ' AND '.join(f"c.{col} = p.{parent_col}" for col, parent_col in zip(columns, parent_columns))
+    is_set = ' AND '.join(f"c.{col} IS NOT NULL" for col in columns)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM {table} c LEFT JOIN {parent} p ON {joined} "
+                       f"WHERE {is_set} AND p.{parent_columns[0]} IS NULL")
+        return int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+def build_deferred(connection, clauses_by_table, timings=None):
+    """
+    Add {table: [clauses]} with one ALTER TABLE per table.
+
+    The session must have foreign_key_checks off, so InnoDB adds the FKs in
+    place instead of copying the table; each FK is checked with an
+    orphan-count query first instead, and one with orphans is reported and
+    left out (it stays missing, so the next run retries it). Returns True
+    when every clause was built.
+    """
+    complete = True
+    for table_name, clauses in clauses_by_table.items():
+        valid = []
+        for clause in clauses:
+            if _foreign_key(clause):
+                orphans = count_orphans(connection, table_name, clause)
+                if orphans:
+                    complete = False
+                    print(f"✗ {orphans} rows of '{table_name}' have no parent for {clause}; FK not added")
+                    continue
+            valid.append(clause)
+        if not valid:
+            continue
+
+        start = time.perf_counter()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"ALTER TABLE {table_name} " + ', '.join(f"ADD {clause}" for clause in valid))
+        finally:
+            cursor.close()
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[f"index {table_name}"] = elapsed
+        print(f"✓ Built {len(valid)} indexes/FKs on '{table_name}' in {elapsed:.2f}s")
+    connection.commit()
+    return complete
+
+def complete_deferred(connection, table_ddl):
+    """
+    Build the deferred indexes/FKs that tables created by an interrupted
+    fresh load still lack (a regular run's CREATE TABLE IF NOT EXISTS
+    leaves such tables as they are). Returns True when none are missing.
+    """
+    pending = {}
+    for table_name, ddl in table_ddl.items():
+        _, deferred = split_table_ddl(ddl)
+        missing = missing_clauses(connection, table_name, deferred) if deferred else []
+        if missing:
+            pending[table_name] = missing
+    if not pending:
+        return True
+
+    print(f"  {sum(len(clauses) for clauses in pending.values())} indexes/FKs left out by an "
+          f"interrupted fresh load; building them now")
+    set_session(connection, "SET SESSION foreign_key_checks = 0")
+    try:
+        return build_deferred(connection, pending)
+    finally:
+        set_session(connection, "SET SESSION foreign_key_checks = 1")
+
+# ============================================================================
+# 3. FRESH LOAD
+# ============================================================================
+
+class FreshLoad:
+    """
+    Runs an initial bulk load with deferred secondary indexes and FK checks.
+
+    disable_unique_checks also turns off InnoDB unique checks; the frames
+    are then de-duplicated on their primary/unique keys in pandas (keeping
+    the first row, as INSERT IGNORE would). Only use it when each table is
+    loaded in a single pass, since duplicates across chunks are not caught.
+    """
+
+    def __init__(self, table_ddl, disable_unique_checks=True):
+        self.table_ddl = table_ddl
+        self.split = {table: split_table_ddl(ddl) for table, ddl in table_ddl.items()}
+        self.unique_sets = {table: unique_column_sets(ddl) for table, ddl in table_ddl.items()}
+        self.disable_unique_checks = disable_unique_checks
+        self.timings = {}
+        self.started = time.perf_counter()
+        self.load_started = None
+
+    def _phase_done(self, phase, start):
+        self.timings[phase] = self.timings.get(phase, 0) + time.perf_counter() - start
+
+    def create_tables(self, connection):
+        """
+        Create every table with only primary/unique keys.
+
+        Returns False (creating nothing) if any of the tables already exists,
+        since a fresh load must start from an empty schema.
+        """
+        start = time.perf_counter()
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SHOW TABLES")
+            existing = {row[0] for row in cursor.fetchall()} & set(self.table_ddl)
+            if existing:
+                print(f"✗ Fresh load needs an empty schema; found {', '.join(sorted(existing))}")
+                return False
+
+            for table_name, (create_statement, deferred) in self.split.items():
+                cursor.execute(create_statement)
+                print(f"✓ Table '{table_name}' created ({len(deferred)} indexes/FKs deferred)")
+            connection.commit()
+            return True
+        except Error as e:
+            print(f"✗ Error creating tables: {e}")
+            return False
+        finally:
+            cursor.close()
+            self._phase_done('create tables', start)
+
+    def begin(self, connection):
+        """Disable FK (and optionally unique) checks for this connection's session"""
+        set_session(connection, "SET SESSION foreign_key_checks = 0")
+        if self.disable_unique_checks:
+            set_session(connection, "SET SESSION unique_checks = 0")
+        if self.load_started is None:
+            self.load_started = time.perf_counter()
+        return connection
+
+    def prepare(self, tables):
+        """De-duplicate frames on their primary/unique keys when unique checks are off"""
+        if not self.disable_unique_checks:
+            return tables
+        prepared = {}
+        for table, df in tables.items():
+            for columns in self.unique_sets.get(table, []):
+                if set(columns) <= set(df.columns):
+                    df = df.drop_duplicates(subset=columns)
+            prepared[table] = df
+        return prepared
+
+    def finish(self, connection):
+        """
+        Build the deferred indexes/FKs (one ALTER TABLE per table, FKs only
+        without orphans) and restore checks; returns True when all were built
+        """
+        self._phase_done('load', self.load_started)
+
+        try:
+            deferred = {table_name: clauses for table_name, (_, clauses) in self.split.items() if clauses}
+            complete = build_deferred(connection, deferred, self.timings)
+        finally:
+            set_session(connection, "SET SESSION foreign_key_checks = 1")
+            set_session(connection, "SET SESSION unique_checks = 1")
+        self.report()
+        return complete
+
+    def report(self):
+        """Print time spent per phase"""
+        print("\n  Fresh-load phases:")
+        for phase, seconds in self.timings.items():
+            print(f"    {phase:<32} {seconds:8.2f}s")
+        print(f"    {'total':<32} {time.perf_counter() - self.started:8.2f}s")
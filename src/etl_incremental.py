@@ -0,0 +1,237 @@
+"""
+Incremental (Delta) Loading
+Keeps per-table high-water marks and dimension row hashes in metadata tables
+so repeated runs only insert new fact rows and upsert new or changed
+dimension rows (shared by data_load.py and retail_sales_load.py)
+"""
+
+import numpy as np
+import pandas as pd
+from etl_writer import write_batches
+
+# ============================================================================
+# STRATEGIES (per table, declared by each loader in FK order)
+# ============================================================================
+#   ('hash', [key columns])     - dimension: rows whose content hash is new or
+#                                 changed since the last run, upserted
+#   ('hash', [key columns], [excluded columns])
+#                               - as above, leaving pandas-assigned surrogate
+#                                 ids out of the content hash
+#   ('date', column, [key columns])
+#                               - fact: rows with column >= stored max date,
+#                                 less those whose key is already stored (a
+#                                 date watermark is not unique: rows of the
+#                                 last loaded day can still arrive)
+#   ('key', column)             - fact: rows with column > stored max key
+#                                 (column must be strictly increasing)
+#   ('parent', table, column)   - fact: rows whose column value appears in the
+#                                 delta of an earlier table
+#
+# Date/key watermarks assume rows arrive in increasing order; rows added
+# late below the watermark need a full (non-incremental) load. They cannot
+# be told apart from rows loaded before, so every run reports how many rows
+# each watermark skipped.
+#
+# Keys and hashes are taken from canonical values (canonical_frame), so a
+# column read as int in one run and as float in the next is not "changed".
+
+METADATA_TABLES = {
+    'etl_watermarks': """
+        CREATE TABLE IF NOT EXISTS etl_watermarks (
+            table_name VARCHAR(64) PRIMARY KEY,
+            watermark_column VARCHAR(64) NOT NULL,
+            watermark_value VARCHAR(64) NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'etl_row_hashes': """
+        CREATE TABLE IF NOT EXISTS etl_row_hashes (
+            table_name VARCHAR(64) NOT NULL,
+            row_key VARCHAR(255) NOT NULL,
+            row_hash BIGINT NOT NULL,
+            PRIMARY KEY (table_name, row_key)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+
+KEY_SEPARATOR = '\x1f'
+
+def _canonical_text(value):
+    """A cell as text, with whole numbers written as ints (5.0 -> '5')"""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+def canonical_frame(df):
+    """
+    One dtype per kind of column, so the same data read as int or float, or
+    as datetimes of another resolution, gives the same keys and hashes
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            columns[col] = values.astype('float64')
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            columns[col] = values.astype('datetime64[ns]')
+        else:
+            columns[col] = values.map(_canonical_text, na_action='ignore').astype(object)
+    return pd.DataFrame(columns, index=df.index)
+
+def row_keys(df, key_cols):
+    """Build one string key per row from the key columns (ints and whole floats alike)"""
+    text = [df[col].map(_canonical_text, na_action='ignore').fillna('').astype(str) for col in key_cols]
+    keys = text[0]
+    for col in text[1:]:
+        keys = keys + KEY_SEPARATOR + col
+    return keys.reset_index(drop=True)
+
+def row_hashes(df):
+    """64-bit content hash per row of the canonical values (as signed int64 to fit a BIGINT column)"""
+    hashes = pd.util.hash_pandas_object(canonical_frame(df), index=False).to_numpy().view('int64')
+    return pd.Series(hashes)
+
+def _parse_watermark(kind, value):
+    return pd.Timestamp(value) if kind == 'date' else int(value)
+
+def _format_watermark(kind, value):
+    return pd.Timestamp(value).isoformat() if kind == 'date' else str(int(value))
+
+class IncrementalTracker:
+    """Filters extracted tables down to their delta and records new watermarks"""
+
+    def __init__(self, connection, strategies):
+        self.connection = connection
+        self.strategies = strategies
+        self.watermarks = {}
+        self.boundary_keys = {}
+        self.hashes = {}
+        self.recorded = set()
+        self.pending_watermarks = {}
+        self.pending_hashes = []
+
+        cursor = connection.cursor()
+        try:
+            for create_statement in METADATA_TABLES.values():
+                cursor.execute(create_statement)
+            connection.commit()
+
+            cursor.execute("SELECT table_name, watermark_value FROM etl_watermarks")
+            for table, value in cursor.fetchall():
+                if table in strategies:
+                    self.watermarks[table] = _parse_watermark(strategies[table][0], value)
+
+            # Keys already stored on or after each date watermark (the last loaded day)
+            for table, strategy in strategies.items():
+                if strategy[0] != 'date':
+                    continue
+                if len(strategy) < 3:
+                    raise ValueError(f"Date watermark for '{table}' needs key columns: ('date', column, [keys])")
+                if table not in self.watermarks:
+                    continue
+                key_cols = strategy[2]
+                cursor.execute(f"SELECT {', '.join(key_cols)} FROM {table} WHERE {strategy[1]} >= %s",
+                               (self.watermarks[table].date(),))
+                stored = pd.DataFrame(cursor.fetchall(), columns=key_cols)
+                self.boundary_keys[table] = set(row_keys(stored, key_cols))
+
+            for table, strategy in strategies.items():
+                if strategy[0] != 'hash':
+                    continue
+                cursor.execute("SELECT row_key, row_hash FROM etl_row_hashes WHERE table_name = %s", (table,))
+                stored = pd.DataFrame(cursor.fetchall(), columns=['row_key', 'stored_hash'])
+                self.hashes[table] = stored.astype({'row_key': object, 'stored_hash': 'Int64'})
+                if len(stored):
+                    self.recorded.add(table)
+        finally:
+            cursor.close()
+
+        print(f"✓ Incremental mode: {len(self.watermarks)} watermarks, "
+              f"{sum(len(h) for h in self.hashes.values())} dimension row hashes on record")
+
+    def filter(self, tables):
+        """Return a copy of `tables` holding only new or changed rows"""
+        delta = {}
+        for table, df in tables.items():
+            strategy = self.strategies.get(table)
+            if strategy is None:
+                delta[table] = df
+                continue
+
+            kind = strategy[0]
+            if kind == 'hash':
+                excluded = strategy[2] if len(strategy) > 2 else []
+                rows = self._filter_hash(table, df, strategy[1], excluded)
+            elif kind in ('date', 'key'):
+                key_cols = strategy[2] if kind == 'date' else None
+                rows = self._filter_watermark(table, df, kind, strategy[1], key_cols)
+            elif kind == 'parent':
+                parent, column = strategy[1], strategy[2]
+                rows = df[df[column].isin(delta[parent][column]).to_numpy()]
+            else:
+                raise ValueError(f"Unknown incremental strategy '{kind}' for table '{table}'")
+
+            print(f"  {table}: {len(rows)} new/changed of {len(df)} rows ({kind})")
+            delta[table] = rows
+        return delta
+
+    def _filter_hash(self, table, df, key_cols, excluded):
+        content = df.drop(columns=excluded)
+        current = pd.DataFrame({'row_key': row_keys(df, key_cols), 'row_hash': row_hashes(content)})
+        merged = current.merge(self.hashes[table], on='row_key', how='left')
+        changed = (merged['stored_hash'].isna() | (merged['stored_hash'] != merged['row_hash'])).to_numpy(dtype=bool)
+
+        rows = df[changed].copy()
+        rows.attrs['upsert'] = True
+        # Keys without a recorded hash are inserted, the rest updated in place
+        # (unknown when no earlier run recorded hashes for a table that may hold rows)
+        recorded = self.hashes[table]
+        rows.attrs['inserts'] = (int(merged['stored_hash'][changed].isna().sum())
+                                 if table in self.recorded else None)
+        self.pending_hashes.extend(
+            (table, key, int(h)) for key, h in zip(merged['row_key'][changed], merged['row_hash'][changed])
+        )
+        # Later chunks compare against this run's rows, so a repeated row is not sent again
+        current = merged.loc[changed, ['row_key', 'row_hash']].rename(columns={'row_hash': 'stored_hash'})
+        self.hashes[table] = pd.concat([recorded[~recorded['row_key'].isin(current['row_key'])],
+                                        current.astype({'stored_hash': 'Int64'})], ignore_index=True)
+        return rows
+
+    def _filter_watermark(self, table, df, kind, column, key_cols=None):
+        values = pd.to_datetime(df[column]) if kind == 'date' else df[column]
+        if table in self.watermarks and kind == 'date':
+            # Same-day rows are kept unless their key was loaded before
+            stored = row_keys(df, key_cols).isin(self.boundary_keys.get(table, ())).to_numpy(dtype=bool)
+            newer = (values >= self.watermarks[table]).to_numpy(dtype=bool)
+            late = int((~newer).sum())
+            newer = newer & ~stored
+            df, values = df[newer], values[newer]
+        elif table in self.watermarks:
+            newer = (values > self.watermarks[table]).to_numpy(dtype=bool)
+            late = int((~newer).sum())
+            df, values = df[newer], values[newer]
+        else:
+            late = 0
+        if late:
+            print(f"  ! {table}: {late} rows behind the {column} watermark skipped "
+                  f"(already loaded, or added late: those need a full load)")
+        if values.notna().any():
+            latest = values.max()
+            previous = self.pending_watermarks.get(table, (column, latest))[1]
+            self.pending_watermarks[table] = (column, max(latest, previous))
+        return df
+
+    def save(self):
+        """Persist watermarks and row hashes observed since the last save (call after loading)"""
+        watermark_rows = [
+            (table, column, _format_watermark(self.strategies[table][0], value))
+            for table, (column, value) in self.pending_watermarks.items()
+        ]
+        write_batches(self.connection, 'etl_watermarks',
+                      ['table_name', 'watermark_column', 'watermark_value'], watermark_rows, upsert=True)
+        write_batches(self.connection, 'etl_row_hashes',
+                      ['table_name', 'row_key', 'row_hash'], self.pending_hashes, upsert=True)
+        print(f"✓ Saved {len(watermark_rows)} watermarks and {len(self.pending_hashes)} row hashes")
+        self.pending_watermarks = {}
+        self.pending_hashes = []
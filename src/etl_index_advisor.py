@@ -0,0 +1,360 @@
+"""
+Index Advisor
+Runs EXPLAIN FORMAT=JSON on a loader's reporting queries (REPORT_QUERIES
+and SUMMARY_QUERIES), flags full table/index scans, filesorts and temporary
+tables, proposes composite or covering indexes for the scanned tables and
+benchmarks each query with and without them on the loaded MySQL data
+
+Usage: python src/etl_index_advisor.py [--loader data_load|retail_sales_load]
+                                       [--query NAME ...] [--repeat N]
+                                       [--no-benchmark] [--keep] [--json REPORT_PATH]
+
+The proposed indexes are dropped again after the benchmark; --keep leaves
+the ones the optimizer actually chose. Add the indexes worth keeping to the
+loader's TABLES.
+"""
+
+import argparse
+import importlib
+import json
+import re
+import statistics
+import time
+from mysql.connector import Error
+from etl_connection import ConnectionFactory
+
+LOADERS = ('data_load', 'retail_sales_load')
+
+# access_type values that read every row of a table or index
+FULL_SCANS = {'ALL': 'full table scan', 'index': 'full index scan'}
+
+# Wider proposals are cut back to their key columns (not covering)
+MAX_INDEX_COLUMNS = 5
+# Full scans of smaller tables are cheaper than any index lookup
+MIN_SCAN_ROWS = 1000
+INDEX_PREFIX = 'adv_'
+REPEAT = 5
+
+# ============================================================================
+# 1. PLAN INSPECTION
+# ============================================================================
+
+def explain(cursor, query):
+    """The optimizer's plan for a query as parsed EXPLAIN FORMAT=JSON"""
+    cursor.execute("EXPLAIN FORMAT=JSON " + query)
+    return json.loads(cursor.fetchone()[0])
+
+def walk_plan(node):
+    """Yield ('table', table node) and ('using_filesort' | 'using_temporary_table', None) from a plan tree"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'table' and isinstance(value, dict):
+                yield 'table', value
+            elif key in ('using_filesort', 'using_temporary_table') and value is True:
+                yield key, None
+            yield from walk_plan(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from walk_plan(item)
+
+def plan_findings(plan):
+    """Full scans, filesorts and temporary tables in a plan, as readable findings"""
+    findings = []
+    for kind, node in walk_plan(plan):
+        if kind == 'table':
+            access = node.get('access_type')
+            if access in FULL_SCANS:
+                key = f" on {node['key']}" if node.get('key') else ''
+                findings.append(f"{node.get('table_name')}: {FULL_SCANS[access]}{key} "
+                                f"(~{node.get('rows_examined_per_scan', '?')} rows)")
+        elif kind == 'using_filesort':
+            findings.append("filesort")
+        else:
+            findings.append("temporary table")
+    return findings
+
+def plan_keys(plan):
+    """Names of the indexes a plan reads"""
+    return {node['key'] for kind, node in walk_plan(plan) if kind == 'table' and node.get('key')}
+
+# ============================================================================
+# 2. QUERY PARSING
+# ============================================================================
+
+CLAUSE_WORDS = r'(?:ON|JOIN|WHERE|GROUP|ORDER|LIMIT|HAVING|LEFT|RIGHT|INNER|CROSS|STRAIGHT_JOIN)\b'
+TABLE_REF = re.compile(rf'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!{CLAUSE_WORDS})(\w+))?', re.IGNORECASE)
+JOIN_CONDITION = re.compile(r'\b(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)')
+EQUALITY = re.compile(r'\b(?:(\w+)\.)?(\w+)\s*=\s*(?:\'[^\']*\'|\d+|%s)')
+SELECT_ALIAS = re.compile(r'\bAS\s+(\w+)', re.IGNORECASE)
+
+def clause_text(query, keyword, enders):
+    """Text of the clause starting at keyword, up to the first of enders (or the end)"""
+    match = re.search(rf'\b{keyword}\b(.*?)(?=\b(?:{"|".join(enders)})\b|$)', query, re.IGNORECASE | re.DOTALL)
+    return match.group(1) if match else ''
+
+class QueryShape:
+    """
+    Tables and columns a reporting query joins, filters, groups and orders on.
+
+    Only handles the flat SELECT ... FROM ... JOIN ... ON a.x = b.y shape of
+    the reporting queries; columns of single-table queries may be unqualified.
+    """
+
+    def __init__(self, query):
+        self.aliases = {}
+        for table, alias in TABLE_REF.findall(query):
+            self.aliases[alias or table] = table
+        self.select_aliases = {alias.lower() for alias in SELECT_ALIAS.findall(query)}
+
+        self.join = {}
+        for left_alias, left_col, right_alias, right_col in JOIN_CONDITION.findall(query):
+            self._add(self.join, left_alias, left_col)
+            self._add(self.join, right_alias, right_col)
+
+        self.where = {}
+        for alias, column in EQUALITY.findall(clause_text(query, 'WHERE', ['GROUP', 'ORDER', 'LIMIT', 'HAVING'])):
+            self._add(self.where, alias, column)
+
+        self.group = self._column_list(clause_text(query, r'GROUP\s+BY', ['HAVING', 'ORDER', 'LIMIT']))
+        self.order = self._column_list(clause_text(query, r'ORDER\s+BY', ['LIMIT']))
+
+    def _add(self, columns, alias, column):
+        alias = alias or self._single_alias()
+        if alias in self.aliases and column not in columns.setdefault(alias, []):
+            columns[alias].append(column)
+
+    def _single_alias(self):
+        return next(iter(self.aliases)) if len(self.aliases) == 1 else None
+
+    def _column_list(self, text):
+        """{alias: [columns]} of a GROUP BY / ORDER BY list; select aliases and expressions are skipped"""
+        columns = {}
+        for item in text.split(','):
+            item = re.sub(r'\s+(?:ASC|DESC)\s*$', '', item.strip(), flags=re.IGNORECASE)
+            match = re.fullmatch(r'(?:(\w+)\.)?(\w+)', item)
+            if match and not (match.group(1) is None and match.group(2).lower() in self.select_aliases):
+                self._add(columns, match.group(1), match.group(2))
+        return columns
+
+# ============================================================================
+# 3. PROPOSALS
+# ============================================================================
+
+def existing_indexes(cursor, table):
+    """{index name: [columns in key order]} of a table"""
+    cursor.execute(f"SHOW INDEX FROM {table}")
+    indexes = {}
+    for row in cursor.fetchall():
+        key_name, seq, column = row[2], row[3], row[4]
+        indexes.setdefault(key_name, []).append((seq, column))
+    return {name: [column for _, column in sorted(parts)] for name, parts in indexes.items()}
+
+def dedupe(columns):
+    seen = []
+    for column in columns:
+        if column not in seen:
+            seen.append(column)
+    return seen
+
+def propose_indexes(cursor, query, plan):
+    """
+    Indexes that would remove the full scans (and plain-column sorts) of a plan.
+
+    For a scanned table the key columns are its equality filters, then its
+    join columns, then its GROUP BY columns; the other columns the plan
+    reads are appended to make the index covering when that stays within
+    MAX_INDEX_COLUMNS (primary key columns are left out, InnoDB stores them
+    in every secondary index). Scans of tables under MIN_SCAN_ROWS or with
+    no such key column, and proposals an existing index already starts
+    with, are skipped.
+    Returns [(table, columns, reason)].
+    """
+    shape = QueryShape(query)
+    candidates = []
+    for kind, node in walk_plan(plan):
+        if kind != 'table' or node.get('access_type') not in FULL_SCANS:
+            continue
+        alias = node.get('table_name')
+        if alias not in shape.aliases or node.get('rows_examined_per_scan', 0) < MIN_SCAN_ROWS:
+            continue  # derived/temporary or small tables
+        table = shape.aliases[alias]
+        primary = existing_indexes(cursor, table).get('PRIMARY', [])
+        lead = dedupe(shape.where.get(alias, []) + shape.join.get(alias, []) + shape.group.get(alias, []))
+        if not lead:
+            continue  # nothing to seek or group on; a copy of the table would not help
+        covering = dedupe(lead + [col for col in node.get('used_columns', []) if col not in primary])
+        if len(covering) <= MAX_INDEX_COLUMNS:
+            candidates.append((table, covering, f"covering index for the scan of {alias}"))
+        else:
+            candidates.append((table, lead, f"composite index for the scan of {alias}"))
+
+    # A sort on plain columns of one table can be read in index order
+    if any(kind == 'using_filesort' for kind, _ in walk_plan(plan)) and len(shape.order) == 1:
+        alias, columns = next(iter(shape.order.items()))
+        lead = dedupe(shape.where.get(alias, []) + columns)
+        candidates.append((shape.aliases[alias], lead, f"index order for ORDER BY on {alias}"))
+
+    proposals = []
+    for table, columns, reason in candidates:
+        existing = existing_indexes(cursor, table).values()
+        if not columns or any(index[:len(columns)] == columns for index in existing):
+            continue
+        if all((table, columns) != (t, c) for t, c, _ in proposals):
+            proposals.append((table, columns, reason))
+    return proposals
+
+def index_name(table, columns):
+    return f"{INDEX_PREFIX}{table}_{'_'.join(columns)}"[:64]
+
+# ============================================================================
+# 4. BENCHMARK
+# ============================================================================
+
+def time_query(cursor, query, repeat=REPEAT):
+    """Median wall time of a query (rows fetched) over repeat runs, after one warm-up run"""
+    times = []
+    for i in range(repeat + 1):
+        start = time.perf_counter()
+        cursor.execute(query)
+        cursor.fetchall()
+        if i:
+            times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def create_index(cursor, table, columns):
+    """Add a proposed index; returns its name, or None if MySQL refuses it (e.g. key too long)"""
+    name = index_name(table, columns)
+    try:
+        cursor.execute(f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(columns)})")
+        return name
+    except Error as e:
+        print(f"  ! Could not create {name}: {e.msg}")
+        return None
+
+def drop_index(cursor, table, name):
+    cursor.execute(f"ALTER TABLE {table} DROP INDEX {name}")
+
+# ============================================================================
+# 5. ADVISOR
+# ============================================================================
+
+def advise(connection, queries, benchmark=True, repeat=REPEAT, keep=False):
+    """
+    Inspect, propose and (optionally) benchmark; returns the report as a dict.
+
+    queries maps name -> SQL. All proposals are created together, so each
+    query is timed against the full proposed set; an index no plan chose
+    afterwards is reported as unused.
+    """
+    cursor = connection.cursor()
+    report = {'queries': {}, 'indexes': []}
+    try:
+        proposals = []
+        for name, query in queries.items():
+            try:
+                plan = explain(cursor, query)
+            except Error as e:
+                print(f"\n✗ {name}: {e.msg}")
+                continue
+            entry = {'findings': plan_findings(plan), 'proposals': []}
+            for table, columns, reason in propose_indexes(cursor, query, plan):
+                entry['proposals'].append(index_name(table, columns))
+                if all((table, columns) != (t, c) for t, c, _ in proposals):
+                    proposals.append((table, columns, reason))
+            report['queries'][name] = entry
+
+            print(f"\n{name}:")
+            for finding in entry['findings'] or ['no full scans or sorts']:
+                print(f"   {finding}")
+            for proposal in entry['proposals']:
+                print(f"   → {proposal}")
+
+        if not proposals:
+            print("\n✓ No index proposals")
+            return report
+
+        print("\nProposed indexes:")
+        for table, columns, reason in proposals:
+            print(f"   ALTER TABLE {table} ADD INDEX {index_name(table, columns)} ({', '.join(columns)})  -- {reason}")
+            report['indexes'].append({'table': table, 'name': index_name(table, columns),
+                                      'columns': columns, 'reason': reason})
+
+        if not benchmark:
+            return report
+
+        print(f"\nBenchmarking (median of {repeat} runs)...")
+        for name in report['queries']:
+            report['queries'][name]['before_s'] = time_query(cursor, queries[name], repeat)
+
+        created = []
+        for table, columns, _ in proposals:
+            index = create_index(cursor, table, columns)
+            if index:
+                created.append((table, index))
+
+        used = set()
+        try:
+            for name, entry in report['queries'].items():
+                plan = explain(cursor, queries[name])
+                used |= plan_keys(plan)
+                entry['after_findings'] = plan_findings(plan)
+                entry['after_s'] = time_query(cursor, queries[name], repeat)
+        finally:
+            for table, index in created:
+                if not (keep and index in used):
+                    drop_index(cursor, table, index)
+
+        for index in report['indexes']:
+            index['created'] = any(index['name'] == name for _, name in created)
+            index['used'] = index['name'] in used
+
+        print(f"\n{'query':<28} {'before ms':>10} {'after ms':>10} {'speedup':>8}  remaining")
+        for name, entry in report['queries'].items():
+            before, after = entry['before_s'], entry['after_s']
+            print(f"{name:<28} {before * 1e3:>10.1f} {after * 1e3:>10.1f} {before / max(after, 1e-9):>7.1f}x  "
+                  f"{'; '.join(entry['after_findings']) or '-'}")
+        for index in report['indexes']:
+            state = 'used' if index['used'] else 'not chosen by the optimizer'
+            kept = ' (kept)' if keep and index['used'] else ''
+            print(f"   {index['name']}: {state}{kept}")
+        return report
+    finally:
+        cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the reporting queries and propose indexes")
+    parser.add_argument('--loader', default='data_load', choices=LOADERS)
+    parser.add_argument('--query', action='append', default=[], metavar='NAME',
+                        help="Only these REPORT_QUERIES/SUMMARY_QUERIES entries (default: all)")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--no-benchmark', action='store_true')
+    parser.add_argument('--keep', action='store_true', help="Keep the proposed indexes the optimizer used")
+    parser.add_argument('--json', metavar='REPORT_PATH')
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.loader)
+    registered = {**module.REPORT_QUERIES, **module.SUMMARY_QUERIES}
+    unknown = set(args.query) - set(registered)
+    if unknown:
+        parser.error(f"unknown queries {', '.join(sorted(unknown))} (expected {', '.join(registered)})")
+    queries = {name: sql for name, (_, sql) in registered.items() if not args.query or name in args.query}
+
+    connection = ConnectionFactory(module.DB_CONFIG, pool_size=1).connect()
+    try:
+        # Fresh statistics, so the plans reflect the loaded data
+        cursor = connection.cursor()
+        cursor.execute(f"ANALYZE TABLE {', '.join(module.TABLES)}")
+        cursor.fetchall()
+        cursor.close()
+
+        report = advise(connection, queries, not args.no_benchmark, args.repeat, args.keep)
+    finally:
+        connection.close()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'loader': args.loader, **report}, f, indent=2)
+        print(f"✓ Report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Surrogate Key Resolution
+Inserts new AUTO_INCREMENT dimension values, fetches the ids MySQL actually
+assigned in one query per table and seeds them into the Normalizer, so fact
+rows reference the real ids on empty and non-empty databases alike
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+from etl_normalize import Dimension, key_tuples, canonical_key
+
+def fetch_ids(connection, table, id_col, key_cols):
+    """Return {canonical key tuple: id} for every row of a dimension table"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT {id_col}, {', '.join(key_cols)} FROM {table}")
+        return {tuple(canonical_key(v) for v in row[1:]): row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+def resolve_surrogate_keys(connection, normalizer, df, inserters):
+    """
+    Make every surrogate dimension key in `df` known to the normalizer.
+
+    For each Dimension with a surrogate id: insert the rows whose key the
+    normalizer has not seen (with the loader's insert function, so INSERT
+    IGNORE skips keys already in the database), then fetch the ids back.
+    The following normalize(df) emits no new rows for these dimensions and
+    maps fact rows to the fetched ids by factorized code.
+    """
+    for spec in normalizer.specs:
+        if not (isinstance(spec, Dimension) and spec.surrogate):
+            continue
+
+        key_cols = [spec.columns[col] for col in spec.key]
+        rows = normalizer.unique_rows(spec, df)[0]
+        known = normalizer.known_ids[spec.table]
+        is_new = [key not in known for key in key_tuples(rows, key_cols)]
+        new_rows = rows[is_new]
+        if len(new_rows):
+            inserters[spec.table](connection, new_rows)
+
+        ids = fetch_ids(connection, spec.table, spec.surrogate, key_cols)
+        normalizer.seed_ids(spec.table, ids)
+        print(f"✓ Resolved {spec.table} ids for {len(rows)} keys ({len(ids)} rows in table)")
+
+def surrogate_rows(normalizer, df):
+    """
+    Every surrogate dimension row referenced by `df`, with its resolved id.
+
+    After resolve_surrogate_keys, normalize(df) emits no rows for these
+    dimensions; exports that need the full tables (etl_parquet) use this.
+    """
+    tables = {}
+    for spec in normalizer.specs:
+        if not (isinstance(spec, Dimension) and spec.surrogate):
+            continue
+
+        rows = normalizer.unique_rows(spec, df)[0].reset_index(drop=True)
+        known = normalizer.known_ids[spec.table]
+        keys = key_tuples(rows, [spec.columns[col] for col in spec.key])
+        rows.insert(0, spec.surrogate, [known[key] for key in keys])
+        tables[spec.table] = rows
+    return tables
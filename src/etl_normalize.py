@@ -0,0 +1,189 @@
+"""
+Single-pass Normalization Engine
+Factorizes every dimension key of a denormalized frame once and emits all
+dimension tables plus integer foreign-key columns for the fact tables,
+without intermediate merged copies (shared by data_load.py and
+retail_sales_load.py)
+"""
+
+import numpy as np
+import pandas as pd
+from etl_profile import PROFILER
+
+# ============================================================================
+# 1. FACTORIZATION
+# ============================================================================
+
+def factorize_rows(df, key_cols):
+    """
+    Assign one integer code per distinct key, in order of first appearance.
+
+    Multi-column keys are combined column by column (re-factorizing after
+    each step keeps the combined codes below len(df) * cardinality). Null
+    key values get their own code, like drop_duplicates. Returns
+    (codes, first) where first[code] is the row position of the first
+    occurrence of that key.
+    """
+    codes, uniques = pd.factorize(df[key_cols[0]], use_na_sentinel=False)
+    for col in key_cols[1:]:
+        col_codes, col_uniques = pd.factorize(df[col], use_na_sentinel=False)
+        codes, uniques = pd.factorize(codes * len(col_uniques) + col_codes)
+
+    n_uniques = len(uniques)
+    first = np.empty(n_uniques, dtype=np.int64)
+    positions = np.arange(len(codes))
+    first[codes[::-1]] = positions[::-1]
+    return codes, first
+
+def canonical_key(value):
+    """
+    Normalize a key value for id lookups.
+
+    Keys are compared as text with trailing spaces and case ignored, the way
+    MySQL's default collation compares them in a UNIQUE index, so ids
+    fetched back from the database match the values in the source frame.
+    """
+    return None if pd.isna(value) else str(value).rstrip().casefold()
+
+def key_tuples(df, key_cols, positions=None):
+    """Canonical key values (at the given row positions), as hashable tuples"""
+    columns = [df[col].to_numpy(dtype=object) for col in key_cols]
+    if positions is not None:
+        columns = [values[positions] for values in columns]
+    return [tuple(canonical_key(v) for v in values) for values in zip(*columns)]
+
+# ============================================================================
+# 2. TABLE SPECS
+# ============================================================================
+
+class Dimension:
+    """
+    A table holding one row per distinct key of the source frame.
+
+    columns maps source column -> table column. With a surrogate id column,
+    ids are assigned by the engine, only rows for keys not seen before are
+    emitted, and fact tables can reference the id through foreign_keys.
+    dropna skips rows whose key is null.
+    """
+
+    def __init__(self, table, key, columns, surrogate=None, dropna=False):
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.surrogate = surrogate
+        self.dropna = dropna
+
+class Fact:
+    """
+    A table holding one row per source row (optionally filtered by `where`).
+
+    foreign_keys maps table column -> Dimension table whose surrogate id it
+    holds. derive, if given, is applied to the finished table to add
+    computed columns.
+    """
+
+    def __init__(self, table, columns, foreign_keys=None, where=None, derive=None):
+        self.table = table
+        self.columns = columns
+        self.foreign_keys = foreign_keys or {}
+        self.where = where
+        self.derive = derive
+
+def table_label(spec):
+    """How extraction messages name a spec's rows ('unique customers', 'order items')"""
+    label = spec.table.replace('_', ' ')
+    return 'unique ' + label if isinstance(spec, Dimension) else label
+
+# ============================================================================
+# 3. ENGINE
+# ============================================================================
+
+class Normalizer:
+    """
+    Splits denormalized frames into normalized tables in one pass.
+
+    Surrogate ids persist across normalize() calls, so streaming chunks
+    through the same Normalizer keeps ids consistent; seed_ids() lets the
+    caller start from ids that already exist in the database.
+    """
+
+    def __init__(self, specs):
+        self.specs = specs
+        self.known_ids = {spec.table: {} for spec in specs if isinstance(spec, Dimension) and spec.surrogate}
+
+    def seed_ids(self, table, ids):
+        """Register existing {key tuple: id} pairs for a surrogate dimension"""
+        self.known_ids[table].update(ids)
+
+    def next_id(self, table):
+        known = self.known_ids[table]
+        return max(known.values()) + 1 if known else 1
+
+    def unique_rows(self, spec, df):
+        """
+        Distinct rows of a dimension, before any surrogate id is assigned.
+
+        Returns (table, codes, first, keep): codes/first as from
+        factorize_rows over the kept rows, keep the dropna mask (or None).
+        """
+        keep = df[spec.key].notna().all(axis=1).to_numpy() if spec.dropna else None
+        rows = df[keep] if keep is not None else df
+        codes, first = factorize_rows(rows, spec.key)
+        table = rows.iloc[first][list(spec.columns)].rename(columns=spec.columns)
+        return table, codes, first, keep
+
+    def _dimension(self, spec, df, fk_columns):
+        table, codes, first, keep = self.unique_rows(spec, df)
+
+        if spec.surrogate:
+            known = self.known_ids[spec.table]
+            keys = key_tuples(table, [spec.columns[col] for col in spec.key])
+            ids = np.empty(len(keys), dtype=np.int64)
+            is_new = np.zeros(len(keys), dtype=bool)
+            next_id = self.next_id(spec.table)
+            for i, key in enumerate(keys):
+                if key not in known:
+                    known[key] = next_id
+                    next_id += 1
+                    is_new[i] = True
+                ids[i] = known[key]
+            table[spec.surrogate] = ids
+            table = table[is_new]
+
+            # Surrogate id for every source row (NaN where the key was dropped)
+            if keep is not None:
+                row_ids = np.full(len(df), np.nan)
+                row_ids[keep] = ids[codes]
+            else:
+                row_ids = ids[codes]
+            fk_columns[spec.table] = row_ids
+
+        return table.reset_index(drop=True)
+
+    def _fact(self, spec, df, fk_columns):
+        mask = spec.where(df).to_numpy(dtype=bool) if spec.where else None
+        rows = df[mask] if mask is not None else df
+        table = rows[list(spec.columns)].rename(columns=spec.columns).reset_index(drop=True)
+        for column, dimension in spec.foreign_keys.items():
+            ids = fk_columns[dimension]
+            table[column] = ids[mask] if mask is not None else ids
+        if spec.derive:
+            table = spec.derive(table)
+        return table
+
+    def extract_table(self, spec, df, fk_columns):
+        """One spec's table from df (fk_columns collects/provides surrogate ids per row)"""
+        if isinstance(spec, Dimension):
+            return self._dimension(spec, df, fk_columns)
+        return self._fact(spec, df, fk_columns)
+
+    def normalize(self, df):
+        """Return {table name: DataFrame} for every spec, in spec order"""
+        tables = {}
+        fk_columns = {}
+        for spec in self.specs:
+            with PROFILER.stage(f"extract {spec.table}") as stage:
+                tables[spec.table] = self.extract_table(spec, df, fk_columns)
+                stage.rows = len(tables[spec.table])
+            print(f"✓ Extracted {len(tables[spec.table])} {table_label(spec)}")
+        return tables
@@ -0,0 +1,128 @@
+"""
+Parallel Extraction
+Runs the normalization specs of a loader on a pool of worker processes:
+each frame is written once as an Arrow IPC file that the workers
+memory-map (no per-task pickling of the source), every table is extracted
+from row slices on separate cores, and the slices are merged in order so
+the result equals Normalizer.normalize (used by retail_sales_load.py)
+
+Only natural-key specs qualify: surrogate ids are assigned from state kept
+in one process, and specs must pickle (no lambdas in where/derive).
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from etl_normalize import Dimension, Normalizer, table_label
+from etl_profile import PROFILER
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = ipc = None
+
+# Frames under this many rows are extracted in-process; starting tasks costs more
+MIN_PARALLEL_ROWS = 50000
+
+def shared_dir():
+    """RAM-backed directory for the shared frames where the OS has one"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+# ============================================================================
+# 1. WORKER
+# ============================================================================
+
+def _extract_slice(path, spec, start, stop):
+    """Extract one spec's table from rows [start, stop) of the shared frame"""
+    columns = list(spec.columns)
+    with pa.memory_map(path) as source:
+        shared = ipc.open_file(source).read_all().select(columns).slice(start, stop - start)
+        df = shared.to_pandas()
+    return Normalizer([spec]).extract_table(spec, df, {})
+
+# ============================================================================
+# 2. POOL
+# ============================================================================
+
+class ParallelNormalizer:
+    """
+    Drop-in Normalizer that extracts tables on `workers` processes.
+
+    Each spec is split into `workers` row slices. Fact slices are
+    concatenated in row order; dimension slices are concatenated and
+    de-duplicated on the key keeping the first row, which is the row a
+    single pass keeps. The pool is started on the first large frame and
+    kept for every chunk; call close() at the end of the run.
+    """
+
+    def __init__(self, specs, workers):
+        if pa is None:
+            raise ImportError("Parallel extraction needs the pyarrow package (pip install pyarrow)")
+        for spec in specs:
+            if getattr(spec, 'surrogate', None) or getattr(spec, 'foreign_keys', None):
+                raise ValueError(f"Table '{spec.table}' uses surrogate ids, which cannot be extracted in parallel")
+        self.specs = specs
+        self.workers = workers
+        self.columns = list(dict.fromkeys(col for spec in specs for col in spec.columns))
+        self.serial = Normalizer(specs)
+        self.pool = None
+        self.frames = 0
+
+    def _share(self, df):
+        """Write the columns the specs read to a memory-mappable Arrow IPC file and return its path"""
+        self.frames += 1
+        path = os.path.join(shared_dir(), f"etl_extract_{os.getpid()}_{self.frames}.arrow")
+        table = pa.Table.from_pandas(df[self.columns], preserve_index=False)
+        with pa.OSFile(path, 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return path
+
+    def _merge(self, spec, parts):
+        table = pd.concat(parts, ignore_index=True)
+        if isinstance(spec, Dimension):
+            table = table.drop_duplicates(subset=[spec.columns[col] for col in spec.key], ignore_index=True)
+        return table
+
+    def normalize(self, df):
+        """Return {table name: DataFrame} for every spec, in spec order"""
+        if len(df) < MIN_PARALLEL_ROWS:
+            return self.serial.normalize(df)
+
+        # Columns Arrow cannot type (mixed Excel cells) are extracted in-process
+        try:
+            with PROFILER.stage('share frame') as stage:
+                path = self._share(df)
+                stage.rows = len(df)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            print(f"  Parallel extraction unavailable for this frame ({e}); extracting in-process")
+            return self.serial.normalize(df)
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        try:
+            with PROFILER.stage('parallel extract') as stage:
+                bounds = [len(df) * i // self.workers for i in range(self.workers + 1)]
+                futures = {
+                    spec.table: [self.pool.submit(_extract_slice, path, spec, start, stop)
+                                 for start, stop in zip(bounds, bounds[1:])]
+                    for spec in self.specs
+                }
+                tables = {spec.table: self._merge(spec, [f.result() for f in futures[spec.table]])
+                          for spec in self.specs}
+                stage.rows = sum(len(table) for table in tables.values())
+        finally:
+            os.remove(path)
+
+        for spec in self.specs:
+            print(f"✓ Extracted {len(tables[spec.table])} {table_label(spec)}")
+        return tables
+
+    def close(self):
+        """Stop the worker processes"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,162 @@
+"""
+Parquet Export
+Writes the normalized tables straight from the extracted frames as a
+Parquet dataset per table, for Power BI and ad-hoc pandas work: date-keyed
+tables are Hive-partitioned by year-month and low-cardinality columns are
+dictionary-encoded (shared by data_load.py and retail_sales_load.py)
+
+Reading it back: pd.read_parquet('<parquet_dir>/orders') returns every
+partition, with the partition column restored.
+"""
+
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from etl_convert import ddl_column_kinds, typed_column
+from etl_fresh_load import unique_column_sets
+from etl_profile import PROFILER
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+PARTITION_COLUMN = 'year_month'
+COMPRESSION = 'snappy'
+DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string()) if pa else None
+
+# Column kind (from the table's DDL, see etl_convert) -> Arrow type. DATE
+# columns stay timestamps, which pandas reads back as datetime64.
+ARROW_TYPES = {
+    'int': pa.int64(),
+    'float': pa.float64(),
+    'date': pa.timestamp('us'),
+    'datetime': pa.timestamp('us'),
+    'str': pa.string()
+} if pa else {}
+
+class ParquetSink:
+    """
+    Parquet dataset writer for one loader run.
+
+    Each write() call (the whole file, or one streamed chunk) adds a part
+    file per table, or per year-month directory for partitioned tables.
+    Rows repeating a primary/unique key of table_ddl are dropped, keeping
+    the first as INSERT IGNORE would, so the export holds the rows the
+    database holds. Table directories are replaced on the first write of a
+    run; other files under root are left alone.
+
+    partitions maps table -> date column to partition on (written as
+    year_month=YYYY-MM); dictionary maps table -> columns to
+    dictionary-encode. Other columns are stored plain, since dictionary
+    pages over near-unique ids only add a lookup per value.
+    """
+
+    def __init__(self, root, table_ddl, partitions=None, dictionary=None, compression=COMPRESSION):
+        if pq is None:
+            raise ImportError("The Parquet export needs the pyarrow package (pip install pyarrow)")
+        self.root = root
+        self.unique_sets = {table: unique_column_sets(ddl) for table, ddl in table_ddl.items()}
+        self.kinds = {table: ddl_column_kinds(ddl) for table, ddl in table_ddl.items()}
+        self.partitions = partitions or {}
+        self.dictionary = dictionary or {}
+        self.compression = compression
+        self.seen_keys = {}
+        self.parts = 0
+        self.rows = {}
+        self.elapsed = 0.0
+
+    def table_path(self, table):
+        return os.path.join(self.root, table)
+
+    def _new_rows(self, table, df):
+        """Drop rows whose primary/unique key was already written (in this frame or an earlier one)"""
+        for columns in self.unique_sets.get(table, []):
+            if not set(columns) <= set(df.columns):
+                continue
+            df = df.drop_duplicates(subset=columns)
+            seen = self.seen_keys.setdefault((table, tuple(columns)), set())
+            if seen:
+                keys = zip(*(df[col].to_numpy(dtype=object) for col in columns))
+                df = df[np.fromiter((key not in seen for key in keys), dtype=bool, count=len(df))]
+            seen.update(zip(*(df[col].to_numpy(dtype=object) for col in columns)))
+        return df
+
+    def _arrow_table(self, table, df):
+        """
+        The frame as an Arrow table typed from the table's DDL rather than
+        inferred per frame, so every part file of a table has the same
+        schema: an object column mixing strings and dates (Excel's discount
+        codes) is stored as text, and a column that is all null in one
+        chunk keeps its type
+        """
+        df = df.reset_index(drop=True)
+        kinds = self.kinds.get(table, {})
+        dictionary = set(self.dictionary.get(table, []))
+        arrays = []
+        for column in df.columns:
+            kind = kinds.get(column)
+            if kind is None:
+                array = pa.array(df[column], from_pandas=True)
+            else:
+                array = pa.array(typed_column(df[column], kind), type=ARROW_TYPES[kind],
+                                 from_pandas=True, safe=False)
+            # Dictionary columns are stored as Arrow dictionaries (read back
+            # as pandas categoricals) with a fixed index width
+            if column in dictionary and pa.types.is_string(array.type):
+                array = array.cast(DICTIONARY_TYPE)
+            arrays.append(array)
+        names = list(df.columns)
+
+        date_column = self.partitions.get(table)
+        if date_column:
+            months = pd.to_datetime(df[date_column], errors='coerce').dt.strftime('%Y-%m')
+            arrays.append(pa.array(months, type=pa.string(), from_pandas=True))
+            names.append(PARTITION_COLUMN)
+        return pa.Table.from_arrays(arrays, names=names)
+
+    def write(self, tables):
+        """Append one set of extracted frames ({table: DataFrame}) to the export"""
+        start = time.perf_counter()
+        with PROFILER.stage('parquet export') as stage:
+            self.parts += 1
+            stage.rows = 0
+            for table, df in tables.items():
+                path = self.table_path(table)
+                if self.parts == 1:
+                    shutil.rmtree(path, ignore_errors=True)
+                    os.makedirs(path)
+
+                df = self._new_rows(table, df)
+                if df.empty:
+                    continue
+                arrow_table = self._arrow_table(table, df)
+                options = dict(
+                    compression=self.compression,
+                    use_dictionary=[col for col in self.dictionary.get(table, []) if col in df.columns]
+                )
+                if table in self.partitions:
+                    pq.write_to_dataset(
+                        arrow_table, path, partition_cols=[PARTITION_COLUMN],
+                        basename_template=f"part-{self.parts:05d}-{{i}}.parquet",
+                        existing_data_behavior='overwrite_or_ignore', **options
+                    )
+                else:
+                    pq.write_table(arrow_table, os.path.join(path, f"part-{self.parts:05d}.parquet"), **options)
+                self.rows[table] = self.rows.get(table, 0) + len(df)
+                stage.rows += len(df)
+        self.elapsed += time.perf_counter() - start
+
+    def close(self):
+        """Print rows, files and size written per table"""
+        print(f"\n✓ Parquet export written to {self.root} in {self.elapsed:.2f}s")
+        for table, rows in self.rows.items():
+            files = [os.path.join(dirpath, name)
+                     for dirpath, _, names in os.walk(self.table_path(table))
+                     for name in names if name.endswith('.parquet')]
+            size = sum(os.path.getsize(f) for f in files)
+            layout = f", partitioned by {PARTITION_COLUMN}" if table in self.partitions else ''
+            print(f"  {table:<24} {rows:>10,} rows {len(files):>5} files {size / 1e6:>8.1f} MB{layout}")
@@ -0,0 +1,181 @@
+"""
+Stage Profiler
+Records wall time, CPU time, peak RSS growth and rows/sec for each step of
+a loader run, and writes them as a JSON run report and/or a text table
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import functools
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far (None if it cannot be read)"""
+    # Linux: VmHWM belongs to the current address space, unlike ru_maxrss,
+    # which a spawned child inherits from the parent it was forked from
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+def count_rows(result, args=()):
+    """Rows handled by a step: its returned frame(s), else its first frame argument"""
+    for value in (result, *args):
+        if isinstance(value, pd.DataFrame):
+            return len(value)
+        if isinstance(value, dict) and value and all(isinstance(v, pd.DataFrame) for v in value.values()):
+            return sum(len(v) for v in value.values())
+    return None
+
+class Stage:
+    """Measurements of one call; set .rows inside the block to report throughput"""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+class StageProfiler:
+    """
+    Aggregates per-stage measurements over a run.
+
+    A stage may run many times (once per chunk, or from several scheduler
+    threads); calls, times and rows are summed and the peak RSS growth is
+    the largest seen. CPU time is the calling thread's, so parallel inserts
+    are not counted twice. Disabled profilers cost one attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.started = None
+
+    def enable(self):
+        self.enabled = True
+        self.stages = {}
+        self.started = (datetime.now(), time.perf_counter(), peak_rss_bytes())
+
+    @contextmanager
+    def stage(self, name):
+        """Measure the enclosed block as one call of stage `name`"""
+        stage = Stage(name)
+        if not self.enabled:
+            yield stage
+            return
+
+        rss_before = peak_rss_bytes()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield stage
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            rss_after = peak_rss_bytes()
+            growth = rss_after - rss_before if rss_before is not None else None
+            self._record(name, wall, cpu, stage.rows, growth)
+
+    def _record(self, name, wall, cpu, rows, rss_growth):
+        with self.lock:
+            entry = self.stages.setdefault(name, {
+                'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows': None, 'peak_rss_growth_mb': None
+            })
+            entry['calls'] += 1
+            entry['wall_s'] += wall
+            entry['cpu_s'] += cpu
+            if rows is not None:
+                entry['rows'] = (entry['rows'] or 0) + rows
+            if rss_growth is not None:
+                entry['peak_rss_growth_mb'] = max(entry['peak_rss_growth_mb'] or 0.0, rss_growth / 1e6)
+
+    def profiled(self, name=None):
+        """Decorator: run the function as a stage (named after it by default), counting its rows"""
+        def decorator(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(stage_name) as stage:
+                    result = func(*args, **kwargs)
+                    stage.rows = count_rows(result, args)
+                return result
+            return wrapper
+        return decorator
+
+    # ------------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------------
+
+    def report(self, loader=None):
+        """The run report as a JSON-serializable dict"""
+        started_at, start, rss_start = self.started
+        peak = peak_rss_bytes()
+        stages = []
+        for name, entry in self.stages.items():
+            rows_per_s = entry['rows'] / entry['wall_s'] if entry['rows'] and entry['wall_s'] > 0 else None
+            stages.append({'stage': name, **entry, 'rows_per_s': rows_per_s})
+        return {
+            'loader': loader,
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'wall_s': time.perf_counter() - start,
+            'peak_rss_mb': peak / 1e6 if peak is not None else None,
+            'peak_rss_growth_mb': (peak - rss_start) / 1e6 if peak is not None else None,
+            'stages': stages
+        }
+
+    def print_table(self, report):
+        print("\n" + "="*80)
+        print("RUN PROFILE")
+        print("="*80)
+        print(f"{'stage':<32} {'calls':>5} {'wall s':>8} {'cpu s':>8} {'rows':>10} {'rows/s':>10} {'+RSS MB':>8}")
+        for s in report['stages']:
+            rows = f"{s['rows']:,}" if s['rows'] is not None else '-'
+            rate = f"{s['rows_per_s']:,.0f}" if s['rows_per_s'] is not None else '-'
+            rss = f"{s['peak_rss_growth_mb']:.1f}" if s['peak_rss_growth_mb'] is not None else '-'
+            print(f"{s['stage']:<32} {s['calls']:>5} {s['wall_s']:>8.2f} {s['cpu_s']:>8.2f} "
+                  f"{rows:>10} {rate:>10} {rss:>8}")
+        peak = f"{report['peak_rss_mb']:.1f} MB" if report['peak_rss_mb'] is not None else 'n/a'
+        print(f"Total {report['wall_s']:.2f}s, peak RSS {peak}")
+
+    def finish(self, loader=None, json_path=None, table=False):
+        """Write the JSON report and/or print the table; returns the report"""
+        if not self.enabled:
+            return None
+        report = self.report(loader)
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"✓ Run report written to {json_path}")
+        if table:
+            self.print_table(report)
+        return report
+
+# One profiler per process, so loader functions can be decorated at import time
+PROFILER = StageProfiler()
+profiled = PROFILER.profiled
@@ -0,0 +1,322 @@
+"""
+Reporting Query Cache
+Serves the result rows of reporting queries from a cache keyed on the
+normalized SQL, its parameters and the data version of every table it
+reads. The loaders bump a table's version each time they commit rows into
+it, so a result stays valid exactly until its tables change. Results are
+kept in an in-process LRU tier and an on-disk tier (pickle files, LRU
+evicted by size), both with a TTL, and hits and misses are counted per
+tier (shared by data_load.py and retail_sales_load.py)
+
+Usage: python src/etl_query_cache.py [list | clear] [--dir CACHE_DIR]
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from collections import OrderedDict
+
+CACHE_DIR = '.etl_query_cache'
+MAX_CACHE_MB = 256
+MAX_MEMORY_ENTRIES = 256
+TTL_SECONDS = 3600
+INDEX_FILE = 'index.json'
+
+VERSION_TABLES = {
+    'etl_table_versions': """
+        CREATE TABLE IF NOT EXISTS etl_table_versions (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+
+# ============================================================================
+# 1. DATA VERSIONS
+# ============================================================================
+
+def create_version_table(connection, backend, tables):
+    """Create etl_table_versions and a version-0 row for every table it lacks"""
+    cursor = connection.cursor()
+    try:
+        for table_name, create_statement in VERSION_TABLES.items():
+            for statement in backend.table_statements(table_name, create_statement):
+                cursor.execute(statement)
+        cursor.execute("SELECT table_name FROM etl_table_versions")
+        known = {row[0] for row in cursor.fetchall()}
+        for table in tables:
+            if table not in known:
+                cursor.execute(f"INSERT INTO etl_table_versions (table_name, version) "
+                               f"VALUES ({backend.param}, 0)", (table,))
+        connection.commit()
+    finally:
+        cursor.close()
+
+def bump_version(connection, table, backend):
+    """Record that rows of a table were committed (invalidates cached results reading it)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"UPDATE etl_table_versions SET version = version + 1 "
+                       f"WHERE table_name = {backend.param}", (table,))
+        connection.commit()
+    finally:
+        cursor.close()
+
+def table_versions(connection, tables, backend):
+    """{table: version} for the given tables (tables without a row are left out)"""
+    if not tables:
+        return {}
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT table_name, version FROM etl_table_versions "
+                       f"WHERE table_name IN ({', '.join([backend.param] * len(tables))})", tuple(tables))
+        versions = {name: int(version) for name, version in cursor.fetchall()}
+    finally:
+        cursor.close()
+    # End the read, so the next lookup sees versions committed meanwhile
+    connection.commit()
+    return versions
+
+# ============================================================================
+# 2. SQL NORMALIZATION
+# ============================================================================
+
+QUOTED = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""", re.DOTALL)
+COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+
+def normalize_sql(sql):
+    """
+    Canonical text of a query: comments dropped, whitespace collapsed and
+    everything outside quoted literals lower-cased, so reformatting or
+    re-indenting a query keeps its cache entries
+    """
+    parts = []
+    for i, part in enumerate(QUOTED.split(sql)):
+        if i % 2:
+            parts.append(part)
+        else:
+            parts.append(re.sub(r'\s+', ' ', COMMENT.sub(' ', part)).lower())
+    return ''.join(parts).strip().rstrip(';').strip()
+
+def referenced_tables(normalized, tables):
+    """The tables (of the given names) a normalized query mentions outside literals"""
+    words = set(re.findall(r'\w+', ' '.join(QUOTED.split(normalized)[::2])))
+    return sorted(table for table in tables if table.lower() in words)
+
+# ============================================================================
+# 3. CACHE
+# ============================================================================
+
+class QueryCache:
+    """
+    Result cache for one database's reporting queries.
+
+    namespace identifies the database (server and schema, or file), so
+    the shared tiers never mix results of different databases. A query
+    mentioning a table that has no version row is always run, never
+    cached. The in-process tier is shared by every QueryCache of the
+    process and holds up to max_entries results; the on-disk tier (when
+    cache_dir is set) is bounded by max_mb. Entries older than ttl seconds
+    are dropped even when no load bumped their tables, which bounds
+    staleness from writers that do not record versions.
+    """
+
+    memory = OrderedDict()
+
+    def __init__(self, connection, backend, tables, namespace, cache_dir=None, ttl=TTL_SECONDS,
+                 max_entries=MAX_MEMORY_ENTRIES, max_mb=MAX_CACHE_MB):
+        self.connection = connection
+        self.backend = backend
+        self.tables = list(tables)
+        self.namespace = namespace
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = dict.fromkeys(('memory_hits', 'disk_hits', 'misses', 'uncached', 'expired', 'evicted'), 0)
+        self.index = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.index = self._read_index()
+
+    # ------------------------------------------------------------------------
+    # Disk index
+    # ------------------------------------------------------------------------
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self._index_path())
+
+    def _remove(self, key):
+        entry = self.index.pop(key)
+        try:
+            os.remove(os.path.join(self.cache_dir, entry['file']))
+        except OSError:
+            pass
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self.index.values())
+
+    def evict(self):
+        """Drop expired disk entries, then least-recently-used ones until the tier fits in max_bytes"""
+        now = time.time()
+        for key in [key for key, entry in self.index.items() if now - entry['created'] > self.ttl]:
+            self._remove(key)
+            self.stats['evicted'] += 1
+        by_age = sorted(self.index, key=lambda key: self.index[key]['last_used'])
+        while by_age and self.total_bytes() > self.max_bytes:
+            self._remove(by_age.pop(0))
+            self.stats['evicted'] += 1
+
+    def clear(self):
+        """Empty both tiers; returns the disk entries removed"""
+        removed = len(self.index)
+        for key in list(self.index):
+            self._remove(key)
+        if self.cache_dir:
+            self._write_index()
+        QueryCache.memory.clear()
+        return removed
+
+    # ------------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------------
+
+    def _key(self, normalized, params, versions):
+        raw = f"{self.namespace}|{normalized}|{params!r}|{sorted(versions.items())}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:24]
+
+    def _get(self, key):
+        """Cached rows for a key from the memory, then the disk tier (None on a miss)"""
+        now = time.time()
+        entry = QueryCache.memory.get(key)
+        if entry is not None:
+            if now - entry['created'] <= self.ttl:
+                QueryCache.memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return entry['rows']
+            del QueryCache.memory[key]
+            self.stats['expired'] += 1
+
+        entry = self.index.get(key)
+        if entry is not None:
+            if now - entry['created'] > self.ttl:
+                self._remove(key)
+                self._write_index()
+                self.stats['expired'] += 1
+                return None
+            try:
+                with open(os.path.join(self.cache_dir, entry['file']), 'rb') as f:
+                    rows = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return None
+            entry['last_used'] = now
+            self._write_index()
+            self._remember(key, rows, entry['created'])
+            self.stats['disk_hits'] += 1
+            return rows
+        return None
+
+    def _remember(self, key, rows, created):
+        QueryCache.memory[key] = {'rows': rows, 'created': created}
+        QueryCache.memory.move_to_end(key)
+        while len(QueryCache.memory) > self.max_entries:
+            QueryCache.memory.popitem(last=False)
+            self.stats['evicted'] += 1
+
+    def _put(self, key, rows, normalized):
+        created = time.time()
+        self._remember(key, rows, created)
+        if not self.cache_dir:
+            return
+        file_name = f"{key}.pkl"
+        with open(os.path.join(self.cache_dir, file_name), 'wb') as f:
+            pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.index[key] = {
+            'namespace': self.namespace,
+            'sql': normalized[:120],
+            'file': file_name,
+            'bytes': os.path.getsize(os.path.join(self.cache_dir, file_name)),
+            'created': created,
+            'last_used': created
+        }
+        self.evict()
+        self._write_index()
+
+    def fetch(self, query, params=()):
+        """Rows of a query, from the cache while the versions of the tables it reads are unchanged"""
+        normalized = normalize_sql(query)
+        tables = referenced_tables(normalized, self.tables)
+        versions = table_versions(self.connection, tables, self.backend)
+        if not tables or len(versions) < len(tables):
+            self.stats['uncached'] += 1
+            return self._run(query, params)
+
+        key = self._key(normalized, tuple(params), versions)
+        rows = self._get(key)
+        if rows is None:
+            self.stats['misses'] += 1
+            rows = self._run(query, params)
+            self._put(key, rows, normalized)
+        return rows
+
+    def _run(self, query, params):
+        cursor = self.connection.cursor()
+        try:
+            if params:
+                cursor.execute(query, tuple(params))
+            else:
+                cursor.execute(query)
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def report(self):
+        """Print hit/miss counts for this cache's lookups"""
+        s = self.stats
+        lookups = s['memory_hits'] + s['disk_hits'] + s['misses']
+        rate = (s['memory_hits'] + s['disk_hits']) / lookups if lookups else 0
+        print(f"\n✓ Query cache: {s['memory_hits']} memory hits, {s['disk_hits']} disk hits, "
+              f"{s['misses']} misses ({rate:.0%} hit rate); {s['uncached']} uncached, "
+              f"{s['expired']} expired, {s['evicted']} evicted")
+
+def main():
+    args = sys.argv[1:]
+    cache_dir = CACHE_DIR
+    if '--dir' in args:
+        i = args.index('--dir')
+        cache_dir = args[i + 1]
+        del args[i:i + 2]
+    cache = QueryCache(None, None, [], '', cache_dir)
+
+    command = args[0] if args else 'list'
+    if command == 'clear':
+        print(f"✓ Removed {cache.clear()} cache entries from {cache_dir}")
+    elif command == 'list':
+        now = time.time()
+        for key, entry in cache.index.items():
+            print(f"{key}  {entry['bytes'] / 1e3:8.1f} kB  {(now - entry['created']) / 60:6.0f} min  "
+                  f"{entry['namespace']:<30}  {entry['sql'][:60]}")
+        print(f"{len(cache.index)} entries, {cache.total_bytes() / 1e6:.1f} MB / {cache.max_bytes / 1e6:.0f} MB")
+    else:
+        print(__doc__)
+
+if __name__ == "__main__":
+    main()
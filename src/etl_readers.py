@@ -0,0 +1,98 @@
+"""
+Source File Readers
+Whole-file and chunked (bounded memory) readers for .xlsx and .csv inputs
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import os
+import pandas as pd
+
+CSV_EXTENSIONS = ('.csv', '.txt')
+
+def is_csv(file_path):
+    """True if the file should be read as CSV rather than Excel"""
+    return os.path.splitext(file_path)[1].lower() in CSV_EXTENSIONS
+
+def read_frame(file_path, sheet_name=0):
+    """Read a whole .xlsx or .csv file into a single DataFrame"""
+    if is_csv(file_path):
+        return pd.read_csv(file_path)
+    return pd.read_excel(file_path, sheet_name=sheet_name)
+
+def _apply_dtype(df, dtype):
+    """
+    Cast the columns named in `dtype` (ignoring any the frame lacks).
+
+    str columns are stringified value by value with missing values kept:
+    astype(str) would turn NaN into 'nan', and astype(object) leaves a
+    block that pandas read as datetime64 holding Timestamps.
+    """
+    if not dtype:
+        return df
+    casts = {}
+    for col, kind in dtype.items():
+        if col not in df.columns:
+            continue
+        if kind in (str, 'str'):
+            df[col] = df[col].map(str, na_action='ignore').astype(object)
+        else:
+            casts[col] = kind
+    return df.astype(casts) if casts else df
+
+def iter_excel_chunks(file_path, chunk_size, sheet_name=0, dtype=None):
+    """
+    Yield fixed-size DataFrame blocks from an .xlsx sheet.
+
+    Uses openpyxl read-only mode, which streams rows from the sheet XML
+    instead of building the whole workbook in memory. Column types are
+    inferred per block, so pass `dtype` for mixed-type columns that must
+    keep the same type in every block.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if isinstance(sheet_name, int):
+            sheet = workbook.worksheets[sheet_name]
+        else:
+            sheet = workbook[sheet_name]
+
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        # Drop trailing unnamed columns (read-only mode reports the sheet's
+        # full dimension, which often includes empty formatted columns)
+        width = len(header)
+        while width and header[width - 1] is None:
+            width -= 1
+        columns = list(header[:width])
+
+        block = []
+        for row in rows:
+            row = row[:width]
+            if all(value is None for value in row):
+                continue
+            block.append(row)
+            if len(block) >= chunk_size:
+                yield _apply_dtype(pd.DataFrame(block, columns=columns), dtype)
+                block = []
+        if block:
+            yield _apply_dtype(pd.DataFrame(block, columns=columns), dtype)
+    finally:
+        workbook.close()
+
+def iter_csv_chunks(file_path, chunk_size, dtype=None):
+    """Yield fixed-size DataFrame blocks from a .csv file"""
+    with pd.read_csv(file_path, chunksize=chunk_size, dtype=dtype) as reader:
+        for chunk in reader:
+            yield chunk.reset_index(drop=True)
+
+def iter_chunks(file_path, chunk_size, sheet_name=0, dtype=None):
+    """Yield fixed-size DataFrame blocks from a .xlsx or .csv file"""
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if is_csv(file_path):
+        return iter_csv_chunks(file_path, chunk_size, dtype)
+    return iter_excel_chunks(file_path, chunk_size, sheet_name, dtype)
@@ -0,0 +1,415 @@
+"""
+Reconciliation
+Checks that a dump (such as Data/ecommerce_db.sql) or a loaded database
+holds exactly the normalized tables a loader extracts from its workbook.
+Every row gets a fingerprint of its canonical values, rows are bucketed by
+a hash of their natural key, and bucket fingerprints are summed up a
+binary (Merkle-style) tree per table; the two trees are compared from the
+root down, so only the buckets under differing nodes are opened and the
+missing, extra and changed keys come out in time proportional to the
+differences rather than to the table
+
+Usage: python src/etl_reconcile.py WORKBOOK [--loader data_load|retail_sales_load]
+                                            [--dump DUMP | --backend mysql|sqlite|duckdb [--db-path PATH]]
+                                            [--table NAME ...] [--show N] [--leaf-rows N]
+                                            [--json REPORT_PATH]
+
+Without --dump the tables are read from the loader's database (its
+LOAD_CONFIG backend unless --backend is given). Exits with status 1 when
+any table differs.
+"""
+
+import argparse
+import importlib
+import json
+import math
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from etl_backends import DATABASE_ERRORS, get_backend
+from etl_connection import ConnectionFactory
+from etl_incremental import KEY_SEPARATOR
+from etl_restore import Dump, iter_batches
+
+LOADERS = ('data_load', 'retail_sales_load')
+
+# Average rows per leaf bucket; the tree is as deep as the larger side needs
+LEAF_ROWS = 64
+MAX_DEPTH = 24
+# Places numbers are compared to (the loaders' DECIMAL columns keep two)
+DECIMALS = 2
+# Keys listed per kind of difference
+SHOW = 10
+
+NULL_TOKEN = '\x00'
+NULL_NUMBER = np.iinfo(np.int64).min
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# ============================================================================
+# 1. ROW FINGERPRINTS
+# ============================================================================
+
+def _canonical_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return NULL_TOKEN
+    if isinstance(value, (int, float, Decimal, np.number)) and not isinstance(value, bool):
+        return f"{float(value):.{DECIMALS}f}"
+    if isinstance(value, (datetime, np.datetime64)):
+        return str(pd.Timestamp(value)).removesuffix(' 00:00:00')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    # Text columns fed Excel date cells hold them as 'YYYY-MM-DD 00:00:00'
+    return str(value).removesuffix(' 00:00:00')
+
+def column_kind(series):
+    """
+    'number', 'datetime' or 'text': how a column is fingerprinted. Object
+    columns count as numbers or dates when every value is one (MySQL hands
+    back Decimal and datetime.date objects); anything mixed is text.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return 'number'
+    if series.dtype == object:
+        kinds = {type(value) for value in series.dropna().unique()}
+        if kinds and all(issubclass(kind, (int, float, Decimal, np.number)) and kind is not bool for kind in kinds):
+            return 'number'
+        if kinds and all(issubclass(kind, (date, np.datetime64)) for kind in kinds):
+            return 'datetime'
+    return 'text'
+
+def canonical_values(series, kind='text'):
+    """
+    One column's values in a form that compares equal whichever side they
+    came from: numbers as int64 hundredths (DECIMALS places; Decimal, int
+    and float alike), dates as int64 nanoseconds, text with the canonical
+    spelling of any number or date cell in it. Missing values become one
+    sentinel (or NULL_TOKEN for text).
+    """
+    if kind == 'number':
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        missing = np.isnan(numbers)
+        values = np.round(np.where(missing, 0, numbers) * 10 ** DECIMALS).astype(np.int64)
+        values[missing] = NULL_NUMBER
+        return values
+    if kind == 'datetime':
+        return pd.to_datetime(series).to_numpy(dtype='datetime64[ns]').view(np.int64)
+    if isinstance(series.dtype, pd.StringDtype):
+        return series.str.removesuffix(' 00:00:00').fillna(NULL_TOKEN).to_numpy(dtype=object)
+    return series.map(_canonical_value).to_numpy(dtype=object)
+
+def display_value(value):
+    """A single cell as the text shown for changed rows"""
+    text = _canonical_value(value)
+    return None if text == NULL_TOKEN else text
+
+def _hash(values):
+    return pd.util.hash_array(np.asarray(values), categorize=False)
+
+def key_text(df, key_cols):
+    """
+    One string per row from the key columns, compared as a UNIQUE index
+    compares them (trailing spaces and case ignored, see
+    etl_normalize.canonical_key)
+    """
+    keys = pd.Series(canonical_values(df[key_cols[0]]), dtype='str')
+    for col in key_cols[1:]:
+        keys = keys + KEY_SEPARATOR + pd.Series(canonical_values(df[col]), dtype='str')
+    return keys.str.rstrip().str.lower().to_numpy(dtype=object)
+
+def fingerprint(df, key_cols, columns):
+    """
+    Return (keys, key hashes, row hashes) for a table; columns maps each
+    compared column to its kind. Rows sharing a key (order lines of one
+    SKU, say) are told apart by an occurrence number taken in content
+    order, so identical duplicates pair up on both sides. The first
+    occurrence keeps the bare key, so a key doubled on one side only
+    matches once and reports the copies as extra.
+    """
+    keys = key_text(df, key_cols)
+    content = np.zeros(len(df), dtype=np.uint64)
+    for col, kind in columns.items():
+        content = content * HASH_MULTIPLIER ^ _hash(canonical_values(df[col], kind))
+
+    if pd.Series(keys).duplicated().any():
+        ranked = pd.DataFrame({'key': keys, 'content': content})
+        occurrence = ranked.sort_values(['key', 'content'], kind='stable').groupby('key').cumcount().sort_index()
+        repeated = (occurrence > 0).to_numpy()
+        keys = keys.copy()
+        keys[repeated] = keys[repeated] + '#' + occurrence[repeated].astype(str).to_numpy(dtype=object)
+
+    key_hashes = _hash(keys)
+    return keys, key_hashes, key_hashes * HASH_MULTIPLIER ^ content
+
+# ============================================================================
+# 2. HASH TREE
+# ============================================================================
+
+class RowTree:
+    """
+    Rows bucketed by the top `depth` bits of their key hash, with the
+    wrapped uint64 sum of the row hashes per bucket and per node above it.
+    Sums (unlike XOR) keep duplicate rows from cancelling out, and both
+    sides put a key in the same bucket whatever the row order.
+    """
+
+    def __init__(self, keys, key_hashes, row_hashes, depth):
+        self.keys = keys
+        self.row_hashes = row_hashes
+        self.depth = depth
+
+        leaves = (key_hashes >> np.uint64(64 - depth)).astype(np.int64) if depth else np.zeros(len(keys), np.int64)
+        self.order = np.argsort(leaves, kind='stable')
+        self.bounds = np.searchsorted(leaves[self.order], np.arange(2 ** depth + 1))
+
+        sums = np.zeros(2 ** depth, dtype=np.uint64)
+        np.add.at(sums, leaves, row_hashes)
+        self.levels = [sums]
+        while len(self.levels[0]) > 1:
+            self.levels.insert(0, self.levels[0].reshape(-1, 2).sum(axis=1, dtype=np.uint64))
+
+    def leaf_rows(self, leaves):
+        """Row positions in the given buckets"""
+        if not leaves:
+            return np.array([], dtype=np.int64)
+        return np.concatenate([self.order[self.bounds[leaf]:self.bounds[leaf + 1]] for leaf in leaves])
+
+def differing_leaves(expected, actual):
+    """Walk both trees from the root; returns (differing buckets, nodes compared)"""
+    leaves, compared = [], 0
+    stack = [(0, 0)]
+    while stack:
+        level, node = stack.pop()
+        compared += 1
+        if expected.levels[level][node] == actual.levels[level][node]:
+            continue
+        if level == expected.depth:
+            leaves.append(node)
+        else:
+            stack.extend([(level + 1, 2 * node + 1), (level + 1, 2 * node)])
+    return sorted(leaves), compared
+
+def tree_depth(rows, leaf_rows=LEAF_ROWS):
+    return min(MAX_DEPTH, max(0, math.ceil(math.log2(max(rows, 1) / leaf_rows))))
+
+# ============================================================================
+# 3. RECONCILIATION
+# ============================================================================
+
+def resolve_surrogates(tables, specs):
+    """
+    Replace surrogate ids with the natural keys they stand for: dropped from
+    their dimension, and mapped to the key text in the foreign key columns
+    of the other tables (ids are assigned in load order, so they need not
+    agree between two loads of the same data)
+    """
+    resolved = dict(tables)
+    names = {}
+    for spec in specs:
+        surrogate = getattr(spec, 'surrogate', None)
+        if surrogate and spec.table in tables:
+            dim = tables[spec.table]
+            key_cols = [spec.columns[col] for col in spec.key]
+            names[spec.table] = pd.Series(key_text(dim, key_cols), index=dim[surrogate].to_numpy())
+            resolved[spec.table] = dim.drop(columns=[surrogate])
+    for spec in specs:
+        for fk_col, parent in getattr(spec, 'foreign_keys', {}).items():
+            table = resolved.get(spec.table)
+            if parent in names and table is not None and fk_col in table.columns:
+                resolved[spec.table] = table.assign(**{fk_col: table[fk_col].map(names[parent])})
+    return resolved
+
+def _changed_columns(expected, actual, columns, expected_pos, actual_pos):
+    """{column: (expected, actual)} for the columns of one changed row that differ"""
+    changes = {}
+    for col, kind in columns.items():
+        before, after = expected[col].iloc[[expected_pos]], actual[col].iloc[[actual_pos]]
+        if canonical_values(before, kind)[0] != canonical_values(after, kind)[0]:
+            changes[col] = (display_value(before.iloc[0]), display_value(after.iloc[0]))
+    return changes
+
+def reconcile_table(expected, actual, key_cols, leaf_rows=LEAF_ROWS, show=SHOW):
+    """
+    Compare one table. A column read as numbers or dates on one side and
+    text on the other is compared as text. Columns present on the expected
+    side only are reported as unchecked; columns only the actual side has
+    (created_at, surrogate ids) are ignored.
+    """
+    start = time.perf_counter()
+    columns = {}
+    for col in expected.columns:
+        if col in actual.columns and col not in key_cols:
+            kinds = {column_kind(expected[col]), column_kind(actual[col])}
+            columns[col] = kinds.pop() if len(kinds) == 1 else 'text'
+    unchecked = [col for col in expected.columns if col not in actual.columns]
+    depth = tree_depth(max(len(expected), len(actual)), leaf_rows)
+    trees = [RowTree(*fingerprint(df, key_cols, columns), depth) for df in (expected, actual)]
+    leaves, compared = differing_leaves(*trees)
+
+    # Only the rows in differing buckets are looked at individually
+    positions = [tree.leaf_rows(leaves) for tree in trees]
+    expected_rows, actual_rows = [
+        {tree.keys[pos]: (tree.row_hashes[pos], pos) for pos in rows}
+        for tree, rows in zip(trees, positions)
+    ]
+    missing = sorted(expected_rows.keys() - actual_rows.keys())
+    extra = sorted(actual_rows.keys() - expected_rows.keys())
+    changed = sorted(key for key in expected_rows.keys() & actual_rows.keys()
+                     if expected_rows[key][0] != actual_rows[key][0])
+
+    return {
+        'expected_rows': len(expected),
+        'actual_rows': len(actual),
+        'missing': len(missing),
+        'extra': len(extra),
+        'changed': len(changed),
+        'missing_keys': missing[:show],
+        'extra_keys': extra[:show],
+        'changed_rows': {
+            key: _changed_columns(expected, actual, columns, expected_rows[key][1], actual_rows[key][1])
+            for key in changed[:show]
+        },
+        'unchecked_columns': unchecked,
+        'buckets': 2 ** depth,
+        'nodes_compared': compared,
+        'buckets_opened': len(leaves),
+        'rows_opened': int(sum(len(rows) for rows in positions)),
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+def reconcile(expected_tables, actual_tables, keys, specs=(), leaf_rows=LEAF_ROWS, show=SHOW):
+    """Reconcile every table of keys; returns {table: report}"""
+    expected_tables = resolve_surrogates(expected_tables, specs)
+    actual_tables = resolve_surrogates(actual_tables, specs)
+    report = {}
+    for table, key_cols in keys.items():
+        expected = expected_tables[table]
+        actual = actual_tables.get(table)
+        if actual is None:
+            actual = pd.DataFrame(columns=expected.columns)
+        report[table] = reconcile_table(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                        key_cols, leaf_rows, show)
+    return report
+
+# ============================================================================
+# 4. SOURCES
+# ============================================================================
+
+def workbook_tables(module, file_path):
+    """The loader's normalized tables, extracted from its workbook in one pass"""
+    return module.extract_all(module.read_and_transform(file_path))
+
+def dump_tables(path, names):
+    """Tables of a dump file as typed frames (absent tables left out)"""
+    dump = Dump(path)
+    tables = {}
+    for name in names:
+        if name in dump.tables:
+            table = dump.tables[name]
+            batches = list(iter_batches(dump, table))
+            tables[name] = (pd.concat(batches, ignore_index=True) if batches
+                            else pd.DataFrame(columns=[col for col, _ in table.schema]))
+    return tables
+
+def database_tables(connection, names):
+    """Tables read back from a database connection (absent tables left out)"""
+    cursor = connection.cursor()
+    try:
+        tables = {}
+        for name in names:
+            try:
+                cursor.execute(f"SELECT * FROM {name}")
+            except DATABASE_ERRORS:
+                continue
+            tables[name] = pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+        return tables
+    finally:
+        cursor.close()
+
+# ============================================================================
+# 5. REPORT & COMMAND LINE
+# ============================================================================
+
+def print_report(report):
+    print("\n" + "="*80)
+    print("RECONCILIATION")
+    print("="*80)
+    for table, result in report.items():
+        differences = result['missing'] + result['extra'] + result['changed']
+        scope = (f"{result['nodes_compared']} of {2 * result['buckets'] - 1} nodes compared, "
+                 f"{result['rows_opened']} rows opened, {result['seconds']:.2f}s")
+        if not differences:
+            print(f"✓ {table}: {result['expected_rows']} rows match ({scope})")
+        else:
+            print(f"✗ {table}: {result['missing']} missing, {result['extra']} extra, "
+                  f"{result['changed']} changed of {result['expected_rows']} rows ({scope})")
+        for label, keys in (('missing', result['missing_keys']), ('extra', result['extra_keys'])):
+            if keys:
+                print(f"  {label}: {', '.join(key.replace(KEY_SEPARATOR, '|') for key in keys)}")
+        for key, changes in result['changed_rows'].items():
+            detail = '; '.join(f"{col}: {before!r} -> {after!r}" for col, (before, after) in changes.items())
+            print(f"  changed {key.replace(KEY_SEPARATOR, '|')}: {detail}")
+        if result['unchecked_columns']:
+            print(f"  not in the compared data: {', '.join(result['unchecked_columns'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile a dump or database with the loader's workbook")
+    parser.add_argument('workbook')
+    parser.add_argument('--loader', default='data_load', choices=LOADERS)
+    parser.add_argument('--dump', help="Compare this dump file instead of a database")
+    parser.add_argument('--backend', choices=('mysql', 'sqlite', 'duckdb'),
+                        help="Database to compare (default: the loader's LOAD_CONFIG backend)")
+    parser.add_argument('--db-path', help="SQLite/DuckDB file (default: the loader's backend_path or <database>.<backend>)")
+    parser.add_argument('--table', action='append', default=[], metavar='NAME',
+                        help="Only these tables (default: all of the loader's)")
+    parser.add_argument('--show', type=int, default=SHOW, help="Keys listed per kind of difference")
+    parser.add_argument('--leaf-rows', type=int, default=LEAF_ROWS)
+    parser.add_argument('--json', metavar='REPORT_PATH')
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.loader)
+    unknown = set(args.table) - set(module.RECONCILE_KEYS)
+    if unknown:
+        parser.error(f"unknown tables {', '.join(sorted(unknown))} (expected {', '.join(module.RECONCILE_KEYS)})")
+    keys = {table: cols for table, cols in module.RECONCILE_KEYS.items() if not args.table or table in args.table}
+
+    # Surrogate ids are only comparable once every table they refer to is read
+    names = list(module.RECONCILE_KEYS)
+    expected = workbook_tables(module, args.workbook)
+    if args.dump:
+        actual = dump_tables(args.dump, names)
+        source = args.dump
+    else:
+        backend = get_backend(args.backend or module.LOAD_CONFIG['backend'])
+        if backend.name == 'mysql':
+            connection = ConnectionFactory(module.DB_CONFIG, pool_size=1).connect()
+            source = f"MySQL database '{module.DB_CONFIG['database']}'"
+        else:
+            source = args.db_path or module.LOAD_CONFIG['backend_path'] or f"{module.DB_CONFIG['database']}.{backend.name}"
+            connection = backend.connect(source)
+        try:
+            actual = database_tables(connection, names)
+        finally:
+            connection.close()
+
+    print(f"\nReconciling {args.workbook} with {source}")
+    report = reconcile(expected, actual, keys, module.NORMALIZATION, args.leaf_rows, args.show)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'loader': args.loader, 'workbook': args.workbook, 'source': source, 'tables': report},
+                      f, indent=2, default=str)
+        print(f"✓ Report written to {args.json}")
+
+    if any(result['missing'] or result['extra'] or result['changed'] for result in report.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Dump Restore
+Restores a phpMyAdmin / mysqldump file such as Data/ecommerce_db.sql
+without the single-threaded mysql client: the dump is indexed once, each
+table's INSERT blocks are parsed into typed row batches on their own, and
+the batches are bulk loaded into MySQL table by table in parallel (keys,
+AUTO_INCREMENT and foreign keys added after the data), or written straight
+to a SQLite/DuckDB file or a Parquet dataset with no MySQL server at all
+
+Usage: python src/etl_restore.py DUMP [--target mysql|sqlite|duckdb|parquet]
+                                      [--out PATH] [--database NAME]
+                                      [--workers N] [--batch-rows N]
+                                      [--bulk-load] [--drop-existing]
+
+The MySQL target connects with data_load.DB_CONFIG (database from the dump
+unless --database is given); --out names the SQLite/DuckDB file or the
+Parquet directory.
+"""
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+import pandas as pd
+from mysql.connector import Error
+from etl_backends import get_backend
+from etl_connection import ConnectionFactory, set_session
+from etl_convert import SQL_TYPE_KINDS
+from etl_parquet import ParquetSink
+from etl_scheduler import fk_levels
+from etl_writer import insert_frame
+
+TARGETS = ('mysql', 'sqlite', 'duckdb', 'parquet')
+BATCH_ROWS = 50000
+WORKERS = 4
+
+# ============================================================================
+# 1. DUMP INDEX
+# ============================================================================
+# Statements end at the first line ending in ';'. Dumps escape newlines
+# inside strings (\n), so a row never spans lines and this holds for both
+# phpMyAdmin (one row per line) and mysqldump (one INSERT per line).
+
+STATEMENT_TABLE = re.compile(r'^(CREATE TABLE|INSERT INTO|ALTER TABLE)\s+`?(\w+)`?', re.IGNORECASE)
+DATABASE_COMMENT = re.compile(r'^--\s*Database:\s*`?(\w+)`?')
+COLUMN_DEFINITION = re.compile(r'^\s*`?(\w+)`?\s+(\w+)(.*?),?\s*$')
+PRIMARY_CLAUSE = re.compile(r'ADD\s+PRIMARY\s+KEY\s*\(([^)]*)\)', re.IGNORECASE)
+UNIQUE_CLAUSE = re.compile(r'ADD\s+UNIQUE\s+(?:KEY|INDEX)\s+`?(\w+)`?\s*\(([^)]*)\)', re.IGNORECASE)
+INDEX_CLAUSE = re.compile(r'ADD\s+(?:KEY|INDEX)\s+`?(\w+)`?\s*\(([^)]*)\)', re.IGNORECASE)
+FOREIGN_KEY_CLAUSE = re.compile(
+    r'ADD\s+CONSTRAINT\s+`?\w+`?\s+(FOREIGN\s+KEY\s*\([^)]*\)\s*REFERENCES\s*`?\w+`?\s*\([^)]*\)'
+    r'(?:\s+ON\s+(?:DELETE|UPDATE)\s+(?:CASCADE|SET\s+NULL|RESTRICT|NO\s+ACTION))*)', re.IGNORECASE
+)
+
+def _columns(text):
+    return [col.strip(' `') for col in text.split(',')]
+
+class DumpTable:
+    """
+    One table of a dump: its CREATE TABLE, the byte ranges of its INSERT
+    statements and its ALTER TABLE statements, split into key/index ones,
+    AUTO_INCREMENT ones (MODIFY) and foreign-key ones
+    """
+
+    def __init__(self, name, create):
+        self.name = name
+        self.create = create
+        self.columns = []
+        for line in create.split('\n')[1:]:
+            match = COLUMN_DEFINITION.match(line)
+            if match and match.group(2).upper() not in ('PRIMARY', 'UNIQUE', 'KEY', 'INDEX', 'CONSTRAINT', 'FOREIGN'):
+                self.columns.append((match.group(1), match.group(2).lower(), match.group(3)))
+        self.ranges = []
+        self.key_statements = []
+        self.auto_increment_statements = []
+        self.constraint_statements = []
+
+    @property
+    def schema(self):
+        """(column, kind) pairs for etl_convert / the backends"""
+        return [(name, SQL_TYPE_KINDS.get(sql_type, 'str')) for name, sql_type, _ in self.columns]
+
+    def add_alter(self, statement):
+        if re.search(r'\bADD\s+CONSTRAINT\b', statement, re.IGNORECASE):
+            self.constraint_statements.append(statement)
+        elif re.search(r'\bMODIFY\b', statement, re.IGNORECASE):
+            self.auto_increment_statements.append(statement)
+        else:
+            self.key_statements.append(statement)
+
+    def loader_ddl(self):
+        """
+        The table as a loader-style MySQL CREATE TABLE (keys inline, no
+        backticks or display widths), the input etl_backends.translate_ddl
+        and etl_fresh_load expect
+        """
+        keys = ' '.join(self.key_statements)
+        fks = ' '.join(self.constraint_statements)
+        lines = []
+        for name, sql_type, rest in self.columns:
+            rest = re.sub(r'\s+(?:COLLATE|CHARACTER SET)\s+\w+', '', rest, flags=re.IGNORECASE)
+            rest = re.sub(r'current_timestamp\(\)', 'CURRENT_TIMESTAMP', rest, flags=re.IGNORECASE)
+            rest = re.sub(r'\s+AUTO_INCREMENT\b', '', rest, flags=re.IGNORECASE)
+            if sql_type in SQL_TYPE_KINDS and SQL_TYPE_KINDS[sql_type] == 'int':
+                rest = re.sub(r'^\(\d+\)', '', rest)
+            lines.append(f"{name} {sql_type.upper()}{rest}")
+        for match in PRIMARY_CLAUSE.finditer(keys):
+            lines.append(f"PRIMARY KEY ({', '.join(_columns(match.group(1)))})")
+        for match in UNIQUE_CLAUSE.finditer(keys):
+            lines.append(f"UNIQUE KEY {match.group(1)} ({', '.join(_columns(match.group(2)))})")
+        for match in INDEX_CLAUSE.finditer(keys):
+            lines.append(f"INDEX {match.group(1)} ({', '.join(_columns(match.group(2)))})")
+        for match in FOREIGN_KEY_CLAUSE.finditer(fks):
+            lines.append(re.sub(r'\s+', ' ', match.group(1).replace('`', '')))
+        body = ',\n'.join(f"    {line}" for line in lines)
+        return f"CREATE TABLE IF NOT EXISTS {self.name} (\n{body}\n) ENGINE=InnoDB"
+
+class Dump:
+    """Index of a dump file (read once; row data is parsed later per table)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.database = None
+        self.tables = {}
+
+        start = time.perf_counter()
+        statement, statement_start = [], None
+        offset = 0
+        with open(path, 'rb') as f:
+            for raw in f:
+                line_start, offset = offset, offset + len(raw)
+                line = raw.decode('utf-8')
+                if statement_start is None:
+                    stripped = line.strip()
+                    database = DATABASE_COMMENT.match(stripped)
+                    if database:
+                        self.database = database.group(1)
+                    if not stripped or stripped.startswith(('--', '/*', '#')):
+                        continue
+                    statement_start = line_start
+                    statement = []
+
+                # INSERT statements are only located here, never kept
+                if not (statement and statement[0].startswith('INSERT')):
+                    statement.append(line)
+                if line.rstrip().endswith(';'):
+                    self._add_statement(statement, statement_start, offset)
+                    statement_start = None
+
+        total = sum(end - begin for table in self.tables.values() for begin, end in table.ranges)
+        print(f"✓ Indexed {path}: {len(self.tables)} tables, {total / 1e6:.1f} MB of rows "
+              f"in {time.perf_counter() - start:.2f}s")
+
+    def _add_statement(self, lines, start, end):
+        head = STATEMENT_TABLE.match(lines[0].strip())
+        if not head:
+            return
+        kind, table = head.group(1).upper(), head.group(2)
+        text = ''.join(lines).strip().rstrip(';')
+        if kind == 'CREATE TABLE':
+            self.tables[table] = DumpTable(table, text)
+        elif table not in self.tables:
+            raise ValueError(f"{kind} for table '{table}' before its CREATE TABLE")
+        elif kind == 'INSERT INTO':
+            self.tables[table].ranges.append((start, end))
+        else:
+            self.tables[table].add_alter(text)
+
+    def table_ddl(self):
+        """{table: loader-style DDL}, for FK ordering and the local backends"""
+        return {name: table.loader_ddl() for name, table in self.tables.items()}
+
+# ============================================================================
+# 2. ROW PARSING
+# ============================================================================
+
+VALUES_KEYWORD = re.compile(r'\bVALUES\b', re.IGNORECASE)
+# One value followed by the ',' or ')' that ends it
+VALUE = re.compile(r"\s*(?:'((?:[^'\\]|\\.|'')*)'|(NULL)|([^,)\s]+))\s*([,)])", re.DOTALL)
+ESCAPE = re.compile(r"\\(.)|''", re.DOTALL)
+ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+def _unescape(text):
+    if '\\' not in text and "''" not in text:
+        return text
+    return ESCAPE.sub(lambda m: "'" if m.group(1) is None else ESCAPES.get(m.group(1), m.group(1)), text)
+
+def parse_values(text, start=0):
+    """Yield the rows of an INSERT ... VALUES list as tuples of str / None"""
+    pos = text.find('(', start)
+    while pos != -1:
+        row = []
+        pos += 1
+        while True:
+            match = VALUE.match(text, pos)
+            if not match:
+                raise ValueError(f"Unparseable row data near: {text[pos:pos + 60]!r}")
+            quoted, null, bare, end = match.groups()
+            row.append(None if null else _unescape(quoted) if quoted is not None else bare)
+            pos = match.end()
+            if end == ')':
+                break
+        yield tuple(row)
+        pos = text.find('(', pos)
+
+def typed_frame(rows, table):
+    """Rows of str/None -> DataFrame with one dtype per column kind"""
+    df = pd.DataFrame(rows, columns=[name for name, _, _ in table.columns], dtype=object)
+    for column, kind in table.schema:
+        if kind == 'int':
+            df[column] = pd.to_numeric(df[column]).astype('Int64')
+        elif kind == 'float':
+            df[column] = pd.to_numeric(df[column]).astype('float64')
+        elif kind in ('date', 'datetime'):
+            # MySQL's zero dates ('0000-00-00') become NaT
+            df[column] = pd.to_datetime(df[column], format='ISO8601', errors='coerce')
+        else:
+            # NULL stays None (astype('str') would turn it into 'None')
+            df[column] = df[column].map(str, na_action='ignore')
+    return df
+
+def iter_batches(dump, table, batch_rows=BATCH_ROWS):
+    """Yield a table's rows as typed DataFrames of up to batch_rows rows"""
+    rows = []
+    with open(dump.path, 'rb') as f:
+        for begin, end in table.ranges:
+            f.seek(begin)
+            text = f.read(end - begin).decode('utf-8')
+            for row in parse_values(text, VALUES_KEYWORD.search(text).end()):
+                rows.append(row)
+                if len(rows) >= batch_rows:
+                    yield typed_frame(rows, table)
+                    rows = []
+    if rows:
+        yield typed_frame(rows, table)
+
+# ============================================================================
+# 3. TARGETS
+# ============================================================================
+
+def _run_statements(factory, statements):
+    connection = factory.connect()
+    try:
+        set_session(connection, "SET SESSION foreign_key_checks = 0")
+        cursor = connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+        connection.commit()
+    finally:
+        connection.close()
+
+def _restore_table(factory, dump, table, batch_rows, options):
+    """Load one table's rows on its own pooled connection; returns (rows, seconds)"""
+    start = time.perf_counter()
+    connection = factory.connect()
+    rows = 0
+    try:
+        set_session(connection, "SET SESSION foreign_key_checks = 0")
+        set_session(connection, "SET SESSION unique_checks = 0")
+        for df in iter_batches(dump, table, batch_rows):
+            rows += insert_frame(connection, table.name, df, table.schema, ignore=options['bulk_load'],
+                                 options=options)
+    finally:
+        connection.close()
+    return rows, time.perf_counter() - start
+
+def restore_mysql(dump, config, workers=WORKERS, batch_rows=BATCH_ROWS, bulk_load=False, drop_existing=False):
+    """
+    Restore into MySQL: create the tables as dumped (without their keys),
+    load every table on its own connection, then add keys per table in
+    parallel, AUTO_INCREMENT, and the foreign keys (checks off, as the
+    dump's own data already satisfied them)
+    """
+    factory = ConnectionFactory(config, pool_size=workers + 1, allow_local_infile=bulk_load)
+    server = factory.server()
+    try:
+        cursor = server.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {config['database']}")
+        cursor.close()
+    finally:
+        server.close()
+
+    connection = factory.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SHOW TABLES")
+        existing = {row[0] for row in cursor.fetchall()} & set(dump.tables)
+        if existing and not drop_existing:
+            print(f"✗ Tables already exist: {', '.join(sorted(existing))} (use --drop-existing)")
+            return False
+        set_session(connection, "SET SESSION foreign_key_checks = 0")
+        for name, table in dump.tables.items():
+            if name in existing:
+                cursor.execute(f"DROP TABLE {name}")
+            cursor.execute(table.create)
+        cursor.close()
+        connection.commit()
+    finally:
+        connection.close()
+    print(f"✓ Created {len(dump.tables)} tables in '{config['database']}' (keys deferred)")
+
+    # LOAD DATA LOCAL always ignores duplicate keys, which the keyless tables
+    # cannot have; it is not resent, so a lost connection cannot load a batch
+    # twice (INSERT batches with ignore=False are not resent either)
+    options = {'bulk_load': bulk_load, 'retries': 0} if bulk_load else {'bulk_load': False}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {name: executor.submit(_restore_table, factory, dump, table, batch_rows, options)
+                   for name, table in dump.tables.items()}
+        for name, future in futures.items():
+            rows, seconds = future.result()
+            print(f"✓ {name}: {rows} rows in {seconds:.2f}s")
+    print(f"✓ Data loaded in {time.perf_counter() - start:.2f}s ({workers} workers)")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda table: _run_statements(factory, table.key_statements + table.auto_increment_statements),
+                          dump.tables.values()))
+    print(f"✓ Keys and AUTO_INCREMENT added in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    _run_statements(factory, [s for table in dump.tables.values() for s in table.constraint_statements])
+    print(f"✓ Foreign keys added in {time.perf_counter() - start:.2f}s")
+    return True
+
+def restore_local(dump, backend_name, path, batch_rows=BATCH_ROWS, drop_existing=False):
+    """
+    Restore into a SQLite or DuckDB file: tables are created with their keys
+    (translated by etl_backends) in foreign-key order, loaded, and then
+    given their secondary indexes
+    """
+    if os.path.exists(path):
+        if not drop_existing:
+            print(f"✗ {path} already exists (use --drop-existing)")
+            return False
+        os.remove(path)
+
+    backend = get_backend(backend_name)
+    connection = backend.connect(path)
+    table_ddl = dump.table_ddl()
+    deferred = []
+    try:
+        for level in fk_levels(table_ddl):
+            for name in level:
+                table = dump.tables[name]
+                for statement in backend.table_statements(name, table_ddl[name]):
+                    if statement.startswith('CREATE INDEX'):
+                        deferred.append(statement)
+                    else:
+                        connection.execute(statement)
+
+                start = time.perf_counter()
+                rows = 0
+                for df in iter_batches(dump, table, batch_rows):
+                    rows += backend.insert_frame(connection, name, df, table.schema, options={'backend': backend_name})
+                print(f"✓ {name}: {rows} rows in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        for statement in deferred:
+            connection.execute(statement)
+        connection.commit()
+        print(f"✓ {len(deferred)} secondary indexes built in {time.perf_counter() - start:.2f}s")
+    finally:
+        connection.close()
+    print(f"✓ Restored {dump.path} into {path}")
+    return True
+
+def restore_parquet(dump, root, batch_rows=BATCH_ROWS):
+    """Write each table of the dump as a Parquet dataset under root"""
+    def stream(table):
+        for df in iter_batches(dump, table, batch_rows):
+            yield table.name, df
+
+    # One batch of every table per write, so the first write sets up every table directory
+    sink = ParquetSink(root, dump.table_ddl())
+    for batch in zip_longest(*(stream(table) for table in dump.tables.values())):
+        sink.write(dict(item for item in batch if item is not None))
+    sink.close()
+    return True
+
+# ============================================================================
+# 4. COMMAND LINE
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore a MySQL dump in parallel, or convert it without a server")
+    parser.add_argument('dump')
+    parser.add_argument('--target', default='mysql', choices=TARGETS)
+    parser.add_argument('--out', help="SQLite/DuckDB file or Parquet directory (default: <database>.<target>)")
+    parser.add_argument('--database', help="MySQL database to restore into (default: the dump's)")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Tables loaded at once (MySQL)")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    parser.add_argument('--bulk-load', action='store_true', help="Send rows with LOAD DATA LOCAL INFILE (MySQL)")
+    parser.add_argument('--drop-existing', action='store_true', help="Replace tables or output that already exist")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dump = Dump(args.dump)
+    database = args.database or dump.database or os.path.splitext(os.path.basename(args.dump))[0]
+
+    if args.target == 'mysql':
+        from data_load import DB_CONFIG
+        try:
+            ok = restore_mysql(dump, {**DB_CONFIG, 'database': database}, args.workers, args.batch_rows,
+                               args.bulk_load, args.drop_existing)
+        except Error as e:
+            print(f"✗ MySQL error: {e}")
+            ok = False
+    elif args.target == 'parquet':
+        ok = restore_parquet(dump, args.out or database, args.batch_rows)
+    else:
+        ok = restore_local(dump, args.target, args.out or f"{database}.{args.target}", args.batch_rows,
+                           args.drop_existing)
+
+    if ok:
+        print(f"\n✓ Done in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Dependency-aware Table Scheduler
+Derives the foreign-key graph from a loader's CREATE TABLE statements and
+loads each FK level in parallel over a small connection pool
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+FK_PATTERN = re.compile(r'REFERENCES\s+`?(\w+)`?\s*\(', re.IGNORECASE)
+
+# ============================================================================
+# 1. FK GRAPH
+# ============================================================================
+
+def fk_dependencies(table_ddl):
+    """Map each table to the set of other tables its DDL references"""
+    return {
+        table: {ref for ref in FK_PATTERN.findall(ddl) if ref != table and ref in table_ddl}
+        for table, ddl in table_ddl.items()
+    }
+
+def fk_levels(table_ddl):
+    """
+    Group tables into levels where every table only references earlier levels.
+
+    Tables within a level keep their DDL order. Raises ValueError on a
+    foreign-key cycle.
+    """
+    deps = fk_dependencies(table_ddl)
+    levels = []
+    done = set()
+    while len(done) < len(deps):
+        level = [table for table in deps if table not in done and deps[table] <= done]
+        if not level:
+            cycle = sorted(set(deps) - done)
+            raise ValueError(f"Foreign-key cycle between tables: {', '.join(cycle)}")
+        levels.append(level)
+        done.update(level)
+    return levels
+
+# ============================================================================
+# 2. PARALLEL LEVEL LOADER
+# ============================================================================
+
+class LevelScheduler:
+    """Loads extracted tables level by level, in parallel within each level"""
+
+    def __init__(self, connect, table_ddl, workers=4):
+        self.connect = connect
+        self.levels = fk_levels(table_ddl)
+        self.workers = max(1, workers)
+        self.pool = queue.Queue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def _acquire(self):
+        """Take an idle connection, opening a new one while below the pool size"""
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            can_open = self.opened < self.workers
+            if can_open:
+                self.opened += 1
+        if can_open:
+            connection = self.connect()
+            if connection is None:
+                raise RuntimeError("Could not open a pooled connection")
+            return connection
+        return self.pool.get()
+
+    def _run(self, inserter, frame):
+        connection = self._acquire()
+        try:
+            inserter(connection, frame)
+        finally:
+            self.pool.put(connection)
+
+    def load(self, tables, inserters):
+        """
+        Insert every table in `tables` with its function from `inserters`.
+
+        A level only starts once every table of the previous level has been
+        committed; a failure stops the load before the next level.
+        """
+        for n, level in enumerate(self.levels, 1):
+            level = [table for table in level if table in tables]
+            if not level:
+                continue
+
+            print(f"\n  Level {n}: {', '.join(level)}")
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(level))) as executor:
+                futures = {table: executor.submit(self._run, inserters[table], tables[table])
+                           for table in level}
+            errors = {table: future.exception() for table, future in futures.items()
+                      if future.exception() is not None}
+            if errors:
+                for table, error in errors.items():
+                    print(f"✗ Error loading '{table}': {error}")
+                raise RuntimeError(f"Level {n} failed: {', '.join(errors)}")
+            print(f"  Level {n} done in {time.perf_counter() - start:.2f}s")
+
+    def close(self):
+        """Close every pooled connection"""
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+        self.opened = 0
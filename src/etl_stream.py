@@ -0,0 +1,275 @@
+"""
+Streaming Query Results
+Reads reporting query results batch by batch with fetchmany instead of
+fetchall: MySQL through an unbuffered cursor, so rows stay on the server
+until asked for, and SQLite/DuckDB through cursors that step the query
+lazily. Batches come out as row lists, Arrow record batches or pandas
+frames, so exports and reports over order_line_items-sized results run in
+constant memory (shared by data_load.py and retail_sales_load.py)
+
+Usage: python src/etl_stream.py QUERY [--loader NAME] [--sql] [--out PATH.parquet|.csv]
+       QUERY names one of the loader's REPORT_QUERIES/SUMMARY_QUERIES, or is
+       the SQL text itself with --sql
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import pandas as pd
+from etl_backends import get_backend
+from etl_connection import ConnectionFactory
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pacsv = pq = None
+
+LOADERS = ('data_load', 'retail_sales_load')
+
+# Rows per fetchmany round trip (and per Arrow batch / pandas frame)
+BATCH_ROWS = 10000
+COMPRESSION = 'snappy'
+
+# ============================================================================
+# 1. RESULT STREAM
+# ============================================================================
+
+class ResultStream:
+    """
+    One query's result, read batch_rows rows at a time.
+
+    Iterating yields lists of row tuples; record_batches() and frames()
+    yield the same batches as Arrow record batches or DataFrames. The
+    cursor is closed once the rows run out, on close(), or on leaving a
+    with block. A MySQL connection is busy until then: stopping early reads
+    the rest of the result off the wire, so bound unwanted rows with LIMIT
+    rather than break.
+    """
+
+    def __init__(self, connection, backend, query, params=(), batch_rows=BATCH_ROWS):
+        self.connection = connection
+        self.backend = backend
+        self.batch_rows = max(1, int(batch_rows))
+        self.rows_read = 0
+        if backend.name == 'mysql':
+            # Unbuffered: fetchmany pulls rows off the socket as they are asked for
+            self.cursor = connection.cursor(buffered=False)
+        else:
+            self.cursor = connection.cursor()
+        try:
+            if params:
+                self.cursor.execute(query, tuple(params))
+            else:
+                self.cursor.execute(query)
+        except Exception:
+            self.close()
+            raise
+        self.columns = [d[0] for d in self.cursor.description or ()]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.cursor is None:
+            return
+        cursor, self.cursor = self.cursor, None
+        try:
+            if self.backend.name == 'mysql':
+                # An unbuffered cursor refuses to close with unread rows
+                self.connection.consume_results()
+        finally:
+            cursor.close()
+
+    def __iter__(self):
+        try:
+            while self.cursor is not None:
+                rows = self.cursor.fetchmany(self.batch_rows)
+                if not rows:
+                    break
+                self.rows_read += len(rows)
+                yield rows
+        finally:
+            self.close()
+
+    # ------------------------------------------------------------------------
+    # Arrow & pandas
+    # ------------------------------------------------------------------------
+
+    def record_batches(self, schema=None):
+        """
+        The result as pyarrow RecordBatches of one schema: the given one,
+        or the one inferred from the first batch (DECIMALs widened to 38
+        digits, all-NULL columns typed as strings). Columns whose later
+        values do not fit the inferred type need an explicit schema.
+        """
+        if pa is None:
+            raise ImportError("Arrow record batches need pyarrow (pip install pyarrow)")
+        if self.backend.name == 'duckdb':
+            yield from self._duckdb_batches(schema)
+            return
+
+        try:
+            for rows in self:
+                columns = list(zip(*rows))
+                if schema is None:
+                    schema = inferred_schema(self.columns, columns)
+                arrays = []
+                for name, values in zip(self.columns, columns):
+                    field = schema.field(name)
+                    # Infer, then cast: pa.array(type=int64) silently truncates 2.5 to 2,
+                    # a safe cast refuses
+                    try:
+                        array = pa.array(values)
+                        arrays.append(array if array.type == field.type else array.cast(field.type))
+                    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                        raise ValueError(f"Column {name} no longer fits {field.type} after "
+                                         f"{self.rows_read - len(rows)} rows; pass an explicit schema ({e})") from e
+                yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+        finally:
+            self.close()
+
+    def _duckdb_batches(self, schema):
+        """DuckDB hands out Arrow batches natively, without building Python rows"""
+        try:
+            # to_arrow_reader replaced fetch_record_batch in DuckDB 1.4
+            to_reader = getattr(self.cursor, 'to_arrow_reader', None) or self.cursor.fetch_record_batch
+            reader = to_reader(self.batch_rows)
+            for batch in reader:
+                self.rows_read += batch.num_rows
+                yield batch if schema is None else batch.cast(schema)
+        finally:
+            self.close()
+
+    def frames(self, schema=None):
+        """The result as one DataFrame per batch (pyarrow-backed when pyarrow is installed)"""
+        if pa is None:
+            for rows in self:
+                yield pd.DataFrame.from_records(rows, columns=self.columns)
+            return
+        for batch in self.record_batches(schema):
+            yield batch.to_pandas()
+
+def inferred_schema(names, columns):
+    """Arrow schema of the first batch's columns, widened so later batches fit it"""
+    fields = []
+    for name, values in zip(names, columns):
+        arrow_type = pa.array(values).type
+        if pa.types.is_null(arrow_type):
+            arrow_type = pa.string()
+        elif pa.types.is_decimal(arrow_type):
+            arrow_type = pa.decimal128(38, arrow_type.scale)
+        elif pa.types.is_integer(arrow_type):
+            arrow_type = pa.int64()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+def stream_rows(connection, backend, query, params=(), batch_rows=BATCH_ROWS):
+    """Row-tuple lists of a query's result, batch_rows at a time"""
+    yield from ResultStream(connection, backend, query, params, batch_rows)
+
+def stream_record_batches(connection, backend, query, params=(), batch_rows=BATCH_ROWS, schema=None):
+    """Arrow RecordBatches of a query's result, batch_rows rows each"""
+    yield from ResultStream(connection, backend, query, params, batch_rows).record_batches(schema)
+
+def stream_frames(connection, backend, query, params=(), batch_rows=BATCH_ROWS, schema=None):
+    """DataFrames of a query's result, batch_rows rows each"""
+    yield from ResultStream(connection, backend, query, params, batch_rows).frames(schema)
+
+# ============================================================================
+# 2. EXPORT
+# ============================================================================
+
+def export_query(connection, backend, query, path, params=(), batch_rows=BATCH_ROWS, schema=None):
+    """
+    Write a query's result to a Parquet (.parquet) or CSV file one batch at
+    a time; returns the rows written. The file is written under a temporary
+    name and moved into place once complete.
+    """
+    if pa is None:
+        raise ImportError("Exports need pyarrow (pip install pyarrow)")
+    if not path.endswith(('.parquet', '.csv')):
+        raise ValueError(f"Unsupported export format: {path} (expected .parquet or .csv)")
+
+    tmp = path + '.tmp'
+    writer = None
+    rows = 0
+    try:
+        result = ResultStream(connection, backend, query, params, batch_rows)
+        for batch in result.record_batches(schema):
+            if writer is None:
+                if path.endswith('.parquet'):
+                    writer = pq.ParquetWriter(tmp, batch.schema, compression=COMPRESSION)
+                else:
+                    writer = pacsv.CSVWriter(tmp, batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+        if writer is None:
+            # No rows: still leave a file with the result's columns
+            empty = pa.schema([pa.field(name, pa.string()) for name in result.columns])
+            writer = (pq.ParquetWriter(tmp, empty, compression=COMPRESSION) if path.endswith('.parquet')
+                      else pacsv.CSVWriter(tmp, empty))
+        writer.close()
+        writer = None
+        os.replace(tmp, path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return rows
+
+# ============================================================================
+# 3. COMMAND LINE
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a reporting query's result to the screen or a file")
+    parser.add_argument('query', help="Name of a loader report query, or SQL text with --sql")
+    parser.add_argument('--loader', default='data_load', choices=LOADERS)
+    parser.add_argument('--sql', action='store_true', help="QUERY is SQL text rather than a query name")
+    parser.add_argument('--backend', choices=('mysql', 'sqlite', 'duckdb'),
+                        help="Database to query (default: the loader's LOAD_CONFIG backend)")
+    parser.add_argument('--db-path', help="SQLite/DuckDB file (default: the loader's backend_path or <database>.<backend>)")
+    parser.add_argument('--out', metavar='PATH', help="Write the result to a .parquet or .csv file")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.loader)
+    if args.sql:
+        query = args.query
+    else:
+        queries = {**module.REPORT_QUERIES, **module.SUMMARY_QUERIES}
+        if args.query not in queries:
+            parser.error(f"unknown query {args.query} (expected one of {', '.join(queries)}, or --sql)")
+        query = queries[args.query][1]
+
+    backend = get_backend(args.backend or module.LOAD_CONFIG['backend'])
+    if backend.name == 'mysql':
+        connection = ConnectionFactory(module.DB_CONFIG, pool_size=1).connect()
+    else:
+        connection = backend.connect(args.db_path or module.LOAD_CONFIG['backend_path']
+                                     or f"{module.DB_CONFIG['database']}.{backend.name}")
+    try:
+        start = time.perf_counter()
+        if args.out:
+            rows = export_query(connection, backend, query, args.out, batch_rows=args.batch_rows)
+            print(f"✓ Exported {rows} rows to {args.out} in {time.perf_counter() - start:.1f}s")
+        else:
+            with ResultStream(connection, backend, query, batch_rows=args.batch_rows) as result:
+                print('\t'.join(result.columns))
+                for rows in result:
+                    for row in rows:
+                        print('\t'.join('' if value is None else str(value) for value in row))
+                print(f"✓ {result.rows_read} rows in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Summary Tables
+Pre-aggregates the extracted frames in pandas during the load and upserts
+the partial aggregates into small summary tables, adding them to the
+stored totals, so dashboards read one row per group instead of joining
+the fact tables (shared by data_load.py and retail_sales_load.py)
+
+How far each fact table has been aggregated is kept as one watermark row
+per table in etl_summary_watermarks, committed in the same transaction
+as the summary upserts, so a rerun after a failed load never adds the
+same rows twice.
+"""
+
+import numpy as np
+import pandas as pd
+from etl_backends import DATABASE_ERRORS, get_backend, insert_frame
+from etl_connection import DeferredCommit
+from etl_profile import PROFILER
+
+# ============================================================================
+# 1. SPECS
+# ============================================================================
+#   Fact filters (per table, declared by each loader), as in etl_incremental:
+#   ('key', column)             - rows whose column is above the watermark
+#                                 (the largest value aggregated so far)
+#   ('date', column, key column)
+#                               - rows dated after the watermark day, or on
+#                                 it when their key was not stored yet (rows
+#                                 of the last aggregated day can still arrive)
+#   ('parent', table, column)   - rows whose column value is among the new
+#                                 rows of an earlier table
+#
+# Tables without a filter are passed through whole, as lookups. Rows are
+# compared with the watermark as it stood when the run started, so a run's
+# own rows may come in any order (a key repeated in a later chunk is
+# aggregated once); rows of a later load must lie above what earlier loads
+# aggregated, as with etl_incremental's watermarks.
+
+SUMMARY_WATERMARK_TABLES = {
+    'etl_summary_watermarks': """
+        CREATE TABLE IF NOT EXISTS etl_summary_watermarks (
+            table_name VARCHAR(64) PRIMARY KEY,
+            watermark_value VARCHAR(64) NOT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+WATERMARK_SCHEMA = [('table_name', 'str'), ('watermark_value', 'str')]
+
+def _parse_watermark(kind, value):
+    return pd.Timestamp(value).normalize() if kind == 'date' else int(value)
+
+def _format_watermark(kind, value):
+    return pd.Timestamp(value).date().isoformat() if kind == 'date' else str(int(value))
+
+class Summary:
+    """
+    A pre-aggregated table.
+
+    schema is the table's (column, kind) list for insert_frame; measures
+    maps each aggregated column to how a new partial value is merged into
+    the stored one ('sum', 'min' or 'max'), the remaining columns form the
+    key. build(new, tables) returns one row per key computed from the new
+    fact rows, with the whole extracted frames available for lookups.
+    """
+
+    def __init__(self, table, schema, measures, build):
+        self.table = table
+        self.schema = schema
+        self.measures = measures
+        self.build = build
+
+# ============================================================================
+# 2. MAINTENANCE
+# ============================================================================
+
+class SummaryTables:
+    """
+    Maintains a loader's summary tables across runs and chunks.
+
+    Creates the tables on construction. Each update aggregates only fact
+    rows past the fact tables' watermarks and commits the summary upserts
+    and the advanced watermarks together: a reload of the same file, or a
+    rerun after the fact insert failed, leaves the totals unchanged. Call
+    update() after the frames' rows are inserted.
+    """
+
+    def __init__(self, connection, summaries, table_ddl, facts, options):
+        self.connection = connection
+        self.summaries = summaries
+        self.facts = facts
+        self.options = options
+        self.backend = get_backend(options.get('backend'))
+        # Watermarks as the run started (rows are filtered on these) and as committed since
+        self.watermarks = {}
+        self.reached = {}
+        self.boundary_keys = {}
+        # Hashes of the keys this run aggregated, and of those awaiting the commit
+        self.seen = {}
+        self.pending = {}
+        # Rows of the last update taken as aggregated by the watermarks
+        self.skipped = {}
+
+        filtered = {table: strategy for table, strategy in facts.items() if strategy[0] in ('key', 'date')}
+        cursor = connection.cursor()
+        try:
+            try:
+                cursor.execute("SELECT COUNT(*) FROM etl_summary_watermarks")
+                cursor.fetchall()
+                new_watermark_table = False
+            except DATABASE_ERRORS:
+                new_watermark_table = True
+            for table_name, create_statement in {**table_ddl, **SUMMARY_WATERMARK_TABLES}.items():
+                for statement in self.backend.table_statements(table_name, create_statement):
+                    cursor.execute(statement)
+            connection.commit()
+
+            if new_watermark_table:
+                # A database from before the watermark table: the fact rows
+                # loaded then count as aggregated
+                for table, strategy in filtered.items():
+                    cursor.execute(f"SELECT MAX({strategy[1]}) FROM {table}")
+                    latest = cursor.fetchone()[0]
+                    if latest is not None:
+                        cursor.execute(f"INSERT INTO etl_summary_watermarks (table_name, watermark_value) "
+                                       f"VALUES ({self.backend.param}, {self.backend.param})",
+                                       (table, _format_watermark(strategy[0], latest)))
+                connection.commit()
+
+            cursor.execute("SELECT table_name, watermark_value FROM etl_summary_watermarks")
+            for table, value in cursor.fetchall():
+                if table in filtered:
+                    self.watermarks[table] = _parse_watermark(filtered[table][0], value)
+
+            # Keys stored on the watermark day (one day's rows)
+            for table, strategy in filtered.items():
+                if strategy[0] == 'date' and table in self.watermarks:
+                    cursor.execute(f"SELECT {strategy[2]} FROM {table} WHERE {strategy[1]} >= {self.backend.param}",
+                                   (self.watermarks[table].date(),))
+                    self.boundary_keys[table] = {str(row[0]) for row in cursor.fetchall()}
+            connection.commit()
+        finally:
+            cursor.close()
+        self.reached = dict(self.watermarks)
+
+        print(f"✓ Summary tables ready ({len(table_ddl)} tables, "
+              f"{len(self.watermarks)} fact watermarks on record)")
+
+    def _unseen(self, table, keys):
+        """Mask of keys not aggregated earlier in this run (kept as 64-bit hashes)"""
+        hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+        seen = self.seen.get(table, np.array([], dtype=np.uint64))
+        return ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen), hashes
+
+    def new_rows(self, tables):
+        """
+        Return a copy of `tables` whose fact tables hold only rows not
+        aggregated before, and the watermarks those rows reach
+        """
+        new = dict(tables)
+        reached = {}
+        self.skipped = {}
+        for table, strategy in self.facts.items():
+            df = tables[table]
+            kind = strategy[0]
+            if kind in ('key', 'date'):
+                column = strategy[1]
+                values = pd.to_datetime(df[column]).dt.normalize() if kind == 'date' else df[column]
+                keep = np.ones(len(df), dtype=bool)
+                if table in self.watermarks:
+                    keep = (values > self.watermarks[table]).to_numpy(dtype=bool)
+                    if kind == 'date':
+                        on_day = (values == self.watermarks[table]).to_numpy(dtype=bool)
+                        stored = df[strategy[2]].astype(str).isin(self.boundary_keys.get(table, ())).to_numpy()
+                        keep = keep | (on_day & ~stored)
+                key = df[strategy[2] if kind == 'date' else column].astype(str)
+                unseen, hashes = self._unseen(table, key)
+                if (~keep).any():
+                    self.skipped[table] = int((~keep).sum())
+                keep = keep & unseen
+                df, values = df[keep], values[keep]
+                self.pending[table] = hashes[keep]
+                if len(values) and values.notna().any():
+                    latest = values.max()
+                    reached[table] = latest if table not in self.reached else max(latest, self.reached[table])
+            elif kind == 'parent':
+                parent, column = strategy[1], strategy[2]
+                df = df[pd.Index(new[parent][column]).get_indexer(df[column]) >= 0]
+            else:
+                raise ValueError(f"Unknown summary fact filter '{kind}' for table '{table}'")
+            new[table] = df
+        return new, reached
+
+    def update(self, tables, checkpoint=None, part=0):
+        """
+        Aggregate the new rows of one set of extracted frames into the
+        summary tables, after the frames were inserted. The upserts and the
+        advanced watermarks are committed together (rolled back together
+        on an error), so the update can simply be run again.
+        """
+        if checkpoint and checkpoint.done(part, 'summaries'):
+            print("✓ Summaries already updated by the interrupted run, skipped")
+            return
+        with DeferredCommit(self.connection, begin=self.backend.name == 'duckdb') as transaction, \
+                PROFILER.stage('summaries') as stage:
+            new, reached = self.new_rows(tables)
+            stage.rows = 0
+            for summary in self.summaries:
+                frame = summary.build(new, tables)
+                if frame.empty:
+                    continue
+                frame.attrs['accumulate'] = summary.measures
+                insert_frame(transaction, summary.table, frame, summary.schema, options=self.options)
+                stage.rows += len(frame)
+            if reached:
+                watermarks = pd.DataFrame({
+                    'table_name': list(reached),
+                    'watermark_value': [_format_watermark(self.facts[table][0], value)
+                                        for table, value in reached.items()]
+                })
+                watermarks.attrs['upsert'] = True
+                insert_frame(transaction, 'etl_summary_watermarks', watermarks, WATERMARK_SCHEMA,
+                             options=self.options)
+
+        # Committed: later chunks skip these rows too
+        self.reached.update(reached)
+        for table, hashes in self.pending.items():
+            self.seen[table] = np.concatenate([self.seen.get(table, np.array([], dtype=np.uint64)), hashes])
+        self.pending = {}
+        if checkpoint:
+            checkpoint.mark_done(part, 'summaries')
+        print(f"✓ Summaries updated ({stage.rows} groups)")
+        for table, count in self.skipped.items():
+            print(f"  {table}: {count} rows at or below the summary watermark taken as aggregated")
@@ -0,0 +1,310 @@
+"""
+Load Verification
+Checks every loaded table with one aggregate query (row count, sums of its
+numeric columns, min/max of its date columns) against the same aggregates
+computed vectorized from the frames the run extracted, so a load that
+silently dropped or mangled rows fails instead of reporting counts
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import math
+import re
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from etl_fresh_load import foreign_keys, unique_column_sets
+from etl_normalize import canonical_key
+
+# ============================================================================
+# AGGREGATES (per table, declared by each loader)
+# ============================================================================
+#   {table: ([numeric columns to sum], [date columns to range])}
+#
+# Sums are compared exactly in the column's own precision: DECIMAL(p, s)
+# values are rounded to s places and INT values truncated, as MySQL stores
+# them, before summing; FLOAT/DOUBLE sums allow rounding error.
+#
+# A table holding rows before the run (earlier loads, a resumed run) is
+# checked by its growth: stored minus baseline count and sums must equal
+# the aggregates of the rows that should be new. Which rows those are comes
+# from what the run already knows, never from per-key lookups:
+#   - an incremental load's delta (add(..., delta=True)) is new throughout;
+#     upserted dimension rows only have their count of inserted keys
+#     checked, as the values they replaced are not known
+#   - surrogate-id rows are new when their id is above the baseline MAX(id)
+#   - a table without a natural key (order_items) gets every row sent; the
+#     same aggregate query counts new rows under an ON DELETE CASCADE parent
+#     that already had rows, so a rerun that inserts an order's lines again
+#     fails
+# Otherwise (a non-incremental rerun) the rows INSERT IGNORE skipped are
+# not known and the table is reported unverified rather than matching.
+
+COLUMN_TYPE = re.compile(r'^\s*(\w+)\s+(\w+)(?:\s*\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?', re.IGNORECASE)
+AUTO_INCREMENT_LINE = re.compile(r'^\s*(\w+)\s+\w+[^,]*\bAUTO_INCREMENT\b', re.IGNORECASE)
+INTEGER_TYPES = {'TINYINT', 'SMALLINT', 'MEDIUMINT', 'INT', 'INTEGER', 'BIGINT'}
+DECIMAL_TYPES = {'DECIMAL', 'NUMERIC'}
+
+def column_scales(ddl):
+    """
+    {column: scale} from a CREATE TABLE: the decimal places DECIMAL columns
+    keep, 0 for integers, None for FLOAT/DOUBLE
+    """
+    scales = {}
+    for line in ddl.strip().split('\n')[1:]:
+        match = COLUMN_TYPE.match(line)
+        if not match:
+            continue
+        column, sql_type = match.group(1), match.group(2).upper()
+        if sql_type in INTEGER_TYPES:
+            scales[column] = 0
+        elif sql_type in DECIMAL_TYPES:
+            scales[column] = int(match.group(4) or 0)
+        elif sql_type in ('FLOAT', 'DOUBLE', 'REAL'):
+            scales[column] = None
+    return scales
+
+def _units(value, scale):
+    """A database sum in the column's units (hundredths for DECIMAL(p, 2)); None stays None"""
+    if value is None:
+        return None
+    if scale is None:
+        return float(value)
+    return int((Decimal(str(value)) * 10 ** scale).to_integral_value())
+
+def auto_increment_column(ddl):
+    """The AUTO_INCREMENT column of a CREATE TABLE (None if it has none)"""
+    for line in ddl.strip().split('\n')[1:]:
+        match = AUTO_INCREMENT_LINE.match(line)
+        if match:
+            return match.group(1)
+    return None
+
+def _day(value):
+    return None if value is None or pd.isna(value) else pd.Timestamp(value).date()
+
+def _span(first, second):
+    """Smallest (low, high) date range covering both (None bounds are open)"""
+    lows = [day for day in (first[0], second[0]) if day is not None]
+    highs = [day for day in (first[1], second[1]) if day is not None]
+    return (min(lows) if lows else None, max(highs) if highs else None)
+
+class LoadVerifier:
+    """
+    Expected aggregates of one run's tables, checked against the database.
+
+    Create it before anything is inserted (it records each table's
+    aggregates as the baseline), add() every extracted frame the run
+    loads, and call verify() at the end. Rows repeating a primary/unique
+    key of an earlier row are left out of the expected aggregates, as
+    INSERT IGNORE leaves them out of the table; keys are compared as the
+    UNIQUE index compares them (see etl_normalize.canonical_key). In a
+    resumed run (resumed=True) the rows the interrupted run committed
+    cannot be told apart from this run's, so tables that held rows are
+    reported unverified.
+    """
+
+    def __init__(self, connection, table_ddl, aggregates, resumed=False):
+        self.aggregates = aggregates
+        self.resumed = resumed
+        self.scales = {table: column_scales(table_ddl[table]) for table in aggregates}
+        self.unique_sets = {table: unique_column_sets(table_ddl[table]) for table in aggregates}
+        self.auto_ids = {table: auto_increment_column(table_ddl[table]) for table in aggregates}
+        self.owners = {table: [key for key in foreign_keys(table_ddl[table], cascading=True) if key[1] in aggregates]
+                       for table in aggregates}
+        self.seen = {}
+        # Tables whose new rows are not known ({table: reason}) and tables with upserted rows
+        self.unverified = {}
+        self.upserted = set()
+        self.expected = {
+            table: {'rows': 0, 'sums': dict.fromkeys(sums), 'ranges': {col: (None, None) for col in dates}}
+            for table, (sums, dates) in aggregates.items()
+        }
+        self.before = {table: self.query(connection, table) for table in aggregates}
+
+    def _repeats(self, table, last_id):
+        """
+        Expression counting the rows above last_id whose owning parent
+        already had rows at or below it (None where it does not apply)
+        """
+        auto_id = self.auto_ids[table]
+        if self.unique_sets[table] or not self.owners[table] or not auto_id or last_id is None:
+            return None
+        columns = self.owners[table][0][0]
+        match = ' AND '.join(f"earlier.{col} = {table}.{col}" for col in columns)
+        return (f"SUM(CASE WHEN {auto_id} > {int(last_id)} AND EXISTS ("
+                f"SELECT 1 FROM {table} earlier WHERE earlier.{auto_id} <= {int(last_id)} AND {match}"
+                f") THEN 1 ELSE 0 END)")
+
+    def _statement(self, table, last_id=None):
+        sums, dates = self.aggregates[table]
+        expressions = ['COUNT(*)'] + [f"SUM({col})" for col in sums]
+        expressions += [f"{fn}({col})" for col in dates for fn in ('MIN', 'MAX')]
+        if self.auto_ids[table]:
+            expressions.append(f"MAX({self.auto_ids[table]})")
+        repeats = self._repeats(table, last_id)
+        if repeats:
+            expressions.append(repeats)
+        return f"SELECT {', '.join(expressions)} FROM {table}"
+
+    def query(self, connection, table, last_id=None):
+        """
+        One table's aggregates as stored, in one round trip; given the
+        baseline's last_id, also the new rows repeating an owner's rows
+        """
+        sums, dates = self.aggregates[table]
+        repeats = self._repeats(table, last_id)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(self._statement(table, last_id))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        # End the read, so the next query sees rows committed meanwhile
+        connection.commit()
+        values = iter(row[1:])
+        return {
+            'rows': row[0],
+            'sums': {col: _units(next(values), self.scales[table].get(col)) for col in sums},
+            'ranges': {col: (_day(next(values)), _day(next(values))) for col in dates},
+            'last_id': next(values) if self.auto_ids[table] else None,
+            'repeats': int(next(values) or 0) if repeats else 0
+        }
+
+    def _new_rows(self, table, df, delta):
+        """
+        Rows of df that should be new to the table: those whose unique keys
+        no earlier row of df or earlier add() had and, when the table held
+        rows before the run, that the run knows to be new (see AGGREGATES)
+        """
+        keep = np.ones(len(df), dtype=bool)
+        for i, columns in enumerate(self.unique_sets[table]):
+            if not set(columns) <= set(df.columns):
+                continue
+            keys = pd.DataFrame({col: df[col] if pd.api.types.is_numeric_dtype(df[col])
+                                 else df[col].map(canonical_key) for col in columns})
+            hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+            seen = self.seen.get((table, i), np.array([], dtype=np.uint64))
+            keep &= ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen)
+            self.seen[(table, i)] = np.concatenate([seen, hashes[keep]])
+
+        before, auto_id = self.before[table], self.auto_ids[table]
+        if not before['rows']:
+            pass
+        elif auto_id in df.columns:
+            # Surrogate ids above the baseline's were assigned by this run
+            keep &= (pd.to_numeric(df[auto_id]) > (before['last_id'] or 0)).to_numpy(dtype=bool)
+        elif self.resumed:
+            self.unverified[table] = "the interrupted run's rows are not told apart from this run's"
+        elif self.unique_sets[table] and not delta:
+            self.unverified[table] = "the rows INSERT IGNORE skipped are only known from an incremental delta"
+        return df[keep]
+
+    def add(self, tables, delta=False):
+        """
+        Fold loaded frames into the expected aggregates (vectorized per
+        column); delta=True marks them as an incremental tracker's delta
+        """
+        for table, df in tables.items():
+            if table not in self.aggregates or df is None or df.empty:
+                continue
+            expected = self.expected[table]
+            if self.before[table]['rows'] and df.attrs.get('upsert') and not self.resumed:
+                # Upserted dimension rows: only the inserted keys add rows, and
+                # the values the updates replaced are not known
+                if df.attrs.get('inserts') is None:
+                    self.unverified[table] = "the tracker had no row hashes for its stored rows"
+                else:
+                    expected['rows'] += df.attrs['inserts']
+                    self.upserted.add(table)
+                continue
+
+            df = self._new_rows(table, df, delta)
+            expected['rows'] += len(df)
+
+            for col, total in expected['sums'].items():
+                scale = self.scales[table].get(col)
+                values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                values = values[~np.isnan(values)]
+                if not len(values):
+                    continue
+                if scale is None:
+                    part = float(values.sum())
+                elif scale == 0:
+                    part = int(np.trunc(values).astype(np.int64).sum())
+                else:
+                    part = int(np.round(values * 10 ** scale).astype(np.int64).sum())
+                expected['sums'][col] = part if total is None else total + part
+
+            for col, (low, high) in expected['ranges'].items():
+                days = pd.to_datetime(df[col], errors='coerce').dropna()
+                if days.empty:
+                    continue
+                first, last = days.min().date(), days.max().date()
+                expected['ranges'][col] = (first if low is None else min(low, first),
+                                           last if high is None else max(high, last))
+
+    def _mismatches(self, table, stored, before, expected):
+        """Differences between the table's growth since before and the expected aggregates"""
+        scales = self.scales[table]
+        problems = []
+        new_rows = stored['rows'] - before['rows']
+        if new_rows != expected['rows']:
+            problems.append(f"{new_rows} new rows, expected {expected['rows']}" if before['rows']
+                            else f"{stored['rows']} rows, expected {expected['rows']}")
+        for col, total in expected['sums'].items():
+            actual, scale = stored['sums'][col], scales.get(col)
+            if before['sums'][col] is not None and actual is not None:
+                # Compare what this run added; no new values add nothing
+                actual -= before['sums'][col]
+                total = total if total is not None else (0 if scale is not None else 0.0)
+            if actual is None or total is None:
+                equal = actual == total
+            elif scale is None:
+                equal = math.isclose(actual, total, rel_tol=1e-9, abs_tol=1e-6)
+            else:
+                equal = actual == total
+            if not equal:
+                shown = [v if v is None or not scale else v / 10 ** scale for v in (actual, total)]
+                problems.append(f"SUM({col}) {shown[0]}, expected {shown[1]}")
+        for col, bounds in expected['ranges'].items():
+            bounds = _span(before['ranges'][col], bounds)
+            if stored['ranges'][col] != bounds:
+                problems.append(f"{col} {stored['ranges'][col][0]}..{stored['ranges'][col][1]}, "
+                                f"expected {bounds[0]}..{bounds[1]}")
+        return problems
+
+    def verify(self, connection):
+        """Compare every table with the expected aggregates; True when all agree"""
+        ok = True
+        for table in self.aggregates:
+            before, expected = self.before[table], self.expected[table]
+            stored = self.query(connection, table, before['last_id'] if before['rows'] else None)
+            new_rows = stored['rows'] - before['rows']
+
+            if table in self.unverified:
+                if new_rows > expected['rows']:
+                    ok = False
+                    print(f"✗ {table.upper()}: {new_rows} new rows, more than the {expected['rows']} loaded")
+                else:
+                    print(f"! {table.upper()}: {stored['rows']} records ({new_rows} new of {expected['rows']} "
+                          f"loaded), not verified: {self.unverified[table]}")
+                continue
+
+            if table in self.upserted:
+                problems = [] if new_rows == expected['rows'] else [f"{new_rows} new rows, expected {expected['rows']}"]
+                checked = 0
+            else:
+                problems = self._mismatches(table, stored, before, expected)
+                checked = len(expected['sums']) + len(expected['ranges'])
+            if stored['repeats']:
+                parent = self.owners[table][0][1]
+                problems.append(f"{stored['repeats']} new rows repeat lines of {parent} rows loaded before")
+            if problems:
+                ok = False
+                print(f"✗ {table.upper()}: " + '; '.join(problems))
+            else:
+                print(f"✓ {table.upper()}: {stored['rows']} records"
+                      + (f" ({before['rows']} before this run, {expected['rows']} new)" if before['rows'] else "")
+                      + (f" ({checked} aggregates match)" if checked else "")
+                      + (" (upserted: count only)" if table in self.upserted else ""))
+        return ok
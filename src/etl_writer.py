@@ -0,0 +1,267 @@
+"""
+Table Writer
+Sends converted rows to MySQL, either as multi-row INSERT batches sized
+against max_allowed_packet or, in bulk mode, through a temporary TSV file
+and LOAD DATA LOCAL INFILE
+(shared by data_load.py and retail_sales_load.py)
+"""
+
+import os
+import tempfile
+import time
+import weakref
+from itertools import chain
+from datetime import date, datetime
+from mysql.connector import Error
+from etl_convert import to_db_rows
+from etl_connection import RETRIES, run_with_retry
+
+# Client/server error numbers meaning LOCAL INFILE is not allowed
+#   1148 ER_NOT_ALLOWED_COMMAND, 2068 CR_LOAD_DATA_LOCAL_INFILE_REJECTED,
+#   3948 ER_CLIENT_LOCAL_FILES_DISABLED, 3950 ER_LOAD_DATA_LOCAL_INFILE_DISABLED
+LOCAL_INFILE_ERRNOS = {1148, 2068, 3948, 3950}
+
+# Connections on which LOAD DATA LOCAL INFILE has already been refused (held
+# weakly: a closed connection's id() can be reused by a new one)
+_infile_refused = weakref.WeakSet()
+
+# ============================================================================
+# 1. TSV SERIALIZATION
+# ============================================================================
+
+_TSV_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0'
+})
+
+def tsv_field(value):
+    """Format one value for LOAD DATA's default escaping (NULL is \\N)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(_TSV_ESCAPES)
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value).translate(_TSV_ESCAPES)
+
+def write_tsv(rows, file):
+    """Write rows to an open text file as tab-separated lines"""
+    for row in rows:
+        file.write('\t'.join([tsv_field(value) for value in row]))
+        file.write('\n')
+
+# ============================================================================
+# 2. LOAD DATA LOCAL INFILE
+# ============================================================================
+
+def _execute_and_commit(connection, query, params=None):
+    """Run one statement and commit it; returns the affected row count"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+def bulk_load(connection, table, columns, rows, ignore=True, retries=RETRIES):
+    """
+    Load rows with LOAD DATA LOCAL INFILE via a temporary TSV file.
+
+    Returns the number of rows loaded, or None if the client or server does
+    not allow LOCAL INFILE (the caller should then fall back to INSERT batches).
+    LOCAL loads always skip duplicate-key rows, matching INSERT IGNORE (the
+    server cannot stop the file transfer to report an error), so with
+    ignore=False nothing is loaded and None is returned: the INSERT batches
+    raise on a duplicate key instead of dropping the row.
+    The load is resent after a transient error.
+    """
+    if not ignore or connection in _infile_refused:
+        return None
+
+    tmp = tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', newline='\n',
+                                      suffix=f'_{table}.tsv', delete=False)
+    try:
+        with tmp:
+            write_tsv(rows, tmp)
+
+        query = f"""
+            LOAD DATA LOCAL INFILE '{tmp.name.replace(os.sep, '/')}'
+            IGNORE INTO TABLE {table}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+            LINES TERMINATED BY '\\n'
+            ({', '.join(columns)})
+        """
+
+        try:
+            return run_with_retry(connection, lambda: _execute_and_commit(connection, query), retries)
+        except Error as e:
+            if e.errno not in LOCAL_INFILE_ERRNOS:
+                raise
+            connection.rollback()
+            _infile_refused.add(connection)
+            print(f"  ! LOAD DATA LOCAL INFILE not allowed ({e.msg}); falling back to INSERT batches")
+            return None
+    finally:
+        os.remove(tmp.name)
+
+# ============================================================================
+# 3. AUTO-SIZED MULTI-ROW INSERT
+# ============================================================================
+
+# Fraction of max_allowed_packet a single statement may use, leaving room for
+# escaping and protocol overhead the size estimate does not see
+PACKET_BUDGET = 0.5
+MAX_BATCH_ROWS = 50000
+SAMPLE_ROWS = 1000
+
+# max_allowed_packet per connection object, read once
+_packet_sizes = weakref.WeakKeyDictionary()
+
+def get_max_allowed_packet(connection):
+    """Return the server's max_allowed_packet in bytes (cached per connection)"""
+    if connection not in _packet_sizes:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT @@max_allowed_packet")
+            _packet_sizes[connection] = int(cursor.fetchone()[0])
+        finally:
+            cursor.close()
+    return _packet_sizes[connection]
+
+def estimate_row_bytes(rows):
+    """Largest literal size of an evenly spaced sample of rows (quotes and commas included)"""
+    if not rows:
+        return 1
+    step = max(1, len(rows) // SAMPLE_ROWS)
+    largest = 0
+    for row in rows[::step]:
+        size = 2
+        for value in row:
+            if isinstance(value, str):
+                size += len(value.encode('utf-8')) + 3
+            else:
+                size += len(str(value)) + 3
+        largest = max(largest, size)
+    return largest
+
+def auto_batch_size(connection, table, columns, rows):
+    """Rows per multi-row INSERT that fit inside max_allowed_packet"""
+    budget = get_max_allowed_packet(connection) * PACKET_BUDGET - len(multirow_query(table, columns, 1))
+    return int(max(1, min(MAX_BATCH_ROWS, budget // estimate_row_bytes(rows))))
+
+# How an upsert combines a stored value with the incoming one, per accumulate mode
+ACCUMULATE_SQL = {
+    'sum': '{col} + VALUES({col})',
+    'min': 'LEAST({col}, VALUES({col}))',
+    'max': 'GREATEST({col}, VALUES({col}))'
+}
+
+def multirow_query(table, columns, n_rows, ignore=True, upsert=False, accumulate=None):
+    """
+    Build a parameterized INSERT with n_rows VALUES tuples.
+
+    upsert=True replaces IGNORE with ON DUPLICATE KEY UPDATE of every column;
+    columns in accumulate ({column: 'sum' | 'min' | 'max'}) are combined
+    with the stored value instead of replacing it.
+    """
+    accumulate = accumulate or {}
+    row = f"({', '.join(['%s'] * len(columns))})"
+    query = (f"INSERT {'IGNORE ' if ignore and not upsert else ''}INTO {table} ({', '.join(columns)}) "
+             f"VALUES {', '.join([row] * n_rows)}")
+    if upsert:
+        query += " ON DUPLICATE KEY UPDATE " + ', '.join(
+            f"{col} = " + ACCUMULATE_SQL[accumulate[col]].format(col=col) if col in accumulate
+            else f"{col} = VALUES({col})"
+            for col in columns
+        )
+    return query
+
+def write_batches(connection, table, columns, rows, ignore=True, batch_size=None, upsert=False,
+                  retries=RETRIES, accumulate=None):
+    """
+    Send rows as multi-row INSERT statements, committing after each batch.
+
+    batch_size=None sizes batches against max_allowed_packet. A batch that
+    fails with a transient error (lost connection, deadlock) is resent after
+    reconnecting, so the load resumes where it stopped. Prints timing and
+    rows/sec per batch and for the table, and returns rows written.
+    Plain INSERT and accumulating batches are not resent after a lost
+    connection, since the server may have committed them (see run_with_retry).
+    """
+    if not rows:
+        return 0
+    if not batch_size:
+        batch_size = auto_batch_size(connection, table, columns, rows)
+
+    n_batches = (len(rows) + batch_size - 1) // batch_size
+    full_query = multirow_query(table, columns, batch_size, ignore, upsert, accumulate)
+    total_inserted = 0
+    table_start = time.perf_counter()
+    idempotent = (ignore or upsert) and not accumulate
+
+    for n, i in enumerate(range(0, len(rows), batch_size), 1):
+        batch = rows[i:i + batch_size]
+        query = (full_query if len(batch) == batch_size
+                 else multirow_query(table, columns, len(batch), ignore, upsert, accumulate))
+        params = list(chain.from_iterable(batch))
+        start = time.perf_counter()
+        inserted = run_with_retry(connection, lambda: _execute_and_commit(connection, query, params), retries,
+                                  idempotent=idempotent)
+        elapsed = time.perf_counter() - start
+        total_inserted += inserted
+        if n_batches > 1:
+            print(f"  Batch {n}/{n_batches}: inserted {inserted} rows "
+                  f"in {elapsed:.2f}s ({len(batch) / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    elapsed = time.perf_counter() - table_start
+    print(f"  {table}: {len(rows)} rows in {n_batches} batch(es) of <= {batch_size} "
+          f"in {elapsed:.2f}s ({len(rows) / max(elapsed, 1e-9):,.0f} rows/s)")
+    return total_inserted
+
+# ============================================================================
+# 4. INSERT
+# ============================================================================
+
+def insert_rows(connection, table, columns, rows, ignore=True, options=None, upsert=False, accumulate=None):
+    """
+    Insert rows into a table and return the number of rows written.
+
+    options is the loader's LOAD_CONFIG: 'bulk_load' tries LOAD DATA LOCAL
+    INFILE first (falling back if refused) and 'batch_size' overrides the
+    auto-sized multi-row INSERT batches; 'retries' bounds how often a batch
+    is resent after a transient error. upsert=True always uses INSERT ...
+    ON DUPLICATE KEY UPDATE (LOAD DATA's REPLACE would delete and cascade),
+    as does accumulate (see multirow_query).
+    """
+    options = options or {}
+    retries = options.get('retries', RETRIES)
+    upsert = upsert or bool(accumulate)
+    if options.get('bulk_load') and rows and not upsert:
+        count = bulk_load(connection, table, columns, rows, ignore, retries)
+        if count is not None:
+            return count
+
+    return write_batches(connection, table, columns, rows, ignore, options.get('batch_size'), upsert, retries,
+                         accumulate)
+
+def insert_frame(connection, table, df, schema, ignore=True, options=None):
+    """
+    Convert a DataFrame with to_db_rows(df, schema) and insert it.
+
+    Frames flagged with df.attrs['upsert'] (set by incremental loads for
+    changed dimension rows) are upserted instead of inserted, and
+    df.attrs['accumulate'] (set for summary tables) adds to stored values.
+    """
+    columns = [column for column, _ in schema]
+    return insert_rows(connection, table, columns, to_db_rows(df, schema),
+                       ignore=ignore, options=options, upsert=df.attrs.get('upsert', False),
+                       accumulate=df.attrs.get('accumulate'))
@@ -5,11 +5,28 @@ Transforms denormalized retail sales data into a normalized relational database
 
 import pandas as pd
 import numpy as np
-import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
+import os
 import sys
 import warnings
+from etl_readers import read_frame, iter_chunks
+from etl_cache import FrameCache, function_fingerprint
+from etl_dates import EXCEL_SERIAL, parse_date_columns
+from etl_normalize import Dimension, Fact, Normalizer
+from etl_parallel_extract import ParallelNormalizer
+from etl_scheduler import LevelScheduler
+from etl_incremental import IncrementalTracker
+from etl_fresh_load import FreshLoad, complete_deferred
+from etl_connection import ConnectionFactory
+from etl_profile import PROFILER, profiled
+from etl_backends import DATABASE_ERRORS, get_backend, insert_frame
+from etl_parquet import ParquetSink
+from etl_summary import Summary, SummaryTables
+from etl_checkpoint import Checkpoint, source_key
+from etl_verify import LoadVerifier
+from etl_query_cache import QueryCache, create_version_table
+from etl_stream import ResultStream
 warnings.filterwarnings('ignore')
 
 # Fix Windows console encoding
@@ -27,19 +44,40 @@ DB_CONFIG = {
     'database': 'sales_analysis_db'
 }
 
+LOAD_CONFIG = {
+    'chunk_size': None,       # Rows per block for streaming ingestion (None = read whole file)
+    'bulk_load': False,       # Load tables via temp TSV + LOAD DATA LOCAL INFILE
+    'batch_size': None,       # Rows per multi-row INSERT (None = auto-size against max_allowed_packet)
+    'parallel_workers': 1,    # Connections used to load independent FK levels in parallel (1 = serial)
+    'extract_workers': 1,     # Processes extracting the normalized tables from each frame (1 = in-process)
+    'incremental': False,     # Only load rows that are new/changed since the last run (see INCREMENTAL)
+    'cache_dir': None,        # Directory for the parsed-input cache, e.g. '.etl_cache' (None = no cache)
+    'cache_max_mb': 2048,     # Size bound for the cache; least-recently-used entries are evicted
+    'fresh_load': False,      # Empty schema only: defer secondary indexes/FKs and checks until after the load
+    'compress': False,        # MySQL protocol compression (worth it for remote servers, costs CPU locally)
+    'retries': 3,             # Times a batch is resent after a dropped connection or deadlock
+    'profile_report': None,   # JSON file for per-stage wall/CPU time, peak RSS growth and rows/s (None = off)
+    'profile_table': False,   # Also print the per-stage profile as a table at the end of the run
+    'backend': 'mysql',       # Target database: 'mysql', 'sqlite' or 'duckdb' (see etl_backends)
+    'backend_path': None,     # Database file for sqlite/duckdb (None = <database>.<backend>)
+    'parquet_dir': None,      # Also export the normalized tables as Parquet here, e.g. 'parquet' (None = off)
+    'summaries': True,        # Maintain the pre-aggregated SUMMARY_TABLES from each load's new rows
+    'resumable': False,       # Record committed tables/rows so a rerun after a crash resumes (see etl_checkpoint)
+    'checkpoint_rows': 50000, # Rows inserted between checkpoints in resumable mode
+    'query_cache': False,     # Serve run_sample_queries from a result cache until a load changes their tables
+    'query_cache_dir': None,  # On-disk tier of the query cache, e.g. '.etl_query_cache' (None = in-process only)
+    'query_cache_ttl': 3600,  # Seconds a cached query result is served at most (see etl_query_cache)
+    'stream_batch_rows': 10000, # Rows fetched per round trip by uncached reporting queries (see etl_stream)
+}
+
 # ============================================================================
 # 1. DATABASE CONNECTION
 # ============================================================================
 
-def create_connection(config):
-    """Create MySQL database connection"""
+def create_connection(factory):
+    """Open a server connection (no database selected) through the loader's ConnectionFactory"""
     try:
-        connection = mysql.connector.connect(
-            host=config['host'],
-            port=config['port'],
-            user=config['user'],
-            password=config['password']
-        )
+        connection = factory.server()
         if connection.is_connected():
             print(f"✓ Connected to MySQL Server version {connection.get_server_info()}")
             return connection
@@ -60,119 +98,129 @@ def create_database(connection, db_name):
         print(f"✗ Error creating database: {e}")
         return False
 
+def connect_database(factory):
+    """Take a pooled connection with the loader database already selected"""
+    try:
+        return factory.connect()
+    except Error as e:
+        print(f"✗ Error connecting to database: {e}")
+        return None
+
 # ============================================================================
 # 2. CREATE TABLES
 # ============================================================================
 
+TABLES = {
+    'customers': """
+        CREATE TABLE IF NOT EXISTS customers (
+            customer_id INT PRIMARY KEY,
+            gender VARCHAR(10) NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            city VARCHAR(100),
+            state_code VARCHAR(10),
+            state VARCHAR(100),
+            zip VARCHAR(20),
+            country VARCHAR(100),
+            continent VARCHAR(50),
+            dob DATE NULL,
+            INDEX idx_gender (gender),
+            INDEX idx_country (country),
+            INDEX idx_state (state)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'stores': """
+        CREATE TABLE IF NOT EXISTS stores (
+            store_id INT PRIMARY KEY,
+            country VARCHAR(100) NOT NULL,
+            state VARCHAR(100),
+            sq_meters INT,
+            open_date DATE NULL,
+            INDEX idx_country (country)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'product_categories': """
+        CREATE TABLE IF NOT EXISTS product_categories (
+            category_id INT PRIMARY KEY,
+            category_name VARCHAR(100) NOT NULL UNIQUE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'product_subcategories': """
+        CREATE TABLE IF NOT EXISTS product_subcategories (
+            subcategory_id INT PRIMARY KEY,
+            category_id INT NOT NULL,
+            subcategory_name VARCHAR(100) NOT NULL,
+            FOREIGN KEY (category_id) REFERENCES product_categories(category_id),
+            INDEX idx_category (category_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'products': """
+        CREATE TABLE IF NOT EXISTS products (
+            product_id INT PRIMARY KEY,
+            subcategory_id INT NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            brand VARCHAR(100),
+            color VARCHAR(50),
+            cost DECIMAL(10, 2) NOT NULL,
+            price DECIMAL(10, 2) NOT NULL,
+            FOREIGN KEY (subcategory_id) REFERENCES product_subcategories(subcategory_id),
+            INDEX idx_subcategory (subcategory_id),
+            INDEX idx_brand (brand),
+            INDEX idx_price (price)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'orders': """
+        CREATE TABLE IF NOT EXISTS orders (
+            order_number INT PRIMARY KEY,
+            customer_id INT NOT NULL,
+            store_id INT NOT NULL,
+            order_date DATE NOT NULL,
+            delivery_date DATE NULL,
+            FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+            FOREIGN KEY (store_id) REFERENCES stores(store_id),
+            INDEX idx_customer (customer_id),
+            INDEX idx_store (store_id),
+            INDEX idx_order_date (order_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'order_line_items': """
+        CREATE TABLE IF NOT EXISTS order_line_items (
+            transaction_id INT PRIMARY KEY,
+            order_number INT NOT NULL,
+            line_item INT NOT NULL,
+            product_id INT NOT NULL,
+            quantity INT NOT NULL DEFAULT 1,
+            FOREIGN KEY (order_number) REFERENCES orders(order_number),
+            FOREIGN KEY (product_id) REFERENCES products(product_id),
+            UNIQUE KEY unique_order_line (order_number, line_item),
+            INDEX idx_order (order_number),
+            INDEX idx_product (product_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+
 def create_tables(connection):
     """Create all 7 normalized tables"""
 
-    tables = {
-        'customers': """
-            CREATE TABLE IF NOT EXISTS customers (
-                customer_id INT PRIMARY KEY,
-                gender VARCHAR(10) NOT NULL,
-                name VARCHAR(255) NOT NULL,
-                city VARCHAR(100),
-                state_code VARCHAR(10),
-                state VARCHAR(100),
-                zip VARCHAR(20),
-                country VARCHAR(100),
-                continent VARCHAR(50),
-                dob DATE NULL,
-                INDEX idx_gender (gender),
-                INDEX idx_country (country),
-                INDEX idx_state (state)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-
-        'stores': """
-            CREATE TABLE IF NOT EXISTS stores (
-                store_id INT PRIMARY KEY,
-                country VARCHAR(100) NOT NULL,
-                state VARCHAR(100),
-                sq_meters INT,
-                open_date DATE NULL,
-                INDEX idx_country (country)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-
-        'product_categories': """
-            CREATE TABLE IF NOT EXISTS product_categories (
-                category_id INT PRIMARY KEY,
-                category_name VARCHAR(100) NOT NULL UNIQUE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-
-        'product_subcategories': """
-            CREATE TABLE IF NOT EXISTS product_subcategories (
-                subcategory_id INT PRIMARY KEY,
-                category_id INT NOT NULL,
-                subcategory_name VARCHAR(100) NOT NULL,
-                FOREIGN KEY (category_id) REFERENCES product_categories(category_id),
-                INDEX idx_category (category_id)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-
-        'products': """
-            CREATE TABLE IF NOT EXISTS products (
-                product_id INT PRIMARY KEY,
-                subcategory_id INT NOT NULL,
-                name VARCHAR(255) NOT NULL,
-                brand VARCHAR(100),
-                color VARCHAR(50),
-                cost DECIMAL(10, 2) NOT NULL,
-                price DECIMAL(10, 2) NOT NULL,
-                FOREIGN KEY (subcategory_id) REFERENCES product_subcategories(subcategory_id),
-                INDEX idx_subcategory (subcategory_id),
-                INDEX idx_brand (brand),
-                INDEX idx_price (price)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-
-        'orders': """
-            CREATE TABLE IF NOT EXISTS orders (
-                order_number INT PRIMARY KEY,
-                customer_id INT NOT NULL,
-                store_id INT NOT NULL,
-                order_date DATE NOT NULL,
-                delivery_date DATE NULL,
-                FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
-                FOREIGN KEY (store_id) REFERENCES stores(store_id),
-                INDEX idx_customer (customer_id),
-                INDEX idx_store (store_id),
-                INDEX idx_order_date (order_date)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """,
-
-        'order_line_items': """
-            CREATE TABLE IF NOT EXISTS order_line_items (
-                transaction_id INT PRIMARY KEY,
-                order_number INT NOT NULL,
-                line_item INT NOT NULL,
-                product_id INT NOT NULL,
-                quantity INT NOT NULL DEFAULT 1,
-                FOREIGN KEY (order_number) REFERENCES orders(order_number),
-                FOREIGN KEY (product_id) REFERENCES products(product_id),
-                UNIQUE KEY unique_order_line (order_number, line_item),
-                INDEX idx_order (order_number),
-                INDEX idx_product (product_id)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        """
-    }
-
     cursor = connection.cursor()
 
     try:
-        for table_name, create_statement in tables.items():
-            cursor.execute(create_statement)
+        backend = get_backend(LOAD_CONFIG['backend'])
+        for table_name, create_statement in TABLES.items():
+            for statement in backend.table_statements(table_name, create_statement):
+                cursor.execute(statement)
             print(f"✓ Table '{table_name}' created successfully")
 
         connection.commit()
         print("\n✓ All tables created successfully!")
         return True
 
-    except Error as e:
+    except DATABASE_ERRORS as e:
         print(f"✗ Error creating tables: {e}")
         return False
     finally:
@@ -182,6 +230,16 @@ def create_tables(connection):
 # 3. DATA TRANSFORMATION & NORMALIZATION
 # ============================================================================
 
+# Date columns and the formats their text cells use, tried in order (see
+# etl_dates): the source exports month-first dates, generated CSVs ISO ones.
+DATE_COLUMNS = {
+    'OrderDate': ('%m/%d/%Y', '%Y-%m-%d', EXCEL_SERIAL),
+    'DeliveryDate': ('%m/%d/%Y', '%Y-%m-%d', EXCEL_SERIAL),
+    'CustomerDOB': ('%m/%d/%Y', '%Y-%m-%d', EXCEL_SERIAL),
+    'StoreOpenDate': ('%m/%d/%Y', '%Y-%m-%d', EXCEL_SERIAL)
+}
+
+@profiled()
 def load_and_transform_data(file_path):
     """Load data from Excel and transform for normalization"""
 
@@ -189,283 +247,408 @@ def load_and_transform_data(file_path):
     print("LOADING AND TRANSFORMING DATA")
     print("="*80)
 
-    df = pd.read_excel(file_path)
-    print(f"✓ Loaded {len(df)} rows from Excel file")
-
-    # Convert date columns
-    df['OrderDate'] = pd.to_datetime(df['OrderDate'], errors='coerce')
-    df['DeliveryDate'] = pd.to_datetime(df['DeliveryDate'], errors='coerce')
-    df['CustomerDOB'] = pd.to_datetime(df['CustomerDOB'], errors='coerce')
-    df['StoreOpenDate'] = pd.to_datetime(df['StoreOpenDate'], errors='coerce')
-
-    return df
-
-def extract_customers(df):
-    """Extract unique customers"""
-    cols = ['CustomerID', 'CustomerGender', 'CustomerName', 'CustomerCity',
-            'CustomerStateCode', 'CustomerState', 'CustomerZip',
-            'CustomerCountry', 'CustomerContinent', 'CustomerDOB']
-    customers = df[cols].drop_duplicates(subset=['CustomerID'])
-    customers.columns = ['customer_id', 'gender', 'name', 'city', 'state_code',
-                         'state', 'zip', 'country', 'continent', 'dob']
-    print(f"✓ Extracted {len(customers)} unique customers")
-    return customers
-
-def extract_stores(df):
-    """Extract unique stores"""
-    cols = ['StoreID', 'StoreCountry', 'StoreState', 'StoreSqMeters', 'StoreOpenDate']
-    stores = df[cols].drop_duplicates(subset=['StoreID'])
-    stores.columns = ['store_id', 'country', 'state', 'sq_meters', 'open_date']
-    print(f"✓ Extracted {len(stores)} unique stores")
-    return stores
-
-def extract_product_categories(df):
-    """Extract unique product categories"""
-    cats = df[['ProductCategoryID', 'ProductCategory']].drop_duplicates()
-    cats.columns = ['category_id', 'category_name']
-    print(f"✓ Extracted {len(cats)} unique product categories")
-    return cats
-
-def extract_product_subcategories(df):
-    """Extract unique product subcategories"""
-    subcats = df[['ProductSubcategoryID', 'ProductCategoryID', 'ProductSubcategory']].drop_duplicates(subset=['ProductSubcategoryID'])
-    subcats.columns = ['subcategory_id', 'category_id', 'subcategory_name']
-    print(f"✓ Extracted {len(subcats)} unique product subcategories")
-    return subcats
-
-def extract_products(df):
-    """Extract unique products"""
-    cols = ['ProductID', 'ProductSubcategoryID', 'ProductName', 'ProductBrand',
-            'ProductColor', 'ProductCost', 'ProductPrice']
-    products = df[cols].drop_duplicates(subset=['ProductID'])
-    products.columns = ['product_id', 'subcategory_id', 'name', 'brand', 'color', 'cost', 'price']
-    print(f"✓ Extracted {len(products)} unique products")
-    return products
-
-def extract_orders(df):
-    """Extract unique orders"""
-    cols = ['OrderNumber', 'CustomerID', 'StoreID', 'OrderDate', 'DeliveryDate']
-    orders = df[cols].drop_duplicates(subset=['OrderNumber'])
-    orders.columns = ['order_number', 'customer_id', 'store_id', 'order_date', 'delivery_date']
-    print(f"✓ Extracted {len(orders)} unique orders")
-    return orders
-
-def extract_order_line_items(df):
-    """Extract all line items"""
-    cols = ['TransactionID', 'OrderNumber', 'LineItem', 'ProductID', 'Quantity']
-    items = df[cols].copy()
-    items.columns = ['transaction_id', 'order_number', 'line_item', 'product_id', 'quantity']
-    print(f"✓ Extracted {len(items)} order line items")
-    return items
+    if not LOAD_CONFIG['cache_dir']:
+        return read_and_transform(file_path)
+
+    # Reuse the typed frame from an earlier run while the file (and the
+    # reading/transform code) is unchanged
+    cache = FrameCache(LOAD_CONFIG['cache_dir'], LOAD_CONFIG['cache_max_mb'])
+    variant = f"retail_sales_load:{function_fingerprint(read_and_transform)}:{function_fingerprint(transform_data)}:{DATE_COLUMNS}"
+    return cache.get_or_build(file_path, lambda: read_and_transform(file_path), variant)
+
+def read_and_transform(file_path):
+    """Read the whole source file and convert its date columns"""
+    df = read_frame(file_path)
+    print(f"✓ Loaded {len(df)} rows from {file_path}")
+    return transform_data(df)
+
+@profiled()
+def transform_data(df):
+    """Convert the DATE_COLUMNS in place"""
+    return parse_date_columns(df, DATE_COLUMNS)
+
+def iter_transformed_chunks(file_path, chunk_size):
+    """Stream the source file in fixed-size blocks, each already transformed"""
+
+    print("\n" + "="*80)
+    print(f"STREAMING DATA IN CHUNKS OF {chunk_size} ROWS")
+    print("="*80)
+
+    for chunk in iter_chunks(file_path, chunk_size):
+        yield transform_data(chunk)
+
+# Normalized tables, in foreign-key order. Every table keeps the source's
+# natural ids, so each one is the first row seen for its key.
+NORMALIZATION = [
+    Dimension('customers', ['CustomerID'], {
+        'CustomerID': 'customer_id',
+        'CustomerGender': 'gender',
+        'CustomerName': 'name',
+        'CustomerCity': 'city',
+        'CustomerStateCode': 'state_code',
+        'CustomerState': 'state',
+        'CustomerZip': 'zip',
+        'CustomerCountry': 'country',
+        'CustomerContinent': 'continent',
+        'CustomerDOB': 'dob'
+    }),
+    Dimension('stores', ['StoreID'], {
+        'StoreID': 'store_id',
+        'StoreCountry': 'country',
+        'StoreState': 'state',
+        'StoreSqMeters': 'sq_meters',
+        'StoreOpenDate': 'open_date'
+    }),
+    Dimension('product_categories', ['ProductCategoryID'], {
+        'ProductCategoryID': 'category_id',
+        'ProductCategory': 'category_name'
+    }),
+    Dimension('product_subcategories', ['ProductSubcategoryID'], {
+        'ProductSubcategoryID': 'subcategory_id',
+        'ProductCategoryID': 'category_id',
+        'ProductSubcategory': 'subcategory_name'
+    }),
+    Dimension('products', ['ProductID'], {
+        'ProductID': 'product_id',
+        'ProductSubcategoryID': 'subcategory_id',
+        'ProductName': 'name',
+        'ProductBrand': 'brand',
+        'ProductColor': 'color',
+        'ProductCost': 'cost',
+        'ProductPrice': 'price'
+    }),
+    Dimension('orders', ['OrderNumber'], {
+        'OrderNumber': 'order_number',
+        'CustomerID': 'customer_id',
+        'StoreID': 'store_id',
+        'OrderDate': 'order_date',
+        'DeliveryDate': 'delivery_date'
+    }),
+    Fact('order_line_items', {
+        'TransactionID': 'transaction_id',
+        'OrderNumber': 'order_number',
+        'LineItem': 'line_item',
+        'ProductID': 'product_id',
+        'Quantity': 'quantity'
+    })
+]
+
+@profiled()
+def extract_all(df, normalizer=None):
+    """Extract every normalized table from one frame"""
+    if normalizer is None:
+        normalizer = Normalizer(NORMALIZATION)
+    return normalizer.normalize(df)
 
 # ============================================================================
 # 4. INSERT DATA INTO DATABASE
 # ============================================================================
 
+@profiled()
 def insert_customers(connection, customers):
     """Insert customers into database"""
-    cursor = connection.cursor()
-
-    query = """
-        INSERT IGNORE INTO customers
-        (customer_id, gender, name, city, state_code, state, zip, country, continent, dob)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-
-    data = []
-    for _, row in customers.iterrows():
-        data.append([
-            int(row['customer_id']),
-            row['gender'],
-            row['name'],
-            row['city'] if pd.notna(row['city']) else None,
-            row['state_code'] if pd.notna(row['state_code']) else None,
-            row['state'] if pd.notna(row['state']) else None,
-            str(row['zip']).strip() if pd.notna(row['zip']) else None,
-            row['country'] if pd.notna(row['country']) else None,
-            row['continent'] if pd.notna(row['continent']) else None,
-            row['dob'].date() if pd.notna(row['dob']) else None
-        ])
-
-    cursor.executemany(query, data)
-    connection.commit()
-    print(f"✓ Inserted {cursor.rowcount} customers")
-    cursor.close()
-
+    count = insert_frame(connection, 'customers', customers, [
+        ('customer_id', 'int'),
+        ('gender', 'str'),
+        ('name', 'str'),
+        ('city', 'str'),
+        ('state_code', 'str'),
+        ('state', 'str'),
+        ('zip', 'text'),
+        ('country', 'str'),
+        ('continent', 'str'),
+        ('dob', 'date')
+    ], options=LOAD_CONFIG)
+
+    print(f"✓ Inserted {count} customers")
+
+@profiled()
 def insert_stores(connection, stores):
     """Insert stores into database"""
-    cursor = connection.cursor()
-
-    query = """
-        INSERT IGNORE INTO stores (store_id, country, state, sq_meters, open_date)
-        VALUES (%s, %s, %s, %s, %s)
-    """
+    count = insert_frame(connection, 'stores', stores, [
+        ('store_id', 'int'),
+        ('country', 'str'),
+        ('state', 'str'),
+        ('sq_meters', 'int'),
+        ('open_date', 'date')
+    ], options=LOAD_CONFIG)
 
-    data = []
-    for _, row in stores.iterrows():
-        data.append([
-            int(row['store_id']),
-            row['country'],
-            row['state'] if pd.notna(row['state']) else None,
-            int(row['sq_meters']) if pd.notna(row['sq_meters']) else None,
-            row['open_date'].date() if pd.notna(row['open_date']) else None
-        ])
-
-    cursor.executemany(query, data)
-    connection.commit()
-    print(f"✓ Inserted {cursor.rowcount} stores")
-    cursor.close()
+    print(f"✓ Inserted {count} stores")
 
+@profiled()
 def insert_product_categories(connection, categories):
     """Insert product categories into database"""
-    cursor = connection.cursor()
-
-    query = """
-        INSERT IGNORE INTO product_categories (category_id, category_name)
-        VALUES (%s, %s)
-    """
+    count = insert_frame(connection, 'product_categories', categories, [
+        ('category_id', 'int'),
+        ('category_name', 'str')
+    ], options=LOAD_CONFIG)
 
-    data = categories.values.tolist()
-    cursor.executemany(query, data)
-    connection.commit()
-    print(f"✓ Inserted {cursor.rowcount} product categories")
-    cursor.close()
+    print(f"✓ Inserted {count} product categories")
 
+@profiled()
 def insert_product_subcategories(connection, subcategories):
     """Insert product subcategories into database"""
-    cursor = connection.cursor()
-
-    query = """
-        INSERT IGNORE INTO product_subcategories (subcategory_id, category_id, subcategory_name)
-        VALUES (%s, %s, %s)
-    """
+    count = insert_frame(connection, 'product_subcategories', subcategories, [
+        ('subcategory_id', 'int'),
+        ('category_id', 'int'),
+        ('subcategory_name', 'str')
+    ], options=LOAD_CONFIG)
 
-    data = subcategories.values.tolist()
-    cursor.executemany(query, data)
-    connection.commit()
-    print(f"✓ Inserted {cursor.rowcount} product subcategories")
-    cursor.close()
+    print(f"✓ Inserted {count} product subcategories")
 
+@profiled()
 def insert_products(connection, products):
     """Insert products into database"""
-    cursor = connection.cursor()
-
-    query = """
-        INSERT IGNORE INTO products
-        (product_id, subcategory_id, name, brand, color, cost, price)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """
-
-    data = []
-    for _, row in products.iterrows():
-        data.append([
-            int(row['product_id']),
-            int(row['subcategory_id']),
-            row['name'],
-            row['brand'] if pd.notna(row['brand']) else None,
-            row['color'] if pd.notna(row['color']) else None,
-            float(row['cost']),
-            float(row['price'])
-        ])
-
-    cursor.executemany(query, data)
-    connection.commit()
-    print(f"✓ Inserted {cursor.rowcount} products")
-    cursor.close()
-
+    count = insert_frame(connection, 'products', products, [
+        ('product_id', 'int'),
+        ('subcategory_id', 'int'),
+        ('name', 'str'),
+        ('brand', 'str'),
+        ('color', 'str'),
+        ('cost', 'float'),
+        ('price', 'float')
+    ], options=LOAD_CONFIG)
+
+    print(f"✓ Inserted {count} products")
+
+@profiled()
 def insert_orders(connection, orders):
     """Insert orders into database"""
-    cursor = connection.cursor()
-
-    query = """
-        INSERT IGNORE INTO orders
-        (order_number, customer_id, store_id, order_date, delivery_date)
-        VALUES (%s, %s, %s, %s, %s)
-    """
+    count = insert_frame(connection, 'orders', orders, [
+        ('order_number', 'int'),
+        ('customer_id', 'int'),
+        ('store_id', 'int'),
+        ('order_date', 'date'),
+        ('delivery_date', 'date')
+    ], options=LOAD_CONFIG)
 
-    data = []
-    for _, row in orders.iterrows():
-        data.append([
-            int(row['order_number']),
-            int(row['customer_id']),
-            int(row['store_id']),
-            row['order_date'].date() if pd.notna(row['order_date']) else None,
-            row['delivery_date'].date() if pd.notna(row['delivery_date']) else None
-        ])
-
-    cursor.executemany(query, data)
-    connection.commit()
-    print(f"✓ Inserted {cursor.rowcount} orders")
-    cursor.close()
+    print(f"✓ Inserted {count} orders")
 
+@profiled()
 def insert_order_line_items(connection, items):
-    """Insert order line items into database (batched for performance)"""
-    cursor = connection.cursor()
+    """Insert order line items into database"""
+    count = insert_frame(connection, 'order_line_items', items, [
+        ('transaction_id', 'int'),
+        ('order_number', 'int'),
+        ('line_item', 'int'),
+        ('product_id', 'int'),
+        ('quantity', 'int')
+    ], options=LOAD_CONFIG)
+
+    print(f"✓ Inserted {count} order line items total")
+
+# Incremental strategy per table (see etl_incremental), in foreign-key order
+INCREMENTAL = {
+    'customers': ('hash', ['customer_id']),
+    'stores': ('hash', ['store_id']),
+    'product_categories': ('hash', ['category_id']),
+    'product_subcategories': ('hash', ['subcategory_id']),
+    'products': ('hash', ['product_id']),
+    'orders': ('key', 'order_number'),
+    'order_line_items': ('key', 'transaction_id')
+}
 
-    query = """
-        INSERT IGNORE INTO order_line_items
-        (transaction_id, order_number, line_item, product_id, quantity)
-        VALUES (%s, %s, %s, %s, %s)
-    """
+# Parquet export layout (see etl_parquet): date column each table is
+# partitioned on by year-month, and low-cardinality columns to dictionary-encode
+PARQUET_PARTITIONS = {
+    'orders': 'order_date'
+}
 
-    data = []
-    for _, row in items.iterrows():
-        data.append([
-            int(row['transaction_id']),
-            int(row['order_number']),
-            int(row['line_item']),
-            int(row['product_id']),
-            int(row['quantity'])
-        ])
-
-    # Batch insert for large dataset
-    BATCH_SIZE = 5000
-    total_inserted = 0
-    for i in range(0, len(data), BATCH_SIZE):
-        batch = data[i:i + BATCH_SIZE]
-        cursor.executemany(query, batch)
-        connection.commit()
-        total_inserted += cursor.rowcount
-        print(f"  Batch {i//BATCH_SIZE + 1}: inserted {cursor.rowcount} rows")
+PARQUET_DICTIONARY = {
+    'customers': ['gender', 'state_code', 'state', 'country', 'continent'],
+    'stores': ['country', 'state'],
+    'products': ['brand', 'color']
+}
+
+# Row identity per table for etl_reconcile: natural key columns
+RECONCILE_KEYS = {
+    'customers': ['customer_id'],
+    'stores': ['store_id'],
+    'product_categories': ['category_id'],
+    'product_subcategories': ['subcategory_id'],
+    'products': ['product_id'],
+    'orders': ['order_number'],
+    'order_line_items': ['transaction_id']
+}
+
+# Insert function per table, in foreign-key order
+INSERTERS = {
+    'customers': insert_customers,
+    'stores': insert_stores,
+    'product_categories': insert_product_categories,
+    'product_subcategories': insert_product_subcategories,
+    'products': insert_products,
+    'orders': insert_orders,
+    'order_line_items': insert_order_line_items
+}
+
+def insert_all(connection, tables, inserters=INSERTERS):
+    """Insert extracted tables (order matters due to foreign keys)"""
+    for table, inserter in inserters.items():
+        inserter(connection, tables[table])
 
-    print(f"✓ Inserted {total_inserted} order line items total")
-    cursor.close()
+def load_tables(connection, tables, scheduler=None, tracker=None, fresh=None, checkpoint=None, part=0):
+    """
+    Insert extracted tables serially, or FK level by level when a scheduler
+    is given; with an incremental tracker only the delta is inserted, and
+    with a checkpoint the rows an interrupted run committed are skipped.
+    Returns the tables sent (the delta in incremental mode).
+    """
+    inserters = checkpoint.wrap(part, INSERTERS) if checkpoint else INSERTERS
+    if tracker:
+        tables = tracker.filter(tables)
+    sent = tables
+    if fresh:
+        tables = fresh.prepare(tables)
+    if scheduler:
+        scheduler.load(tables, inserters)
+    else:
+        insert_all(connection, tables, inserters)
+    return sent
 
 # ============================================================================
-# 5. VERIFICATION QUERIES
+# 5. SUMMARY TABLES
 # ============================================================================
 
-def verify_data(connection):
-    """Verify data was inserted correctly"""
-
-    print("\n" + "="*80)
-    print("DATA VERIFICATION")
-    print("="*80)
+SUMMARY_TABLES = {
+    'summary_daily_category_revenue': """
+        CREATE TABLE IF NOT EXISTS summary_daily_category_revenue (
+            order_date DATE NOT NULL,
+            category_name VARCHAR(100) NOT NULL,
+            item_count INT NOT NULL,
+            units INT NOT NULL,
+            revenue DECIMAL(14, 2) NOT NULL,
+            PRIMARY KEY (order_date, category_name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'summary_customer_ltv': """
+        CREATE TABLE IF NOT EXISTS summary_customer_ltv (
+            customer_id INT PRIMARY KEY,
+            order_count INT NOT NULL,
+            lifetime_value DECIMAL(14, 2) NOT NULL,
+            first_order_date DATE NOT NULL,
+            last_order_date DATE NOT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    'summary_store_revenue': """
+        CREATE TABLE IF NOT EXISTS summary_store_revenue (
+            store_id INT PRIMARY KEY,
+            order_count INT NOT NULL,
+            units INT NOT NULL,
+            revenue DECIMAL(14, 2) NOT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
 
-    cursor = connection.cursor()
+def _priced_line_items(new, tables):
+    """New line items with their order's date/customer/store, category and revenue (quantity * price)"""
+    items = new['order_line_items'].merge(
+        tables['orders'][['order_number', 'order_date', 'customer_id', 'store_id']].drop_duplicates('order_number'),
+        on='order_number'
+    )
+    products = tables['products'][['product_id', 'subcategory_id', 'price']].drop_duplicates('product_id')
+    subcategories = tables['product_subcategories'][['subcategory_id', 'category_id']].drop_duplicates('subcategory_id')
+    categories = tables['product_categories'][['category_id', 'category_name']].drop_duplicates('category_id')
+    items = items.merge(products, on='product_id').merge(subcategories, on='subcategory_id').merge(categories, on='category_id')
+    items['revenue'] = items['quantity'] * items['price']
+    return items
 
-    tables = ['customers', 'stores', 'product_categories',
-              'product_subcategories', 'products', 'orders', 'order_line_items']
+def _summarize_daily_category_revenue(new, tables):
+    """Line items, units and revenue per order date and product category"""
+    items = _priced_line_items(new, tables)
+    return items.groupby(['order_date', 'category_name'], as_index=False).agg(
+        item_count=('transaction_id', 'size'),
+        units=('quantity', 'sum'),
+        revenue=('revenue', 'sum')
+    )
+
+def _summarize_customer_ltv(new, tables):
+    """New orders, spend and first/last order date per customer"""
+    items = _priced_line_items(new, tables)
+    dates = pd.concat([new['orders'][['customer_id', 'order_date']], items[['customer_id', 'order_date']]])
+    ltv = dates.groupby('customer_id').agg(
+        first_order_date=('order_date', 'min'),
+        last_order_date=('order_date', 'max')
+    )
+    ltv['order_count'] = new['orders'].groupby('customer_id').size().reindex(ltv.index, fill_value=0)
+    ltv['lifetime_value'] = items.groupby('customer_id')['revenue'].sum().reindex(ltv.index, fill_value=0)
+    return ltv.reset_index()
+
+def _summarize_store_revenue(new, tables):
+    """New orders, units and revenue per store"""
+    items = _priced_line_items(new, tables)
+    stores = pd.concat([
+        new['orders'].groupby('store_id').size().rename('order_count'),
+        items.groupby('store_id').agg(units=('quantity', 'sum'), revenue=('revenue', 'sum'))
+    ], axis=1)
+    return stores.fillna(0).reset_index()
+
+# Summary tables (see etl_summary); measures are added to (or min/max-ed
+# with) the stored values, the other columns form the key
+SUMMARIES = [
+    Summary('summary_daily_category_revenue', [
+        ('order_date', 'date'),
+        ('category_name', 'str'),
+        ('item_count', 'int'),
+        ('units', 'int'),
+        ('revenue', 'float')
+    ], {'item_count': 'sum', 'units': 'sum', 'revenue': 'sum'}, _summarize_daily_category_revenue),
+    Summary('summary_customer_ltv', [
+        ('customer_id', 'int'),
+        ('order_count', 'int'),
+        ('lifetime_value', 'float'),
+        ('first_order_date', 'date'),
+        ('last_order_date', 'date')
+    ], {'order_count': 'sum', 'lifetime_value': 'sum', 'first_order_date': 'min', 'last_order_date': 'max'},
+       _summarize_customer_ltv),
+    Summary('summary_store_revenue', [
+        ('store_id', 'int'),
+        ('order_count', 'int'),
+        ('units', 'int'),
+        ('revenue', 'float')
+    ], {'order_count': 'sum', 'units': 'sum', 'revenue': 'sum'}, _summarize_store_revenue)
+]
+
+# Fact rows each load adds to the summaries: line items and orders above
+# the summary watermarks (an order's line items may span streamed chunks, so
+# each is filtered on its own key; the other tables are lookups)
+SUMMARY_FACTS = {
+    'order_line_items': ('key', 'transaction_id'),
+    'orders': ('key', 'order_number')
+}
 
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
-        print(f"✓ {table.upper()}: {count} records")
+# ============================================================================
+# 6. VERIFICATION QUERIES
+# ============================================================================
 
-    cursor.close()
+# Aggregates checked after every load (see etl_verify): numeric columns
+# summed and date columns ranged, per table
+VERIFY_AGGREGATES = {
+    'customers': ([], ['dob']),
+    'stores': (['sq_meters'], ['open_date']),
+    'product_categories': ([], []),
+    'product_subcategories': ([], []),
+    'products': (['cost', 'price'], []),
+    'orders': ([], ['order_date', 'delivery_date']),
+    'order_line_items': (['quantity'], [])
+}
 
-def run_sample_queries(connection):
-    """Run sample queries to demonstrate the normalized structure"""
+@profiled()
+def verify_data(connection, verifier):
+    """Verify the loaded tables against the aggregates of the extracted frames"""
 
     print("\n" + "="*80)
-    print("SAMPLE QUERIES")
+    print("DATA VERIFICATION")
     print("="*80)
 
-    cursor = connection.cursor()
+    return verifier.verify(connection)
 
-    # Query 1: Order with full details
-    print("\n1. Sample Order with Full Details:")
-    query1 = """
+# Reporting queries, run by run_sample_queries and checked by etl_index_advisor
+# (name: (title, SQL)); SUMMARY_QUERIES read the summary tables
+REPORT_QUERIES = {
+    'order_details': ("Sample Order with Full Details", """
         SELECT
             o.order_number,
             c.name AS customer_name,
@@ -484,14 +667,9 @@ def run_sample_queries(connection):
         JOIN product_subcategories ps ON p.subcategory_id = ps.subcategory_id
         JOIN product_categories pc ON ps.category_id = pc.category_id
         LIMIT 5
-    """
-    cursor.execute(query1)
-    for row in cursor.fetchall():
-        print(f"   {row}")
+    """),
 
-    # Query 2: Revenue by category
-    print("\n2. Revenue by Category:")
-    query2 = """
+    'revenue_by_category': ("Revenue by Category", """
         SELECT
             pc.category_name,
             COUNT(DISTINCT li.order_number) AS order_count,
@@ -503,14 +681,9 @@ def run_sample_queries(connection):
         JOIN product_categories pc ON ps.category_id = pc.category_id
         GROUP BY pc.category_name
         ORDER BY total_revenue DESC
-    """
-    cursor.execute(query2)
-    for row in cursor.fetchall():
-        print(f"   {row}")
+    """),
 
-    # Query 3: Top stores by revenue
-    print("\n3. Top 5 Stores by Revenue:")
-    query3 = """
+    'top_stores': ("Top 5 Stores by Revenue", """
         SELECT
             s.store_id,
             s.country,
@@ -524,18 +697,56 @@ def run_sample_queries(connection):
         GROUP BY s.store_id, s.country, s.state
         ORDER BY total_revenue DESC
         LIMIT 5
+    """)
+}
+
+SUMMARY_QUERIES = {
+    'top_customers_ltv': ("Top 5 Customers by Lifetime Value (summary_customer_ltv)", """
+        SELECT
+            customer_id,
+            order_count,
+            lifetime_value,
+            first_order_date,
+            last_order_date
+        FROM summary_customer_ltv
+        ORDER BY lifetime_value DESC
+        LIMIT 5
+    """)
+}
+
+@profiled()
+def run_sample_queries(connection, backend, cache=None):
+    """
+    Run sample queries to demonstrate the normalized structure (through the
+    query cache if given, otherwise streamed in fetchmany batches)
     """
-    cursor.execute(query3)
-    for row in cursor.fetchall():
-        print(f"   {row}")
 
-    cursor.close()
+    print("\n" + "="*80)
+    print("SAMPLE QUERIES")
+    print("="*80)
+
+    queries = dict(REPORT_QUERIES)
+    if LOAD_CONFIG['summaries']:
+        queries.update(SUMMARY_QUERIES)
+
+    for i, (title, query) in enumerate(queries.values(), 1):
+        print(f"\n{i}. {title}:")
+        if cache:
+            batches = [cache.fetch(query)]
+        else:
+            batches = ResultStream(connection, backend, query, batch_rows=LOAD_CONFIG['stream_batch_rows'])
+        for rows in batches:
+            for row in rows:
+                print(f"   {row}")
+
+    if cache:
+        cache.report()
 
 # ============================================================================
-# 6. MAIN EXECUTION
+# 7. MAIN EXECUTION
 # ============================================================================
 
-def main():
+def main(file_path=None):
     """Main function to orchestrate the entire ETL process"""
 
     print("\n" + "="*80)
@@ -543,55 +754,171 @@ def main():
     print("="*80)
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-    # File path
-    file_path = r'Data\Retail Sales Dataset.xlsx'
-
-    # Step 1: Connect to MySQL
-    print("\n[STEP 1] Connecting to MySQL on port 3307...")
-    connection = create_connection(DB_CONFIG)
-    if not connection:
-        return
-
-    # Step 2: Create database
-    print("\n[STEP 2] Creating database...")
-    if not create_database(connection, DB_CONFIG['database']):
-        return
-
-    # Step 3: Create tables
+    if LOAD_CONFIG['profile_report'] or LOAD_CONFIG['profile_table']:
+        PROFILER.enable()
+
+    # File path (bench_etl.py passes generated workbooks)
+    file_path = file_path or r'Data\Retail Sales Dataset.xlsx'
+
+    # SQLite/DuckDB load into a local file; MySQL needs a server and database
+    backend = get_backend(LOAD_CONFIG['backend'])
+    mysql = backend.name == 'mysql'
+    if not mysql:
+        # Steps 1-2: Open the database file
+        print(f"\n[STEP 1-2] Opening {backend.name} database...")
+        db_path = LOAD_CONFIG['backend_path'] or f"{DB_CONFIG['database']}.{backend.name}"
+        connection = backend.connect(db_path)
+        factory = None
+        print(f"✓ Opened {db_path} (LOAD DATA, parallel, fresh-load and incremental modes are MySQL-only)")
+    else:
+        # Step 1: Connect to MySQL
+        print("\n[STEP 1] Connecting to MySQL on port 3307...")
+        factory = ConnectionFactory(
+            DB_CONFIG, pool_size=LOAD_CONFIG['parallel_workers'] + 1,
+            compress=LOAD_CONFIG['compress'], allow_local_infile=LOAD_CONFIG['bulk_load']
+        )
+        connection = create_connection(factory)
+        if not connection:
+            return
+
+        # Step 2: Create database
+        print("\n[STEP 2] Creating database...")
+        if not create_database(connection, DB_CONFIG['database']):
+            return
+
+        # The rest of the run uses pooled connections bound to the database
+        connection.close()
+        connection = connect_database(factory)
+        if not connection:
+            return
+
+    # Step 3: Create tables (fresh-load mode defers secondary indexes and FKs)
     print("\n[STEP 3] Creating tables...")
-    if not create_tables(connection):
+    fresh = None
+    if LOAD_CONFIG['fresh_load'] and mysql:
+        # Unique checks can only be skipped when every table arrives in one piece
+        fresh = FreshLoad(TABLES, disable_unique_checks=not LOAD_CONFIG['chunk_size'])
+        if fresh.create_tables(connection):
+            fresh.begin(connection)
+        else:
+            print("  Falling back to a regular load")
+            fresh = None
+    if not fresh and not create_tables(connection):
         return
-
-    # Step 4: Load and transform data
-    print("\n[STEP 4] Loading and transforming data...")
-    df = load_and_transform_data(file_path)
-
-    customers = extract_customers(df)
-    stores = extract_stores(df)
-    categories = extract_product_categories(df)
-    subcategories = extract_product_subcategories(df)
-    products = extract_products(df)
-    orders = extract_orders(df)
-    line_items = extract_order_line_items(df)
-
-    # Step 5: Insert data (order matters due to foreign keys)
-    print("\n[STEP 5] Inserting data into database...")
-    insert_customers(connection, customers)
-    insert_stores(connection, stores)
-    insert_product_categories(connection, categories)
-    insert_product_subcategories(connection, subcategories)
-    insert_products(connection, products)
-    insert_orders(connection, orders)
-    insert_order_line_items(connection, line_items)
-
-    # Step 6: Verify data
-    verify_data(connection)
+    if mysql and not fresh:
+        # Indexes/FKs an interrupted fresh load never built
+        complete_deferred(connection, TABLES)
+
+    # Query cache: every table gets a data version that committed inserts bump
+    query_cache = None
+    if LOAD_CONFIG['query_cache']:
+        cached_tables = list(TABLES) + list(SUMMARY_TABLES)
+        create_version_table(connection, backend, cached_tables)
+        if mysql:
+            namespace = f"mysql://{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+        else:
+            namespace = f"{backend.name}://{os.path.abspath(db_path)}"
+        query_cache = QueryCache(connection, backend, cached_tables, namespace,
+                                 LOAD_CONFIG['query_cache_dir'], LOAD_CONFIG['query_cache_ttl'])
+
+    # Parallel mode: a small pool of extra connections loads independent tables together
+    def open_worker_connection():
+        worker = connect_database(factory)
+        return fresh.begin(worker) if fresh and worker else worker
+
+    scheduler = None
+    if LOAD_CONFIG['parallel_workers'] > 1 and mysql:
+        scheduler = LevelScheduler(open_worker_connection, TABLES, workers=LOAD_CONFIG['parallel_workers'])
+
+    # Incremental mode: compare against the watermarks/hashes from the last run
+    tracker = IncrementalTracker(connection, INCREMENTAL) if LOAD_CONFIG['incremental'] and mysql else None
+
+    # Summary tables: the new fact rows of each load are aggregated into them
+    summaries = None
+    if LOAD_CONFIG['summaries']:
+        summaries = SummaryTables(connection, SUMMARIES, SUMMARY_TABLES, SUMMARY_FACTS, LOAD_CONFIG)
+
+    # Parquet export: the extracted frames are also written as a partitioned dataset
+    sink = None
+    if LOAD_CONFIG['parquet_dir']:
+        sink = ParquetSink(LOAD_CONFIG['parquet_dir'], TABLES, PARQUET_PARTITIONS, PARQUET_DICTIONARY)
+
+    # Resumable mode: committed tables and rows are recorded as the load goes,
+    # and a rerun after a crash picks up where the last one stopped
+    checkpoint = None
+    if LOAD_CONFIG['resumable']:
+        checkpoint = Checkpoint(connection, 'retail_sales_load', source_key(file_path, LOAD_CONFIG['chunk_size']),
+                                LOAD_CONFIG, LOAD_CONFIG['checkpoint_rows'])
+
+    # Verification: the tables' aggregates now, and those of every frame loaded
+    verifier = LoadVerifier(connection, TABLES, VERIFY_AGGREGATES, resumed=bool(checkpoint and checkpoint.resuming))
+
+    # Extraction runs on a process pool when extract_workers > 1 (every table
+    # keeps natural ids, so slices of a frame can be extracted independently)
+    if LOAD_CONFIG['extract_workers'] > 1:
+        normalizer = ParallelNormalizer(NORMALIZATION, LOAD_CONFIG['extract_workers'])
+    else:
+        normalizer = Normalizer(NORMALIZATION)
+
+    chunk_size = LOAD_CONFIG['chunk_size']
+    if chunk_size:
+        # Steps 4-5: Stream the file, extracting and inserting one block at a time
+        print("\n[STEP 4-5] Streaming, transforming and inserting data...")
+        for i, chunk in enumerate(iter_transformed_chunks(file_path, chunk_size), 1):
+            print(f"\n--- Chunk {i} ({len(chunk)} rows) ---")
+            if checkpoint and checkpoint.done(i, 'part'):
+                print("✓ Already loaded by the interrupted run, skipped")
+                continue
+            tables = extract_all(chunk, normalizer)
+            if sink:
+                sink.write(tables)
+            sent = load_tables(connection, tables, scheduler, tracker, fresh, checkpoint, part=i)
+            verifier.add(sent, delta=bool(tracker))
+            if summaries:
+                summaries.update(tables, checkpoint, part=i)
+            if checkpoint:
+                checkpoint.mark_done(i)
+    else:
+        # Step 4: Load and transform data
+        print("\n[STEP 4] Loading and transforming data...")
+        df = load_and_transform_data(file_path)
+        tables = extract_all(df, normalizer)
+        if sink:
+            sink.write(tables)
+
+        # Step 5: Insert data (order matters due to foreign keys), then
+        # aggregate the new rows into the summaries
+        print("\n[STEP 5] Inserting data into database...")
+        sent = load_tables(connection, tables, scheduler, tracker, fresh, checkpoint)
+        verifier.add(sent, delta=bool(tracker))
+        if summaries:
+            summaries.update(tables, checkpoint)
+
+    if isinstance(normalizer, ParallelNormalizer):
+        normalizer.close()
+    if tracker:
+        tracker.save()
+    if scheduler:
+        scheduler.close()
+    if fresh:
+        fresh.finish(connection)
+    if sink:
+        sink.close()
+    if checkpoint:
+        checkpoint.finish()
+
+    # Step 6: Verify data (a mismatch fails the run)
+    if not verify_data(connection, verifier):
+        connection.close()
+        print("\n✗ Loaded tables do not match the extracted data")
+        sys.exit(1)
 
     # Step 7: Run sample queries
-    run_sample_queries(connection)
+    run_sample_queries(connection, backend, query_cache)
 
     # Close connection
     connection.close()
+    PROFILER.finish('retail_sales_load', LOAD_CONFIG['profile_report'], LOAD_CONFIG['profile_table'])
     print("\n" + "="*80)
     print("✓ PROCESS COMPLETED SUCCESSFULLY!")
     print("="*80)